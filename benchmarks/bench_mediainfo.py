@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Benchmark: in-process header parsing vs. one ffprobe per file.
+
+Writes N synthetic files (half MP4 with the ``moov`` box *behind* a large,
+sparse ``mdat`` — the worst case for a header reader — half WebM), then times
+``mediainfo.probe_file`` over all of them and ``ffprobe`` over a sample.
+
+    python benchmarks/bench_mediainfo.py --files 5000 --mdat-mb 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from nerd_downloader import mediainfo, toolchain  # noqa: E402
+
+
+def _box(kind: bytes, payload: bytes = b"") -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+
+def _trak(handler: bytes, codec: bytes, width: int = 0, height: int = 0) -> bytes:
+    tkhd = bytes(76) + struct.pack(">II", width << 16, height << 16)
+    stsd = bytes(4) + struct.pack(">I", 1) + _box(codec, bytes(8))
+    minf = _box(b"minf", _box(b"stbl", _box(b"stsd", stsd)))
+    return _box(b"trak", _box(b"tkhd", tkhd) + _box(b"mdia", _box(b"hdlr", bytes(8) + handler + bytes(12)) + minf))
+
+
+def _write_mp4(path: str, mdat_bytes: int) -> None:
+    mvhd = bytes(12) + struct.pack(">II", 1000, 300_000) + bytes(80)
+    moov = _box(b"moov", _box(b"mvhd", mvhd) + _trak(b"vide", b"avc1", 1920, 1080) + _trak(b"soun", b"mp4a"))
+    with open(path, "wb") as fh:
+        fh.write(_box(b"ftyp", b"isom" + bytes(4)))
+        fh.write(struct.pack(">I4s", 8 + mdat_bytes, b"mdat"))
+        fh.seek(mdat_bytes, os.SEEK_CUR)  # sparse: no real media bytes on disk
+        fh.write(moov)
+
+
+def _ebml(element_id: int, payload: bytes) -> bytes:
+    return element_id.to_bytes((element_id.bit_length() + 7) // 8, "big") + (len(payload) | 1 << 56).to_bytes(8, "big") + payload
+
+
+def _write_webm(path: str, cluster_bytes: int) -> None:
+    info = _ebml(0x1549A966, _ebml(0x4489, struct.pack(">d", 300_000.0)))
+    video = _ebml(0xAE, _ebml(0x83, b"\x01") + _ebml(0x86, b"V_VP9") + _ebml(0xE0, _ebml(0xB0, (3840).to_bytes(2, "big")) + _ebml(0xBA, (2160).to_bytes(2, "big"))))
+    tracks = _ebml(0x1654AE6B, video + _ebml(0xAE, _ebml(0x83, b"\x02") + _ebml(0x86, b"A_OPUS")))
+    cluster_header = (0x1F43B675).to_bytes(4, "big") + (cluster_bytes | 1 << 56).to_bytes(8, "big")
+    segment = info + tracks
+    with open(path, "wb") as fh:
+        fh.write(_ebml(0x1A45DFA3, _ebml(0x4282, b"webm")))
+        fh.write((0x18538067).to_bytes(4, "big") + ((len(segment) + len(cluster_header) + cluster_bytes) | 1 << 56).to_bytes(8, "big"))
+        fh.write(segment + cluster_header)
+        fh.truncate(fh.tell() + cluster_bytes)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--mdat-mb", type=int, default=50, help="sparse media payload per file")
+    parser.add_argument("--ffprobe-sample", type=int, default=100, help="files to time with ffprobe (0 = skip)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        paths = []
+        for i in range(args.files):
+            if i % 2:
+                path = os.path.join(root, f"clip{i}.webm")
+                _write_webm(path, args.mdat_mb << 20)
+            else:
+                path = os.path.join(root, f"clip{i}.mp4")
+                _write_mp4(path, args.mdat_mb << 20)
+            paths.append(path)
+
+        start = time.perf_counter()
+        results = [mediainfo.probe_file(p) for p in paths]
+        elapsed = time.perf_counter() - start
+        assert all(r and r["source"] == "header" and r["height"] for r in results)
+        print(f"header parser: {len(paths)} files in {elapsed:.3f}s ({elapsed / len(paths) * 1e6:.0f} µs/file)")
+
+        ffprobe = toolchain.ffprobe_path()
+        sample = paths[: args.ffprobe_sample]
+        if not ffprobe or not sample:
+            print("ffprobe: skipped (not installed or --ffprobe-sample 0)")
+            return
+        start = time.perf_counter()
+        for path in sample:
+            subprocess.run(
+                [ffprobe, "-v", "error", "-select_streams", "v:0", "-show_entries", "stream=width,height", "-of", "csv=s=x:p=0", path],
+                capture_output=True,
+            )
+        per_file = (time.perf_counter() - start) / len(sample)
+        print(f"ffprobe:       {per_file * 1e6:.0f} µs/file (sample of {len(sample)}), "
+              f"~{per_file * len(paths):.1f}s for all {len(paths)} — {per_file * len(paths) / elapsed:.0f}x slower")
+
+
+if __name__ == "__main__":
+    main()
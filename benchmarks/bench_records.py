@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Benchmark: memory held per playlist — raw info dicts vs. compact records.
+
+Builds N synthetic resolved info dicts shaped like yt-dlp's for a YouTube
+video (formats with URLs, headers and fragments, automatic captions in many
+languages, heatmap, description), then measures with ``tracemalloc`` what
+stays allocated when a playlist of them is kept as
+
+  * the raw info dicts,
+  * the normalized dicts the web API returns,
+  * ``records.VideoRecord`` (dicts produced and dropped one at a time),
+
+and the flat listing as entry dicts vs. ``records.EntryRecord``.
+
+    python benchmarks/bench_records.py --entries 1000 --formats 120
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+from typing import Callable
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from nerd_downloader import records  # noqa: E402
+
+_HEIGHTS = (144, 240, 360, 480, 720, 1080, 1440, 2160)
+_LANGS = ("de", "en", "fr", "es", "it", "nl", "pl", "pt", "ru", "tr", "ja", "ko", "zh-Hans", "ar", "hi")
+
+
+def _token(rng: random.Random, k: int) -> str:
+    return rng.randbytes((k + 1) // 2).hex()[:k]
+
+
+def _info(index: int, formats: int, rng: random.Random) -> dict:
+    video_id = _token(rng, 11)
+    fmts = []
+    for n in range(formats):
+        height = rng.choice(_HEIGHTS)
+        fmts.append({
+            "format_id": str(100 + n),
+            "format_note": f"{height}p",
+            "ext": rng.choice(("mp4", "webm", "m4a")),
+            "height": height,
+            "width": height * 16 // 9,
+            "fps": 30,
+            "vcodec": "avc1.640028",
+            "acodec": "none",
+            "tbr": rng.uniform(100, 8000),
+            "filesize": rng.randint(10**6, 10**9),
+            "protocol": "https",
+            "url": f"https://rr1---sn-{_token(rng, 8)}.googlevideo.com/videoplayback?{_token(rng, 900)}",
+            "http_headers": {"User-Agent": "Mozilla/5.0", "Accept": "*/*", "Accept-Language": "en-us,en;q=0.5"},
+            "fragments": [{"url": _token(rng, 60), "duration": 5.0} for _ in range(rng.randint(0, 20))],
+        })
+    captions = {
+        f"{lang}-{src}": [{"ext": ext, "url": f"https://www.youtube.com/api/timedtext?{_token(rng, 300)}"}
+                          for ext in ("json3", "srv1", "srv2", "srv3", "ttml", "vtt")]
+        for lang in _LANGS for src in _LANGS[:6]
+    }
+    return {
+        "id": video_id,
+        "title": f"Video {index} — {_token(rng, 30)}",
+        "uploader": "Nerd Channel",
+        "channel": "Nerd Channel",
+        "duration": rng.randint(30, 7200),
+        "view_count": rng.randint(0, 10**7),
+        "upload_date": "20240501",
+        "webpage_url": f"https://www.youtube.com/watch?v={video_id}",
+        "extractor_key": "Youtube",
+        "thumbnail": f"https://i.ytimg.com/vi/{video_id}/maxresdefault.jpg",
+        "thumbnails": [{"url": f"https://i.ytimg.com/vi/{video_id}/{n}.jpg", "height": 90 * n} for n in range(40)],
+        "description": _token(rng, 3000),
+        "tags": [_token(rng, 10) for _ in range(30)],
+        "formats": fmts,
+        "automatic_captions": captions,
+        "heatmap": [{"start_time": t, "end_time": t + 1.0, "value": rng.random()} for t in range(100)],
+    }
+
+
+def _entry(index: int, rng: random.Random) -> dict:
+    video_id = _token(rng, 11)
+    return {
+        "_type": "url",
+        "ie_key": "Youtube",
+        "id": video_id,
+        "url": f"https://www.youtube.com/watch?v={video_id}",
+        "title": f"Clip {index} — {_token(rng, 30)}",
+        "uploader": "Nerd Channel",
+        "duration": rng.randint(30, 7200),
+        "thumbnails": [{"url": f"https://i.ytimg.com/vi/{video_id}/hq{n}.jpg", "height": 90 * n} for n in range(4)],
+    }
+
+
+def _held(build: Callable[[], list]) -> tuple[list, int]:
+    """What ``build()``'s result keeps allocated, in bytes."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, held
+
+
+def _mb(n: int) -> str:
+    return f"{n / 1e6:8.2f} MB"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1000, help="videos in the playlist")
+    parser.add_argument("--formats", type=int, default=120, help="formats per video")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    n = args.entries
+
+    def infos():
+        rng = random.Random(args.seed)
+        return (_info(i, args.formats, rng) for i in range(n))
+
+    raw, raw_bytes = _held(lambda: list(infos()))
+    del raw
+    # The normalized dicts without the thumbnail proxy's bookkeeping.
+    as_dicts, dict_bytes = _held(lambda: [{**r.as_dict(), "thumbnail": r.thumbnail_url}
+                                          for r in map(records.VideoRecord.from_info, infos())])
+    del as_dicts
+    recs, rec_bytes = _held(lambda: [records.VideoRecord.from_info(info) for info in infos()])
+
+    print(f"{n:,} resolved videos, {args.formats} formats each")
+    print(f"  raw info dicts:     {_mb(raw_bytes)}")
+    print(f"  normalized dicts:   {_mb(dict_bytes)}  ({raw_bytes / max(dict_bytes, 1):,.0f}x less)")
+    print(f"  VideoRecord:        {_mb(rec_bytes)}  ({raw_bytes / max(rec_bytes, 1):,.0f}x less, "
+          f"{rec_bytes / n:,.0f} B per video)")
+    del recs
+
+    def entries():
+        rng = random.Random(args.seed)
+        return (_entry(i, rng) for i in range(n))
+
+    flat, flat_bytes = _held(lambda: list(entries()))
+    del flat
+    old, old_bytes = _held(lambda: [
+        {"title": e["title"], "id": e["id"], "url": e["url"], "duration": e["duration"]} for e in entries()
+    ])
+    del old
+    compact, compact_bytes = _held(lambda: [
+        records.EntryRecord.from_entry(e, i, e["url"]) for i, e in enumerate(entries(), 1)
+    ])
+    del compact
+
+    print(f"{n:,} flat playlist entries")
+    print(f"  raw entry dicts:    {_mb(flat_bytes)}")
+    print(f"  GUI entry dicts:    {_mb(old_bytes)}")
+    print(f"  EntryRecord:        {_mb(compact_bytes)}  ({compact_bytes / n:,.0f} B per entry)")
+
+
+if __name__ == "__main__":
+    main()
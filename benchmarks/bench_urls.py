@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Benchmark: single-pass URL extraction vs. the old four-pattern scanner.
+
+Builds a synthetic paste of N lines — mostly chatter, some lines carrying one
+or two links in every supported form, with a realistic share of repeats — and
+times ``urls.iter_urls`` (streamed line by line) against the previous
+``findall``-per-pattern implementation on the joined text.
+
+    python benchmarks/bench_urls.py --lines 2000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import re
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from nerd_downloader import urls  # noqa: E402
+
+_FORMS = (
+    "https://www.youtube.com/watch?v={id}&t=42",
+    "https://youtube.com/watch?feature=share&v={id}",
+    "https://youtu.be/{id}?si=abcdef",
+    "https://www.youtube.com/embed/{id}",
+    "https://youtube.com/v/{id}",
+    "https://www.youtube.com/shorts/{id}",
+    "https://music.youtube.com/watch?v={id}&list=RDAMVM{id}",
+    "https://www.youtube.com/playlist?list=PL{id}",
+)
+
+
+def _legacy(text: str) -> list[str]:
+    """``start.extract_youtube_urls`` before the single-pass scanner."""
+    patterns = [
+        r'https?://(?:www\.)?youtube\.com/watch\?v=[\w-]+(?:&[\w=&-]*)?',
+        r'https?://youtu\.be/[\w-]+(?:\?[\w=&-]*)?',
+        r'https?://(?:www\.)?youtube\.com/embed/[\w-]+',
+        r'https?://(?:www\.)?youtube\.com/v/[\w-]+',
+    ]
+    found = []
+    for pattern in patterns:
+        found.extend(re.findall(pattern, text))
+    seen, unique = set(), []
+    for url in found:
+        if 'youtube.com/watch?v=' in url:
+            match = re.search(r'v=([\w-]+)', url)
+            if match:
+                url = f"https://www.youtube.com/watch?v={match.group(1)}"
+        if url not in seen:
+            seen.add(url)
+            unique.append(url)
+    return unique
+
+
+def _corpus(lines: int, link_share: float, distinct: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + "-_"
+    ids = ["".join(rng.choices(alphabet, k=11)) for _ in range(distinct)]
+    words = ["schau", "mal", "hier", "das", "video", "ist", "echt", "gut", "link", "folgt", "danke"]
+    out = []
+    for _ in range(lines):
+        chatter = " ".join(rng.choices(words, k=rng.randint(3, 12)))
+        if rng.random() < link_share:
+            links = " ".join(rng.choice(_FORMS).format(id=rng.choice(ids)) for _ in range(rng.randint(1, 2)))
+            chatter = f"{chatter} {links}"
+        out.append(chatter + "\n")
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--link-share", type=float, default=0.2, help="fraction of lines carrying links")
+    parser.add_argument("--distinct", type=int, default=50_000, help="distinct video IDs in the corpus")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    corpus = _corpus(args.lines, args.link_share, args.distinct, args.seed)
+    text = "".join(corpus)
+    print(f"corpus: {len(corpus):,} lines, {len(text) / 1e6:.1f} MB")
+
+    start = time.perf_counter()
+    fast = sum(1 for _ in urls.iter_urls(corpus))
+    fast_s = time.perf_counter() - start
+    print(f"single pass: {fast:,} URLs in {fast_s:.2f}s ({len(corpus) / fast_s / 1e6:.2f} M lines/s)")
+
+    start = time.perf_counter()
+    legacy = len(_legacy(text))
+    legacy_s = time.perf_counter() - start
+    print(f"legacy:      {legacy:,} URLs in {legacy_s:.2f}s — {legacy_s / fast_s:.1f}x slower, "
+          f"{legacy - fast:,} more because forms of one video stay distinct")
+
+
+if __name__ == "__main__":
+    main()
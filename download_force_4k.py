@@ -11,14 +11,24 @@ import subprocess
 import sys
 from pathlib import Path
 
+from nerd_downloader import toolchain
+
 def check_ffmpeg():
-    """Check if ffmpeg is installed"""
-    try:
-        subprocess.run(['ffmpeg', '-version'], capture_output=True)
+    """Check if ffmpeg is installed (the cached probe if there is one, else a
+    single ``ffmpeg -version`` — not the full toolchain probe)"""
+    probed = toolchain.cached()
+    if probed is not None:
+        found = probed["ffmpeg"]["path"] is not None
+    else:
+        try:
+            subprocess.run(['ffmpeg', '-version'], capture_output=True)
+            found = True
+        except OSError:
+            found = False
+    if found:
         return True
-    except:
-        print("❌ ffmpeg nicht gefunden! Installiere mit: brew install ffmpeg")
-        return False
+    print("❌ ffmpeg nicht gefunden! Installiere mit: brew install ffmpeg")
+    return False
 
 def get_4k_format_string():
     """Return format string for 4K/HD content"""
@@ -7,9 +7,10 @@ DELETES anything below 1080p automatically
 
 import yt_dlp
 import os
-import subprocess
 from pathlib import Path
 
+from nerd_downloader import mediainfo
+
 class StrictHDDownloader:
     """Downloads ONLY HD content, deletes everything else"""
 
@@ -18,21 +19,10 @@ class StrictHDDownloader:
         self.min_height = 1080  # Full HD height
 
     def get_video_resolution(self, filepath):
-        """Get video resolution using ffprobe"""
-        try:
-            cmd = [
-                'ffprobe', '-v', 'error',
-                '-select_streams', 'v:0',
-                '-show_entries', 'stream=width,height',
-                '-of', 'csv=s=x:p=0',
-                filepath
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.stdout:
-                width, height = map(int, result.stdout.strip().split('x'))
-                return width, height
-        except:
-            pass
+        """Get video resolution from the container header (ffprobe only as fallback)"""
+        info = mediainfo.probe_file(filepath)
+        if info and info.get('width') and info.get('height'):
+            return info['width'], info['height']
         return 0, 0
 
     def download_strict_hd(self, url, output_dir=None):
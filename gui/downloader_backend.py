@@ -9,19 +9,19 @@ import threading
 import tempfile
 import json
 import copy
+import functools
 from pathlib import Path
 from typing import Callable, Optional, Dict, Any, List
 import yt_dlp
-from PIL import Image
-from mutagen.easyid3 import EasyID3
-from mutagen.id3 import ID3, APIC
-from mutagen.flac import FLAC, Picture
 
 # Import existing utilities from the CLI version
 import re
 import requests
 import subprocess
 
+from nerd_downloader import bandwidth, config, fragments, records, retry, subtitles, transcode, unavailable
+from nerd_downloader.throughput import ThroughputEstimator
+
 from .progress import ProgressTracker, ThreadSafeGUIUpdater
 
 DEFAULT_USER_AGENT = (
@@ -37,28 +37,48 @@ DEFAULT_HTTP_HEADERS = {
 
 
 class VideoInfo:
-    """Video information class"""
+    """Video information, kept as compact records (see nerd_downloader.records)
+    so a preview doesn't hold on to yt-dlp's full info dict"""
+    __slots__ = ('record', 'description', 'is_playlist', 'entries')
+
+    # Characters of the description that are kept.
+    DESCRIPTION_LIMIT = 500
+
     def __init__(self, info_dict: Dict[str, Any]):
-        self.title = info_dict.get('title', 'Unknown')
-        self.uploader = info_dict.get('uploader', 'Unknown')
-        self.duration = info_dict.get('duration', 0)
-        self.view_count = info_dict.get('view_count', 0)
-        self.url = info_dict.get('webpage_url', '')
-        self.thumbnail = info_dict.get('thumbnail', '')
-        self.description = info_dict.get('description', '')
+        self.record = records.VideoRecord.from_info(info_dict)
+        self.description = (info_dict.get('description') or '')[:self.DESCRIPTION_LIMIT]
         self.is_playlist = 'entries' in info_dict
-        self.entries = []
+        self.entries = tuple(
+            records.EntryRecord.from_entry(
+                entry, i + 1, entry.get('webpage_url') or entry.get('url') or ''
+            )
+            for i, entry in enumerate(info_dict.get('entries') or [])
+            if entry
+        )
 
-        if self.is_playlist:
-            self.entries = [
-                {
-                    'title': entry.get('title', f'Video {i+1}'),
-                    'id': entry.get('id', ''),
-                    'url': entry.get('webpage_url', ''),
-                    'duration': entry.get('duration', 0)
-                }
-                for i, entry in enumerate(info_dict.get('entries', []))
-            ]
+    @property
+    def title(self) -> str:
+        return self.record.title
+
+    @property
+    def uploader(self) -> str:
+        return self.record.uploader or 'Unknown'
+
+    @property
+    def duration(self) -> int:
+        return self.record.duration or 0
+
+    @property
+    def view_count(self) -> int:
+        return self.record.view_count or 0
+
+    @property
+    def url(self) -> str:
+        return self.record.webpage_url or ''
+
+    @property
+    def thumbnail(self) -> str:
+        return self.record.thumbnail_url or ''
 
     def format_duration(self, seconds: int) -> str:
         """Format duration in human-readable format"""
@@ -123,6 +143,11 @@ class DownloadBackend:
 
     def get_video_info(self, url: str) -> Optional[VideoInfo]:
         """Get video information without downloading"""
+        known = unavailable.cache.get(url)
+        if known:
+            self._log(f"Bekannt nicht verfügbar: {known['message']}")
+            return None
+
         try:
             self._log("Hole Video-Informationen...")
 
@@ -159,17 +184,26 @@ class DownloadBackend:
                 'opts': web_fallback
             })
 
+            error_class = None
             for strategy in strategies:
                 try:
                     self._log(f"Versuche Info-Extraktion mit: {strategy['name']}")
-                    with yt_dlp.YoutubeDL(strategy['opts']) as ydl:
-                        info = ydl.extract_info(url, download=False)
-                        self._log(f"✓ Info-Extraktion erfolgreich mit {strategy['name']}")
-                        return VideoInfo(info)
+                    info = retry.call(
+                        functools.partial(self._extract_info_once, url, strategy['opts']),
+                        on_retry=self._log_retry,
+                        on_pause=self._log_pause,
+                    )
+                    self._log(f"✓ Info-Extraktion erfolgreich mit {strategy['name']}")
+                    return VideoInfo(info)
                 except Exception as e:
                     self._log(f"✗ Fehler mit {strategy['name']}: {str(e)}")
+                    error_class = unavailable.classify(e)
+                    if retry.classify(e) == retry.PERMANENT:
+                        break
                     continue
 
+            if error_class:
+                unavailable.cache.put(url, error_class, unavailable.MESSAGES[error_class])
             return None
 
         except Exception as e:
@@ -200,6 +234,9 @@ class DownloadBackend:
 
     def _download_worker(self, url: str, options: DownloadOptions):
         """Download worker function running in separate thread"""
+        # Share the process-wide fragment connection budget with the web app
+        lease = fragments.policy.acquire()
+        share = bandwidth.limiter.register()
         try:
             self._log(f"Starte Download: {url}")
             self._log(f"Ausgabeverzeichnis: {options.output_dir}")
@@ -210,13 +247,37 @@ class DownloadBackend:
             # Build yt-dlp options
             ydl_opts = self._build_ydl_opts(options)
 
+            # Pace against the process-wide bandwidth limit
+            hooks = [share.hook]
+
             # Add progress hook if available
             if self.progress_tracker:
                 self.progress_tracker.reset()
-                ydl_opts['progress_hooks'] = [self.progress_tracker.progress_hook]
+                hooks.append(self.progress_tracker.progress_hook)
+                estimator = self.progress_tracker.estimator
+            else:
+                estimator = ThroughputEstimator()
+                hooks.append(functools.partial(_feed_estimator, estimator))
+
+            # Audio is encoded in the shared transcode pool while the next
+            # playlist entries keep downloading
+            transcoder = self._get_audio_transcoder(options)
+
+            # Subtitles are fetched while the video downloads (not before it)
+            subs = self._get_subtitle_fetcher(options)
 
             # Try download with adaptive fallback strategies
-            success = self._attempt_download_with_fallbacks(url, ydl_opts)
+            success = self._attempt_download_with_fallbacks(
+                url, ydl_opts, transcoder, subs, hooks=hooks, lease=lease, estimator=estimator)
+
+            if success and subs and subs.written:
+                self._log(f"{len(subs.written)} Untertitel-Datei(en) gespeichert")
+
+            if success and transcoder and transcoder.futures:
+                if transcoder.avoided:
+                    self._log(f"{transcoder.avoided} Datei(en) schon im Zielformat - ohne Neukodierung übernommen")
+                self._log(f"Warte auf {len(transcoder.futures)} Audio-Konvertierung(en)...")
+                transcoder.wait()
 
             if success:
                 self._log("Download erfolgreich abgeschlossen!")
@@ -229,10 +290,22 @@ class DownloadBackend:
             self._log(f"Download-Fehler: {error_msg}")
             self._error(error_msg)
         finally:
+            lease.release()
+            share.release()
             self.is_downloading = False
 
-    def _attempt_download_with_fallbacks(self, url: str, base_opts: Dict[str, Any]) -> bool:
+    def _attempt_download_with_fallbacks(self, url: str, base_opts: Dict[str, Any],
+                                         transcoder: Optional[transcode.PooledExtractAudio] = None,
+                                         subs: Optional[subtitles.Sidecars] = None,
+                                         hooks: Optional[List[Callable]] = None,
+                                         lease: Optional[fragments.FragmentLease] = None,
+                                         estimator: Optional[ThroughputEstimator] = None) -> bool:
         """Attempt download with various fallback strategies"""
+        known = unavailable.cache.get(url)
+        if known:
+            self._log(f"Bekannt nicht verfügbar: {known['message']} - kein Versuch")
+            return False
+
         fallback_strategies: List[Dict[str, Any]] = []
 
         # Strategy 1: Android client without cookies (works for most videos)
@@ -259,6 +332,7 @@ class DownloadBackend:
             'opts': web_opts
         })
 
+        error_class = None
         for i, strategy in enumerate(fallback_strategies, 1):
             if not self.is_downloading:  # Check if cancelled
                 return False
@@ -266,8 +340,12 @@ class DownloadBackend:
             try:
                 self._log(f"Versuch {i}/{len(fallback_strategies)}: {strategy['name']}")
 
-                with yt_dlp.YoutubeDL(strategy['opts']) as ydl:
-                    ydl.download([url])
+                retry.call(
+                    functools.partial(self._download_once, url, strategy['opts'], transcoder, subs,
+                                      hooks, lease, estimator),
+                    on_retry=self._log_retry,
+                    on_pause=self._log_pause,
+                )
 
                 self._log(f"✓ Erfolgreich mit {strategy['name']}")
                 return True
@@ -276,16 +354,53 @@ class DownloadBackend:
                 error_msg = str(e)
                 self._log(f"✗ Fehler mit {strategy['name']}: {error_msg}")
 
-                # Don't retry for certain permanent errors
-                if any(keyword in error_msg.lower() for keyword in
-                       ['private video', 'video unavailable', 'removed by user']):
+                # Don't retry for permanent errors; remember them for next time
+                error_class = unavailable.classify(error_msg)
+                if retry.classify(error_msg) == retry.PERMANENT:
                     self._log("Permanenter Fehler erkannt - keine weiteren Versuche")
-                    return False
+                    break
 
                 continue
 
+        if error_class:
+            unavailable.cache.put(url, error_class, unavailable.MESSAGES[error_class])
         return False
 
+    def _extract_info_once(self, url: str, opts: Dict[str, Any]) -> Dict[str, Any]:
+        with yt_dlp.YoutubeDL(opts) as ydl:
+            return ydl.extract_info(url, download=False)
+
+    def _download_once(self, url: str, opts: Dict[str, Any],
+                       transcoder: Optional[transcode.PooledExtractAudio] = None,
+                       subs: Optional[subtitles.Sidecars] = None,
+                       hooks: Optional[List[Callable]] = None,
+                       lease: Optional[fragments.FragmentLease] = None,
+                       estimator: Optional[ThroughputEstimator] = None):
+        # Hooks and logger are added per attempt, not deep-copied with the
+        # strategy opts; the fragment tuning writes into the very dict this
+        # YoutubeDL reads (as in the engine)
+        opts = dict(opts)
+        opts['progress_hooks'] = list(hooks or [])
+        if lease:
+            tuning = fragments.FragmentTuning(opts, estimator or ThroughputEstimator())
+            tuning.start(lease)
+            opts['progress_hooks'].insert(0, tuning.hook)
+            opts['logger'] = fragments.ThrottleLogger(on_throttle=tuning.throttled)
+        with yt_dlp.YoutubeDL(opts) as ydl:
+            if transcoder:
+                ydl.add_post_processor(transcoder, when='post_process')
+            if subs:
+                ydl.add_post_processor(subs, when='before_dl')
+                ydl.add_post_processor(subs, when='after_move')
+            ydl.download([url])
+
+    def _log_retry(self, kind: str, delay: float):
+        reason = "YouTube drosselt" if kind == retry.THROTTLED else "Verbindungsproblem"
+        self._log(f"{reason} - neuer Versuch in {delay:.0f}s")
+
+    def _log_pause(self, seconds: float):
+        self._log(f"Zu viele Drosselungen - alle Downloads pausieren {seconds:.0f}s")
+
     def _build_ydl_opts(self, options: DownloadOptions) -> Dict[str, Any]:
         """Build yt-dlp options dictionary"""
 
@@ -295,12 +410,10 @@ class DownloadBackend:
             'noplaylist': True,
             'retries': 3,
             'fragment_retries': 3,
+            'retry_sleep_functions': retry.YTDLP_SLEEP_FUNCTIONS,  # backoff between yt-dlp's own retries
             'concurrent_fragment_downloads': 1,
             'writeinfojson': False,
             'writedescription': options.include_metadata,
-            'writesubtitles': options.include_subtitles and options.format_type == "video",
-            'writeautomaticsub': options.include_subtitles and options.format_type == "video",
-            'subtitleslangs': ['de', 'en'],
             'ignoreerrors': False,
             'user_agent': DEFAULT_USER_AGENT,
             'http_headers': DEFAULT_HTTP_HEADERS.copy(),
@@ -331,40 +444,53 @@ class DownloadBackend:
         return os.path.join(options.output_dir, "%(title)s.%(ext)s")
 
     def _get_audio_opts(self, options: DownloadOptions) -> Dict[str, Any]:
-        """Get audio-specific yt-dlp options"""
+        """Get audio-specific yt-dlp options
+
+        The conversion itself is not a yt-dlp postprocessor here; see
+        _get_audio_transcoder.
+        """
         opts = {
             'format': 'bestaudio/best',
             'extractaudio': True,
         }
 
-        if options.audio_format == "mp3":
-            opts.update({
-                'audioformat': 'mp3',
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                    'preferredquality': self._get_audio_quality_value(options.audio_quality),
-                }]
-            })
-        elif options.audio_format == "m4a":
-            opts.update({
-                'audioformat': 'm4a',
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'm4a',
-                }]
-            })
-        elif options.audio_format == "flac":
-            opts.update({
-                'audioformat': 'flac',
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'flac',
-                }]
-            })
+        # YouTube serves AAC natively: prefer it so m4a needs no re-encode
+        if options.audio_format == "m4a":
+            opts['format'] = 'bestaudio[ext=m4a]/bestaudio/best'
+
+        if options.audio_format in transcode.CODECS:
+            opts['audioformat'] = options.audio_format
 
         return opts
 
+    def _get_audio_transcoder(self, options: DownloadOptions) -> Optional[transcode.PooledExtractAudio]:
+        """Postprocessor that queues mp3/m4a/flac encodes in the shared pool
+
+        Tags and cover art are written afterwards with mutagen (see
+        nerd_downloader.tagging), not by extra ffmpeg passes.
+        """
+        if options.format_type != "audio" or options.audio_format not in transcode.CODECS:
+            return None
+        quality = None
+        if options.audio_format == "mp3":
+            quality = self._get_audio_quality_value(options.audio_quality)
+        return transcode.PooledExtractAudio(
+            options.audio_format,
+            quality,
+            tags=options.include_metadata,
+            cover=options.include_thumbnail,
+        )
+
+    def _get_subtitle_fetcher(self, options: DownloadOptions) -> Optional[subtitles.Sidecars]:
+        """Fetches the wanted subtitle languages the video actually has
+
+        Tracks come from the shared cache/pool in nerd_downloader.subtitles
+        and are saved next to the video.
+        """
+        if not options.include_subtitles or options.format_type != "video":
+            return None
+        return subtitles.Sidecars(config.SUBTITLE_LANGS)
+
     def _get_video_opts(self, options: DownloadOptions) -> Dict[str, Any]:
         """Get video-specific yt-dlp options"""
         # Video format selection
@@ -380,7 +506,6 @@ class DownloadBackend:
         return {
             'format': video_format,
             'merge_output_format': 'mp4',
-            'embedsubtitles': options.include_subtitles,
         }
 
     def _get_audio_quality_value(self, quality: str) -> str:
@@ -473,6 +598,13 @@ class DownloadBackend:
 
 
 # Utility functions adapted from original CLI version
+def _feed_estimator(estimator: ThroughputEstimator, d: Dict[str, Any]):
+    """Progress hook keeping a job's smoothed speed without a ProgressTracker"""
+    if d.get('status') == 'downloading':
+        total = d.get('total_bytes') or d.get('total_bytes_estimate')
+        estimator.update(d.get('downloaded_bytes') or 0, total, stream=d.get('filename') or '')
+
+
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename for filesystem"""
     return re.sub(r'[\/\\\:\*\?"<>\|]', '_', filename)
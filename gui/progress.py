@@ -7,6 +7,8 @@ import threading
 import time
 from typing import Callable, Optional, Dict, Any
 
+from nerd_downloader.throughput import ThroughputEstimator
+
 
 class ProgressTracker:
     """Real-time progress tracking for yt-dlp downloads"""
@@ -21,6 +23,7 @@ class ProgressTracker:
         self.eta = 0
         self.status = "idle"
         self.filename = ""
+        self.estimator = ThroughputEstimator()
         self.lock = threading.Lock()
 
     def progress_hook(self, d: Dict[str, Any]):
@@ -59,18 +62,16 @@ class ProgressTracker:
         if 'downloaded_bytes' in d:
             self.downloaded_bytes = d['downloaded_bytes']
 
-        # Calculate speed (bytes per second)
-        if 'speed' in d and d['speed']:
-            self.speed = d['speed']
-        else:
-            self.speed = 0
+        # Smoothed speed/ETA (shared estimator with the web app); yt-dlp's raw
+        # instantaneous values only until the first interval is measured
+        self.estimator.update(self.downloaded_bytes, self.total_bytes, stream=self.filename)
+        self.speed = self.estimator.speed or d.get('speed') or 0
 
-        # Calculate ETA
-        if 'eta' in d and d['eta']:
+        eta = self.estimator.eta()
+        if eta is not None:
+            self.eta = eta
+        elif 'eta' in d and d['eta']:
             self.eta = d['eta']
-        elif self.speed > 0 and self.total_bytes > 0:
-            remaining_bytes = self.total_bytes - self.downloaded_bytes
-            self.eta = remaining_bytes / self.speed
         else:
             self.eta = 0
 
@@ -178,35 +179,92 @@ class ProgressTracker:
             self.eta = 0
             self.status = "idle"
             self.filename = ""
+            self.estimator = ThroughputEstimator()
 
 
 class ThreadSafeGUIUpdater:
-    """Thread-safe GUI updater for progress updates"""
+    """
+    Thread-safe GUI updater for progress updates
+
+    Worker threads only overwrite a latest-value slot. A single periodic pump
+    on the Tk main loop (root.after) drains that slot, so at most one callback
+    is ever scheduled and redraws are capped to the pump rate, no matter how
+    often yt-dlp fires its progress hook.
+    """
 
-    def __init__(self, root, update_callback: Callable):
+    # ~30 redraws per second is plenty for a progress bar
+    DEFAULT_INTERVAL_MS = 33
+
+    def __init__(self, root, update_callback: Callable, interval_ms: int = DEFAULT_INTERVAL_MS):
         self.root = root
         self.update_callback = update_callback
-        self.update_queue = []
+        self.interval_ms = interval_ms
         self.lock = threading.Lock()
+        self._latest: Optional[Dict[str, Any]] = None
+        self._after_id = None
+        self._stats = {
+            'received': 0,   # schedule_update calls
+            'merged': 0,     # updates overwritten before they were drawn
+            'delivered': 0,  # updates handed to update_callback
+            'pumps': 0,      # pump ticks on the main loop
+        }
+
+        # Must be created on the Tk main thread, like every other widget call
+        self.start()
 
     def schedule_update(self, progress_info: Dict[str, Any]):
-        """Schedule a GUI update from any thread"""
+        """Schedule a GUI update from any thread (never touches Tk)"""
+        with self.lock:
+            self._stats['received'] += 1
+            if self._latest is not None:
+                self._stats['merged'] += 1
+            self._latest = progress_info
+
+    def start(self):
+        """Start the periodic pump (main thread only)"""
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._pump)
+
+    def stop(self):
+        """Stop the pump; pending updates are flushed once"""
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        self._process_updates()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters showing how many updates were merged instead of drawn"""
         with self.lock:
-            self.update_queue.append(progress_info)
+            stats = dict(self._stats)
+        stats['scheduled_callbacks'] = 1 if self._after_id is not None else 0
+        return stats
 
-        # Schedule the update on the main thread
-        self.root.after_idle(self._process_updates)
+    def _pump(self):
+        """One pump tick: draw the latest update, then re-arm"""
+        self._after_id = None
+        with self.lock:
+            self._stats['pumps'] += 1
+        self._process_updates()
+        try:
+            self._after_id = self.root.after(self.interval_ms, self._pump)
+        except Exception:
+            # Window destroyed - nothing left to update
+            self._after_id = None
 
     def _process_updates(self):
-        """Process all pending updates on the main thread"""
+        """Deliver the latest pending update on the main thread"""
         with self.lock:
-            if self.update_queue:
-                # Get the latest update (discard older ones to avoid lag)
-                latest_update = self.update_queue[-1]
-                self.update_queue.clear()
-
-                # Call the update callback
-                self.update_callback(latest_update)
+            latest_update = self._latest
+            self._latest = None
+            if latest_update is not None:
+                self._stats['delivered'] += 1
+
+        # Call the update callback outside the lock so workers never wait on Tk
+        if latest_update is not None:
+            self.update_callback(latest_update)
 
 
 # Example usage and testing
@@ -2,20 +2,29 @@
 
 Picks a free local port, starts the Flask server bound to 127.0.0.1 (never
 exposed to the network), and opens the browser at the app.
+
+Subcommands run instead of the server:
+  * ``python -m nerd_downloader scan [DIR]``  — check a download folder (``library``)
+  * ``python -m nerd_downloader sync URL...`` — fetch only new uploads (``sync``)
+  * ``python -m nerd_downloader urls [FILE]`` — list the YouTube links in text (``urls``)
+  * ``python -m nerd_downloader batch [FILE]`` — download them headless, JSON lines out (``batch``)
 """
 
 from __future__ import annotations
 
 import os
 import socket
+import sys
 import threading
 import webbrowser
 
-from . import __app_name__, __version__
-from .app import create_app
+from . import __app_name__, __version__, batch, library, sync, urls
+from .app import create_app, resume_interrupted
 
 _PREFERRED_PORTS = (8765, 8766, 8770, 8780, 0)
 
+_COMMANDS = {"batch": batch.main, "scan": library.main, "sync": sync.main, "urls": urls.main}
+
 
 def _find_port() -> int:
     for port in _PREFERRED_PORTS:
@@ -30,6 +39,9 @@ def _find_port() -> int:
 
 
 def main() -> None:
+    if len(sys.argv) > 1 and sys.argv[1] in _COMMANDS:
+        sys.exit(_COMMANDS[sys.argv[1]](sys.argv[2:]))
+
     port = _find_port()
     url = f"http://127.0.0.1:{port}"
 
@@ -41,6 +53,9 @@ def main() -> None:
         threading.Timer(1.0, lambda: webbrowser.open(url)).start()
 
     app = create_app()
+    resumed = resume_interrupted()
+    if resumed:
+        print(f"  ↻  {len(resumed)} unterbrochene(r) Download(s) werden fortgesetzt\n")
     # threaded=True so the SSE stream and API calls run concurrently.
     app.run(host="127.0.0.1", port=port, threaded=True, use_reloader=False)
 
@@ -1,13 +1,35 @@
 """Flask app for Nerd Downloader.
 
 Routes (all JSON except the SSE stream and the static index):
-  GET  /                     -> the single-page UI
-  GET  /api/meta             -> app name, version, default folder, format presets
+  GET  /                     -> the single-page UI (references content-hashed assets)
+  GET  /static/<name>        -> precompressed assets; hashed names are immutable
+  GET  /api/meta             -> app name, version, default folder, format presets,
+                                ffmpeg/ffprobe toolchain
+  POST /api/meta/refresh     -> re-probe ffmpeg/ffprobe (e.g. after installing)
   POST /api/info             -> {url} -> normalized video metadata
-  POST /api/download         -> {url, format, output_dir} -> {job_id}
+  POST /api/info/bulk        -> {urls | text} -> NDJSON (or SSE) with one result per
+                                link as soon as it is extracted
+  GET  /api/unavailable      -> videos known to be private/removed/age-restricted
+  POST /api/unavailable      -> {urls} -> which of them are known-unavailable
+  DELETE /api/unavailable    -> {url} -> forget one, so it is tried again
+  GET  /api/thumb/<id>       -> the video's thumbnail, resized (?w=160..640) and
+                                cached; WebP or JPEG, immutable with ETag
+  POST /api/playlist         -> {url, page_size?, start?, limit?} -> NDJSON (or SSE
+                                with Accept: text/event-stream) pages of flat entries
+  POST /api/download         -> {url, format, output_dir, weight?, subtitles?} -> {job_id};
+                                subtitles: true (NERDDL_SUBTITLE_LANGS) or ["de", ...]
   GET  /api/progress/<id>    -> Server-Sent Events stream of progress
+  GET  /api/resume           -> downloads picked up again after a restart
   POST /api/choose-folder    -> native macOS folder picker -> {path}
   POST /api/reveal           -> reveal a path in Finder
+  GET  /api/bandwidth        -> global limit + per-job shares
+  POST /api/bandwidth        -> {limit?, job_id?, weight?} -> change at runtime
+  GET  /api/pipeline         -> fetch/ffmpeg stage and transcode pool queue depths,
+                                429 circuit-breaker state, disk-space reservations
+  POST /api/sync             -> {url, initial?, mark?} -> entries new since the last
+                                sync; mark=true records them as taken
+  POST /api/library/scan     -> {path?, min_height?} -> folder report (partials,
+                                truncated files, below-HD, duplicates)
 """
 
 from __future__ import annotations
@@ -15,22 +37,59 @@ from __future__ import annotations
 import json
 import os
 import threading
+from typing import Sequence
 from urllib.parse import urlparse
 
-from flask import Flask, Response, jsonify, request, send_from_directory
+from flask import Flask, Response, abort, jsonify, redirect, request
 
-from . import __app_name__, __version__, engine, macos
+from . import (
+    __app_name__,
+    __version__,
+    assets,
+    bandwidth,
+    config,
+    diskspace,
+    engine,
+    library,
+    macos,
+    pipeline,
+    resume,
+    retry,
+    subtitles,
+    sync,
+    thumbs,
+    toolchain,
+    unavailable,
+    urls,
+)
 from .jobs import manager
+from .throughput import registry
 
 _STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
 
+# Links per /api/info/bulk request.
+_BULK_LIMIT = 500
+
 
 def create_app() -> Flask:
-    app = Flask(__name__, static_folder=_STATIC_DIR, static_url_path="/static")
+    app = Flask(__name__, static_folder=None)
+    # Read, hashed and compressed once; see ``assets``.
+    bundle = assets.AssetBundle(_STATIC_DIR)
+    # Probe ffmpeg once, off the startup path; /api/meta waits for it if needed.
+    threading.Thread(target=toolchain.probe, daemon=True).start()
 
     @app.get("/")
     def index() -> Response:
-        return send_from_directory(_STATIC_DIR, "index.html")
+        if bundle.index is None:
+            abort(404)
+        return bundle.index.response(request, assets.REVALIDATE)
+
+    @app.get("/static/<path:name>")
+    def static_asset(name: str) -> Response:
+        response = bundle.serve(name, request)
+        if response is None:
+            abort(404)
+        return response
 
     @app.get("/api/meta")
     def meta():
@@ -42,9 +101,15 @@ def create_app() -> Flask:
                 "home": os.path.expanduser("~"),
                 "is_mac": macos.IS_MAC,
                 "formats": engine.format_presets_for_ui(),
+                "toolchain": toolchain.snapshot(),
             }
         )
 
+    @app.post("/api/meta/refresh")
+    def meta_refresh():
+        toolchain.probe(refresh=True)
+        return jsonify(toolchain.snapshot())
+
     @app.post("/api/info")
     def info():
         url = (request.get_json(silent=True) or {}).get("url", "")
@@ -54,7 +119,129 @@ def create_app() -> Flask:
         try:
             return jsonify(engine.extract_info(url.strip()))
         except engine.EngineError as exc:
-            return jsonify({"error": exc.user_message}), 502
+            return jsonify({"error": exc.user_message, "unavailable": unavailable.cache.get(url)}), 502
+
+    @app.post("/api/info/bulk")
+    def info_bulk():
+        payload = request.get_json(silent=True) or {}
+        if isinstance(payload.get("text"), str):
+            links = urls.extract(payload["text"])
+        elif isinstance(payload.get("urls"), list):
+            links = [str(u).strip() for u in payload["urls"]]
+        else:
+            return jsonify({"error": "Bitte Links als Liste (urls) oder Text (text) senden."}), 400
+        if not links:
+            return jsonify({"error": "Keine YouTube-Links gefunden."}), 400
+        if len(links) > _BULK_LIMIT:
+            return jsonify({"error": f"Höchstens {_BULK_LIMIT} Links auf einmal."}), 400
+
+        def generate():
+            yield {"type": "start", "total": len(links), "urls": links}
+            ok = failed = 0
+            valid = []
+            for index, link in enumerate(links):
+                good, error = _validate_url(link)
+                if good:
+                    valid.append(index)
+                else:
+                    failed += 1
+                    yield {"type": "error", "index": index, "url": link, "message": error}
+            results = engine.extract_many(links[i] for i in valid)
+            try:
+                for position, info, error in results:
+                    index = valid[position]
+                    if error is None:
+                        ok += 1
+                        yield {"type": "info", "index": index, "url": links[index], "info": info}
+                    else:
+                        failed += 1
+                        yield {
+                            "type": "error",
+                            "index": index,
+                            "url": links[index],
+                            "message": error,
+                            "unavailable": unavailable.cache.get(links[index]),
+                        }
+            finally:
+                results.close()  # client gone: drop lookups that haven't started
+            yield {"type": "done", "total": len(links), "ok": ok, "failed": failed}
+
+        return _event_stream(generate())
+
+    @app.get("/api/unavailable")
+    def unavailable_list():
+        return jsonify({"entries": unavailable.cache.snapshot()})
+
+    @app.post("/api/unavailable")
+    def unavailable_check():
+        links = (request.get_json(silent=True) or {}).get("urls")
+        if not isinstance(links, list):
+            return jsonify({"error": "Bitte Links als Liste (urls) senden."}), 400
+        known = {}
+        for link in links[:_BULK_LIMIT]:
+            entry = unavailable.cache.get(str(link))
+            if entry:
+                known[link] = entry
+        return jsonify({"known": known})
+
+    @app.delete("/api/unavailable")
+    def unavailable_forget():
+        url = (request.get_json(silent=True) or {}).get("url", "")
+        return jsonify({"ok": unavailable.cache.forget(str(url))})
+
+    @app.get("/api/thumb/<video_id>")
+    def thumb(video_id: str):
+        if not thumbs.valid_id(video_id):
+            return jsonify({"error": "Unbekanntes Video."}), 404
+        if not thumbs.available():
+            return redirect(thumbs.cache.source(video_id))
+        fmt = "webp" if "image/webp" in request.headers.get("Accept", "") else "jpeg"
+        found = thumbs.cache.get(video_id, thumbs.width_for(request.args.get("w", type=int)), fmt)
+        if found is None:
+            return jsonify({"error": "Vorschaubild nicht verfügbar."}), 404
+        data, etag = found
+        response = Response(data, mimetype=thumbs.mimetype(fmt))
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        response.vary.add("Accept")
+        return response.make_conditional(request)
+
+    @app.post("/api/playlist")
+    def playlist():
+        payload = request.get_json(silent=True) or {}
+        url = payload.get("url", "")
+        ok, error = _validate_url(url)
+        if not ok:
+            return jsonify({"error": error}), 400
+        try:
+            page_size = min(500, max(1, int(payload.get("page_size") or 50)))
+            start = max(1, int(payload.get("start") or 1))
+            limit = int(payload["limit"]) if payload.get("limit") else None
+        except (TypeError, ValueError):
+            return jsonify({"error": "Ungültige Seitenangaben."}), 400
+
+        def generate():
+            page: list[dict] = []
+            pages = count = 0
+            try:
+                for kind, item in engine.iter_playlist(url.strip(), start=start, limit=limit):
+                    if kind == "playlist":
+                        yield {"type": "playlist", **item}
+                        continue
+                    page.append(item)
+                    count += 1
+                    if len(page) >= page_size:
+                        pages += 1
+                        yield {"type": "page", "page": pages, "entries": page}
+                        page = []
+                if page:
+                    pages += 1
+                    yield {"type": "page", "page": pages, "entries": page}
+                yield {"type": "done", "count": count, "pages": pages}
+            except engine.EngineError as exc:
+                yield {"type": "error", "message": exc.user_message}
+
+        return _event_stream(generate())
 
     @app.post("/api/download")
     def download():
@@ -65,16 +252,38 @@ def create_app() -> Flask:
             return jsonify({"error": error}), 400
         fmt = payload.get("format", "best")
         output_dir = payload.get("output_dir") or engine.DEFAULT_OUTPUT_DIR
+        try:
+            weight = bandwidth.parse_weight(payload.get("weight", 1.0))
+        except (TypeError, ValueError):
+            return jsonify({"error": "Ungültige Gewichtung."}), 400
+        wanted = payload.get("subtitles")
+        if wanted is True:
+            langs = config.SUBTITLE_LANGS
+        elif isinstance(wanted, list):
+            langs = subtitles.parse_langs(wanted)
+        elif not wanted:
+            langs = []
+        else:
+            return jsonify({"error": "Untertitel bitte als Liste von Sprachcodes senden."}), 400
 
         job = manager.create()
         thread = threading.Thread(
             target=_run_download,
-            args=(job.id, url.strip(), fmt, output_dir),
+            args=(job.id, url.strip(), fmt, output_dir, weight, langs),
             daemon=True,
         )
         thread.start()
         return jsonify({"job_id": job.id})
 
+    @app.get("/api/resume")
+    def resumed():
+        jobs = [
+            {k: entry[k] for k in ("job_id", "url", "format", "output_dir")}
+            for entry in resume.default_store.pending()
+            if manager.get(entry["job_id"]) is not None
+        ]
+        return jsonify({"jobs": jobs})
+
     @app.get("/api/progress/<job_id>")
     def progress(job_id: str):
         if manager.get(job_id) is None:
@@ -107,15 +316,138 @@ def create_app() -> Flask:
         path = (request.get_json(silent=True) or {}).get("path", "")
         return jsonify({"ok": macos.reveal_in_finder(path)})
 
+    @app.get("/api/bandwidth")
+    def bandwidth_state():
+        return jsonify(bandwidth.limiter.snapshot())
+
+    @app.post("/api/bandwidth")
+    def bandwidth_update():
+        payload = request.get_json(silent=True) or {}
+        # Validate everything before changing anything.
+        try:
+            limit = bandwidth.parse_rate(payload["limit"]) if "limit" in payload else None
+            weight = None
+            if payload.get("job_id") and "weight" in payload:
+                weight = bandwidth.parse_weight(payload["weight"])
+        except (TypeError, ValueError):
+            return jsonify({"error": "Ungültiges Limit oder Gewichtung."}), 400
+        if weight is not None and not bandwidth.limiter.set_weight(payload["job_id"], weight):
+            return jsonify({"error": "Unbekannter Job."}), 404
+        if "limit" in payload:
+            bandwidth.limiter.set_limit(limit)
+        return jsonify(bandwidth.limiter.snapshot())
+
+    @app.get("/api/pipeline")
+    def pipeline_state():
+        return jsonify(
+            {**pipeline.snapshot(), "throttle": retry.breaker.snapshot(), "disk": diskspace.admission.snapshot()}
+        )
+
+    @app.post("/api/sync")
+    def sync_check():
+        payload = request.get_json(silent=True) or {}
+        url = payload.get("url", "")
+        ok, error = _validate_url(url)
+        if not ok:
+            return jsonify({"error": error}), 400
+        try:
+            initial = int(payload["initial"]) if payload.get("initial") else None
+        except (TypeError, ValueError):
+            return jsonify({"error": "Ungültige Anzahl."}), 400
+        try:
+            result = sync.check(url.strip(), initial_limit=initial)
+        except engine.EngineError as exc:
+            return jsonify({"error": exc.user_message}), 502
+        if payload.get("mark"):
+            sync.commit(result)
+        return jsonify(result)
+
+    @app.post("/api/library/scan")
+    def library_scan():
+        payload = request.get_json(silent=True) or {}
+        path = payload.get("path") or engine.DEFAULT_OUTPUT_DIR
+        try:
+            min_height = int(payload.get("min_height") or 1080)
+        except (TypeError, ValueError):
+            return jsonify({"error": "Ungültige Mindesthöhe."}), 400
+        try:
+            return jsonify(library.scan(path, min_height=min_height))
+        except NotADirectoryError:
+            return jsonify({"error": "Ordner nicht gefunden."}), 404
+
     return app
 
 
-def _run_download(job_id: str, url: str, fmt: str, output_dir: str) -> None:
+def _event_stream(events) -> Response:
+    """Stream event dicts as NDJSON, or as SSE when the client asks for
+    ``text/event-stream``. If the client goes away, closing the response
+    closes ``events`` (and whatever it holds open)."""
+    sse = "text/event-stream" in request.headers.get("Accept", "")
+
+    def generate():
+        try:
+            for event in events:
+                line = json.dumps(event)
+                yield f"data: {line}\n\n" if sse else line + "\n"
+        finally:
+            events.close()
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def resume_interrupted() -> list[str]:
+    """Restart the downloads a previous process was killed in the middle of;
+    returns their job IDs."""
+    started = []
+    for entry in resume.default_store.pending():
+        if manager.get(entry["job_id"]) is not None:
+            continue
+        job = manager.create(entry["job_id"])
+        thread = threading.Thread(
+            target=_run_download,
+            args=(
+                job.id,
+                entry["url"],
+                entry["format"],
+                entry["output_dir"],
+                entry.get("weight", 1.0),
+                entry.get("subtitle_langs") or [],
+            ),
+            daemon=True,
+        )
+        thread.start()
+        started.append(job.id)
+    return started
+
+
+def _run_download(
+    job_id: str, url: str, fmt: str, output_dir: str, weight: float = 1.0, subtitle_langs: Sequence[str] = ()
+) -> None:
     def cb(event: dict) -> None:
+        if event.get("status") == "downloading":
+            # Batch-wide speed/ETA across all concurrent jobs.
+            event = {**event, "batch": registry.snapshot()}
         manager.publish(job_id, {"type": "progress", **event})
 
+    estimator = registry.start(job_id)
+    share = bandwidth.limiter.register(job_id, weight)
+    # Dropped when this function returns; kept only if the process dies.
+    checkpoint = resume.Checkpoint(job_id, url, fmt, output_dir, weight, subtitle_langs)
     try:
-        result = engine.download(url, format_id=fmt, output_dir=output_dir, progress_cb=cb)
+        result = engine.download(
+            url,
+            format_id=fmt,
+            output_dir=output_dir,
+            progress_cb=cb,
+            estimator=estimator,
+            share=share,
+            checkpoint=checkpoint,
+            subtitle_langs=subtitle_langs,
+        )
         manager.finish(
             job_id,
             {
@@ -129,6 +461,10 @@ def _run_download(job_id: str, url: str, fmt: str, output_dir: str) -> None:
         manager.finish(job_id, {"type": "error", "message": exc.user_message})
     except Exception:  # noqa: BLE001 — never leave the stream hanging
         manager.finish(job_id, {"type": "error", "message": "Unerwarteter Fehler beim Download."})
+    finally:
+        checkpoint.done()
+        share.release()
+        registry.finish(job_id)
 
 
 def _validate_url(url: str) -> tuple[bool, str]:
@@ -0,0 +1,111 @@
+"""Static assets, fingerprinted and precompressed once at startup.
+
+The UI is three files. Instead of ``send_from_directory`` re-reading and
+re-sending them on every page load, ``AssetBundle`` reads the static folder
+once and keeps, per file:
+
+  * a content-hashed name (``app.3f9c2a1b7e.js``) that ``index.html`` is
+    rewritten to reference — those URLs never change content, so they are
+    served ``Cache-Control: immutable`` and the browser keeps them for good;
+  * gzip and, if the ``brotli`` module is installed, brotli variants of text
+    files, picked by ``Accept-Encoding``;
+  * an ETag per variant, so ``index.html`` (``no-cache``: it must pick up new
+    hashes) and the unhashed names revalidate with a bodiless 304.
+
+Edits to the static folder take effect on the next server start.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import os
+from typing import Optional
+
+from flask import Request, Response
+
+try:
+    import brotli
+except ImportError:  # optional; gzip covers every browser
+    brotli = None
+
+# File types worth compressing.
+_TEXT_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+
+class Asset:
+    """One file: its bodies per content-encoding and their ETags."""
+
+    def __init__(self, name: str, data: bytes) -> None:
+        self.name = name
+        self.digest = hashlib.sha256(data).hexdigest()[:10]
+        stem, ext = os.path.splitext(name)
+        self.hashed = f"{stem}.{self.digest}{ext}"
+        self.mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        self.bodies = {"identity": data}
+        if self.mimetype.startswith(_TEXT_TYPES):
+            self.bodies["gzip"] = gzip.compress(data, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.bodies["br"] = brotli.compress(data, quality=11)
+
+    def response(self, request: Request, cache_control: str) -> Response:
+        encoding = "identity"
+        for candidate in ("br", "gzip"):
+            if candidate in self.bodies and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+        response = Response(self.bodies[encoding], mimetype=self.mimetype)
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+        response.set_etag(f"{self.digest}-{encoding}")
+        response.headers["Cache-Control"] = cache_control
+        response.vary.add("Accept-Encoding")
+        return response.make_conditional(request)
+
+
+class AssetBundle:
+    """Everything in ``directory``, with ``index.html`` pointing at the
+    hashed names."""
+
+    def __init__(self, directory: str, prefix: str = "/static/") -> None:
+        self.directory = directory
+        self.prefix = prefix
+        self._assets: dict[str, Asset] = {}
+        self._hashed: dict[str, Asset] = {}
+        self.index: Optional[Asset] = None
+        self._build()
+
+    def _build(self) -> None:
+        index = None
+        for entry in sorted(os.scandir(self.directory), key=lambda e: e.name):
+            if not entry.is_file():
+                continue
+            with open(entry.path, "rb") as fh:
+                data = fh.read()
+            if entry.name == "index.html":
+                index = data.decode("utf-8")
+                continue
+            asset = Asset(entry.name, data)
+            self._assets[asset.name] = asset
+            self._hashed[asset.hashed] = asset
+        if index is not None:
+            for asset in self._assets.values():
+                for quote in ('"', "'"):
+                    index = index.replace(f"{quote}{self.prefix}{asset.name}{quote}", f"{quote}{self.prefix}{asset.hashed}{quote}")
+            self.index = Asset("index.html", index.encode("utf-8"))
+
+    def url(self, name: str) -> str:
+        asset = self._assets.get(name)
+        return f"{self.prefix}{asset.hashed if asset else name}"
+
+    def serve(self, name: str, request: Request) -> Optional[Response]:
+        """Response for ``/static/<name>``; None if there is no such file."""
+        if name in self._hashed:
+            return self._hashed[name].response(request, IMMUTABLE)
+        if name in self._assets:
+            return self._assets[name].response(request, REVALIDATE)
+        return None
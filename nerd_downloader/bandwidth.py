@@ -0,0 +1,175 @@
+"""Process-wide bandwidth limit, shared by all concurrent downloads.
+
+A static ``ratelimit`` per ``YoutubeDL`` can't share a link fairly: it doesn't
+know how many other jobs run, and it can't change while a download is going.
+Here every job registers a ``BandwidthShare`` with a weight; the global limit
+is split across the active shares by weight and re-split whenever a job starts
+or finishes or the limit is changed at runtime.
+
+Each share is a token bucket. It is drained from yt-dlp's progress hook, which
+runs on the downloading thread, so sleeping there paces the transfer exactly
+like yt-dlp's own ``ratelimit`` does.
+"""
+
+from __future__ import annotations
+
+import itertools
+import math
+import os
+import threading
+import time
+from typing import Optional, Union
+
+from yt_dlp.utils import parse_bytes
+
+# Bucket depth in seconds of the share's rate: enough to absorb a block burst,
+# small enough that a newly lowered limit takes effect almost immediately.
+_BURST_SECONDS = 0.5
+
+_counter = itertools.count(1)
+
+
+def parse_rate(value: Union[None, int, float, str]) -> Optional[int]:
+    """``"5M"``/``"800K"``/``1048576`` -> bytes per second; empty/0 -> unlimited (None)."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        if not math.isfinite(value):
+            raise ValueError(f"Ungültiges Limit: {value!r}")
+        rate = int(value)
+    else:
+        rate = parse_bytes(value.strip())
+        if rate is None:
+            raise ValueError(f"Ungültiges Limit: {value!r}")
+    return rate if rate > 0 else None
+
+
+def parse_weight(value: Union[int, float, str]) -> float:
+    """A share's weight; must be a positive, finite number."""
+    weight = float(value)
+    if not math.isfinite(weight) or weight <= 0:
+        raise ValueError(f"Ungültige Gewichtung: {value!r}")
+    return weight
+
+
+class BandwidthShare:
+    """One job's token bucket."""
+
+    def __init__(self, limiter: "BandwidthLimiter", key: str, weight: float) -> None:
+        self._limiter = limiter
+        self.key = key
+        self.weight = weight
+        self.rate: Optional[float] = None
+        self._tokens = 0.0
+        self._stamp = time.monotonic()
+        self._seen: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def hook(self, d: dict) -> None:
+        """yt-dlp progress hook: pace the calling download thread."""
+        if d.get("status") == "downloading":
+            self.update(d.get("downloaded_bytes") or 0, d.get("filename") or "")
+
+    def update(self, downloaded: int, stream: str = "") -> None:
+        """Account a stream's cumulative byte counter and sleep if over budget."""
+        with self._lock:
+            previous = self._seen.get(stream, 0)
+            self._seen[stream] = downloaded
+            delta = downloaded - previous if downloaded >= previous else downloaded
+        self.consume(delta)
+
+    def consume(self, nbytes: int) -> None:
+        if nbytes <= 0 or self.rate is None:
+            return
+        with self._lock:
+            rate = self.rate
+            if rate is None:
+                return
+            now = time.monotonic()
+            capacity = rate * _BURST_SECONDS
+            self._tokens = min(capacity, self._tokens + (now - self._stamp) * rate)
+            self._stamp = now
+            self._tokens -= nbytes
+            wait = -self._tokens / rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+    def release(self) -> None:
+        self._limiter._unregister(self)
+
+    def _set_rate(self, rate: Optional[float]) -> None:
+        with self._lock:
+            if rate is not None and self.rate is None:
+                self._tokens, self._stamp = 0.0, time.monotonic()
+            self.rate = rate
+
+
+class BandwidthLimiter:
+    def __init__(self, limit: Optional[int] = None) -> None:
+        self._limit = limit
+        self._shares: dict[str, BandwidthShare] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> Optional[int]:
+        return self._limit
+
+    def register(self, key: Optional[str] = None, weight: float = 1.0) -> BandwidthShare:
+        share = BandwidthShare(self, key or f"anon-{next(_counter)}", max(float(weight), 0.01))
+        with self._lock:
+            self._shares[share.key] = share
+            self._rebalance()
+        return share
+
+    def set_limit(self, limit: Optional[int]) -> None:
+        """Change the global limit (bytes/s, None = unlimited) for running jobs too."""
+        with self._lock:
+            self._limit = limit
+            self._rebalance()
+
+    def set_weight(self, key: str, weight: float) -> bool:
+        """Reweight job ``key``; False if there is no such job. Raises
+        ``ValueError`` for weights that aren't positive and finite."""
+        weight = parse_weight(weight)
+        with self._lock:
+            share = self._shares.get(key)
+            if share is None:
+                return False
+            share.weight = max(float(weight), 0.01)
+            self._rebalance()
+            return True
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "limit": self._limit,
+                "jobs": [
+                    {"key": s.key, "weight": s.weight, "rate": s.rate}
+                    for s in self._shares.values()
+                ],
+            }
+
+    def _unregister(self, share: BandwidthShare) -> None:
+        with self._lock:
+            if self._shares.get(share.key) is share:
+                del self._shares[share.key]
+                self._rebalance()
+
+    def _rebalance(self) -> None:
+        total_weight = sum(s.weight for s in self._shares.values())
+        for share in self._shares.values():
+            if self._limit is None or not total_weight:
+                share._set_rate(None)
+            else:
+                share._set_rate(self._limit * share.weight / total_weight)
+
+
+def _initial_limit() -> Optional[int]:
+    try:
+        return parse_rate(os.environ.get("NERDDL_BANDWIDTH"))
+    except ValueError:
+        return None
+
+
+# Module-level singleton: one link, one budget for the whole process.
+limiter = BandwidthLimiter(_initial_limit())
@@ -0,0 +1,226 @@
+"""Headless batch downloads: URLs in, JSON lines out — for cron and scripts.
+
+Reads text from files or stdin, picks out the YouTube links (``urls``) and
+runs each through ``engine.download`` — the same engine, pipeline stages and
+bandwidth limit as the web app. ``--jobs`` sets how many download at once;
+the thread pool is a little larger so finished downloads can merge while the
+next ones already load.
+
+Every line on stdout is one JSON object with a ``type``:
+
+  * ``queued``   — ``{index, url}``
+  * ``progress`` — ``{index, url, status, percent, speed, eta, …, batch}``
+    (``downloading`` at most every ``--interval`` seconds per job, plus
+    ``processing``/``queued`` stage changes)
+  * ``done``     — ``{index, url, title, filepath, elapsed}``
+  * ``error``    — ``{index, url, message}`` (safe ``user_message`` text)
+  * ``summary``  — ``{total, ok, failed, elapsed, interrupted}``, always last
+
+Exit status: 0 all downloads succeeded (or there was nothing to do), 1 at
+least one failed, 2 usage error, 130 interrupted. Ctrl+C and SIGTERM drop
+the queued links and stop running downloads at their next progress update;
+the summary is still written.
+
+CLI: ``python -m nerd_downloader batch [FILE ...] [--jobs N] [--format F]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Optional
+
+from . import bandwidth, config, engine, pipeline, urls
+from .throughput import registry
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+
+class _Emitter:
+    """Writes one JSON object per line; safe to call from worker threads."""
+
+    def __init__(self, stream: IO[str]) -> None:
+        self._stream = stream
+        self._lock = threading.Lock()
+
+    def __call__(self, kind: str, **fields) -> None:
+        line = json.dumps({"type": kind, "ts": round(time.time(), 3), **fields})
+        with self._lock:
+            self._stream.write(line + "\n")
+            self._stream.flush()
+
+
+def run(
+    lines,
+    *,
+    jobs: int,
+    format_id: str = "best",
+    output_dir: Optional[str] = None,
+    interval: float = 1.0,
+    emit: Optional[_Emitter] = None,
+) -> dict:
+    """Download every URL found in ``lines``; returns the summary dict.
+
+    URLs are submitted as they are read, but never more than ``2 * jobs``
+    ahead of the downloads, so a huge input file is not held in memory.
+    """
+    emit = emit or _Emitter(sys.stdout)
+    # The fetch stage is process-wide; give it back as it was.
+    previous = pipeline.fetch.limit
+    pipeline.fetch.set_limit(jobs)
+    try:
+        return _run(lines, jobs, format_id, output_dir, interval, emit)
+    finally:
+        pipeline.fetch.set_limit(previous)
+
+
+def _run(lines, jobs: int, format_id: str, output_dir: Optional[str], interval: float, emit: _Emitter) -> dict:
+    counts = {"total": 0, "ok": 0, "failed": 0}
+    lock = threading.Lock()
+    ahead = threading.Semaphore(2 * jobs)
+    started = time.monotonic()
+    interrupted = False
+    stop = threading.Event()
+
+    def work(index: int, url: str) -> None:
+        try:
+            if stop.is_set():
+                return
+            ok = _download(index, url, format_id, output_dir, interval, emit, stop)
+        finally:
+            ahead.release()
+        with lock:
+            counts["ok" if ok else "failed"] += 1
+
+    pool = ThreadPoolExecutor(jobs + config.POSTPROCESS_WORKERS, thread_name_prefix="batch")
+    try:
+        for index, url in enumerate(urls.iter_urls(lines), 1):
+            ahead.acquire()
+            counts["total"] = index
+            emit("queued", index=index, url=url)
+            pool.submit(work, index, url)
+        # Most of a batch is spent here, waiting for the last downloads.
+        pool.shutdown(wait=True)
+    except KeyboardInterrupt:
+        interrupted = True
+        stop.set()
+        try:
+            pool.shutdown(wait=True, cancel_futures=True)
+        except KeyboardInterrupt:
+            # Pressed again: stop waiting; the workers still wind down.
+            pass
+
+    summary = {**counts, "elapsed": round(time.monotonic() - started, 3), "interrupted": interrupted}
+    emit("summary", **summary)
+    return summary
+
+
+def _download(
+    index: int,
+    url: str,
+    format_id: str,
+    output_dir: Optional[str],
+    interval: float,
+    emit: _Emitter,
+    stop: threading.Event,
+) -> bool:
+    job_id = f"batch-{index}"
+    last = 0.0
+
+    def progress(event: dict) -> None:
+        nonlocal last
+        if stop.is_set():
+            # Raised inside yt-dlp's hook, this aborts the running download.
+            raise KeyboardInterrupt
+        if event.get("status") == "downloading":
+            now = time.monotonic()
+            if now - last < interval:
+                return
+            last = now
+            event = {**event, "batch": registry.snapshot()}
+        emit("progress", index=index, url=url, **event)
+
+    started = time.monotonic()
+    estimator = registry.start(job_id)
+    share = bandwidth.limiter.register(job_id)
+    try:
+        result = engine.download(
+            url,
+            format_id=format_id,
+            output_dir=output_dir,
+            progress_cb=progress,
+            estimator=estimator,
+            share=share,
+        )
+    except engine.EngineError as exc:
+        emit("error", index=index, url=url, message=exc.user_message)
+        return False
+    except Exception:  # noqa: BLE001 — one broken job must not end the batch
+        emit("error", index=index, url=url, message="Unerwarteter Fehler beim Download.")
+        return False
+    finally:
+        share.release()
+        registry.finish(job_id)
+    emit(
+        "done",
+        index=index,
+        url=url,
+        title=result.get("title"),
+        filepath=result.get("filepath"),
+        elapsed=round(time.monotonic() - started, 3),
+    )
+    return True
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m nerd_downloader batch",
+        description="Links aus Dateien/stdin ohne Browser laden; Ausgabe als JSON-Zeilen.",
+    )
+    parser.add_argument("files", nargs="*", default=["-"], metavar="FILE", help="Textdateien mit Links (- = stdin)")
+    parser.add_argument("--jobs", "-j", type=int, default=config.FETCH_WORKERS, help="gleichzeitige Downloads")
+    parser.add_argument("--format", default="best", choices=list(engine.FORMAT_PRESETS))
+    parser.add_argument("--output", default=engine.DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--interval", type=float, default=1.0, metavar="SEK", help="Mindestabstand der Fortschrittszeilen pro Job")
+    parser.add_argument("--limit", default=None, help="Bandbreiten-Limit, z. B. 5M")
+    args = parser.parse_args(argv)
+
+    if args.jobs < 1:
+        parser.error("--jobs muss mindestens 1 sein")
+    for path in args.files:
+        if path != "-" and not os.path.isfile(path):
+            parser.error(f"Datei nicht gefunden: {path}")
+    if args.limit is not None:
+        try:
+            bandwidth.limiter.set_limit(bandwidth.parse_rate(args.limit))
+        except ValueError:
+            parser.error(f"Ungültiges Limit: {args.limit}")
+
+    # cron and service managers stop jobs with SIGTERM; treat it like Ctrl+C.
+    previous = signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        summary = run(
+            urls.iter_sources(args.files),
+            jobs=args.jobs,
+            format_id=args.format,
+            output_dir=args.output,
+            interval=args.interval,
+        )
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+    if summary["interrupted"]:
+        return EXIT_INTERRUPTED
+    return EXIT_FAILED if summary["failed"] else EXIT_OK
+
+
+def _interrupt(signum, frame) -> None:
+    raise KeyboardInterrupt
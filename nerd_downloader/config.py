@@ -0,0 +1,68 @@
+"""Runtime tunables, read from ``NERDDL_*`` environment variables.
+
+Everything here has a sensible default, so the app works without any
+configuration; the variables exist for power users and for the launcher.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+
+def env_int(name: str, default: int, minimum: Optional[int] = None) -> int:
+    """Integer from the environment; falls back to ``default`` when unset or invalid."""
+    try:
+        value = int(os.environ.get(name, "").strip() or default)
+    except ValueError:
+        value = default
+    if minimum is not None:
+        value = max(value, minimum)
+    return value
+
+
+# Fragment concurrency for DASH/HLS: where each job starts, and how many
+# connections all jobs together may hold.
+FRAGMENTS_INITIAL = env_int("NERDDL_FRAGMENTS", 4, minimum=1)
+FRAGMENTS_GLOBAL_CAP = env_int("NERDDL_MAX_CONNECTIONS", 16, minimum=1)
+
+# Pipeline stages: concurrent downloads (network) and concurrent ffmpeg runs
+# (CPU/disk; half the cores leaves room for the UI and the downloads).
+FETCH_WORKERS = env_int("NERDDL_FETCH_WORKERS", 3, minimum=1)
+POSTPROCESS_WORKERS = env_int("NERDDL_POSTPROCESS_WORKERS", max(1, (os.cpu_count() or 2) // 2), minimum=1)
+
+# Audio encodes (MP3/M4A/FLAC) get a pool of their own, one ffmpeg per core.
+TRANSCODE_WORKERS = env_int("NERDDL_TRANSCODE_WORKERS", os.cpu_count() or 2, minimum=1)
+
+# Tag/cover writers behind the audio encodes (in-place, mostly I/O).
+TAG_WORKERS = env_int("NERDDL_TAG_WORKERS", 2, minimum=1)
+
+# Subtitle tracks fetched beside the media downloads, and the languages
+# wanted when a download asks for subtitles without naming any.
+SUBTITLE_WORKERS = env_int("NERDDL_SUBTITLE_WORKERS", 2, minimum=1)
+SUBTITLE_LANGS = [lang.strip() for lang in os.environ.get("NERDDL_SUBTITLE_LANGS", "de,en").split(",") if lang.strip()]
+
+# Bulk metadata lookups (/api/info/bulk): concurrent yt-dlp extractions.
+INFO_WORKERS = env_int("NERDDL_INFO_WORKERS", 4, minimum=1)
+
+# On-disk cache of resized thumbnails for the web UI, in MiB.
+THUMB_CACHE_MB = env_int("NERDDL_THUMB_CACHE_MB", 64, minimum=1)
+
+# Free space every download must leave on the target disk, in MiB.
+DISK_RESERVE_MB = env_int("NERDDL_DISK_RESERVE_MB", 1024, minimum=0)
+
+# Scratch directory (local SSD, tmpfs) for downloads in progress; empty =
+# write straight into the output folder.
+SCRATCH_DIR = os.path.expanduser(os.environ.get("NERDDL_SCRATCH_DIR", "").strip())
+
+# Downloads: yt-dlp download archive (finished videos are listed there and
+# skipped from then on; empty = none), and whether a file that already
+# exists in the output folder is downloaded again and replaced.
+DOWNLOAD_ARCHIVE = os.path.expanduser(os.environ.get("NERDDL_DOWNLOAD_ARCHIVE", "").strip())
+OVERWRITES = os.environ.get("NERDDL_OVERWRITES", "").strip() == "1"
+
+# Where the app keeps its own files (library index, caches).
+STATE_DIR = os.path.expanduser(os.environ.get("NERDDL_STATE_DIR", "").strip() or "~/.nerd_downloader")
+
+# Library scan: parallel header reads.
+SCAN_WORKERS = env_int("NERDDL_SCAN_WORKERS", min(8, os.cpu_count() or 2), minimum=1)
@@ -0,0 +1,202 @@
+"""Disk-space admission and preallocation for downloads.
+
+Before a job starts fetching, it reserves what it will need on the target
+filesystem: the selected formats' sizes (``filesize``/``filesize_approx``,
+else bitrate × duration), doubled when separate video+audio streams are
+merged — streams and merged output exist side by side until ffmpeg is done.
+A job is admitted only if free space minus everything other in-flight jobs
+still have to write covers it, plus a safety floor
+(``NERDDL_DISK_RESERVE_MB``). Otherwise it waits for them to finish (their
+merge headroom comes back); if nothing is in flight and it still doesn't
+fit, it fails early instead of leaving half-written ``.part`` files.
+
+Reservations shrink as bytes land on disk (``Reservation.update``), so
+space already written isn't counted twice against ``shutil.disk_usage``.
+
+``preallocate`` reserves a ``.part`` file's blocks up front without
+changing its size (``fallocate(FALLOC_FL_KEEP_SIZE)`` on Linux,
+``F_PREALLOCATE`` on macOS), which keeps large downloads contiguous.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import errno
+import os
+import shutil
+import struct
+import sys
+import threading
+from typing import Any, Callable, Optional
+
+from . import config
+
+# Streams + merged output coexist until the merge is done.
+MERGE_HEADROOM = 2.0
+
+# Seconds between free-space checks while a job waits.
+_POLL_SECONDS = 5.0
+
+
+class DiskSpaceError(OSError):
+    """Not enough space, and no in-flight job will free any."""
+
+    def __init__(self, path: str, needed: int, free: int) -> None:
+        super().__init__(
+            errno.ENOSPC,
+            f"No space left on device: {needed >> 20} MiB needed, {free >> 20} MiB free",
+            path,
+        )
+        self.needed = needed
+        self.free = free
+
+
+def required_bytes(info: dict) -> Optional[int]:
+    """Space a download of ``info`` needs on disk, merge headroom included;
+    None if the formats give no size or bitrate to go on."""
+    formats = info.get("requested_formats") or [info]
+    total = 0
+    for fmt in formats:
+        size = fmt.get("filesize") or fmt.get("filesize_approx")
+        if not size:
+            tbr, duration = fmt.get("tbr"), fmt.get("duration") or info.get("duration")
+            if not (tbr and duration):
+                return None
+            size = tbr * 1000 / 8 * duration  # tbr is kbit/s
+        total += int(size)
+    return int(total * MERGE_HEADROOM) if len(formats) > 1 else total
+
+
+class Reservation:
+    """One job's claim on a filesystem; release it once the job is done."""
+
+    def __init__(self, admission: "DiskAdmission", device: int, needed: int) -> None:
+        self._admission = admission
+        self.device = device
+        self.needed = needed
+        self.written = 0
+
+    @property
+    def outstanding(self) -> int:
+        return max(0, self.needed - self.written)
+
+    def update(self, written: int) -> None:
+        """Bytes of this job that are already on disk."""
+        self.written = max(self.written, written)
+
+    def release(self) -> None:
+        self._admission._release(self)
+
+
+class DiskAdmission:
+    """Admits jobs while the target filesystem has room for all of them."""
+
+    def __init__(
+        self,
+        floor: int = config.DISK_RESERVE_MB << 20,
+        usage: Callable[[str], Any] = shutil.disk_usage,
+    ) -> None:
+        self.floor = floor
+        self._usage = usage
+        self._cond = threading.Condition()
+        self._active: list[Reservation] = []
+        self._waiting = 0
+
+    def reserve(self, path: str, needed: Optional[int], *, on_wait: Optional[Callable[[int, int], None]] = None) -> Reservation:
+        """Block until ``needed`` bytes fit on ``path``'s filesystem.
+
+        ``on_wait(needed, free)`` is called once if the job has to wait.
+        Raises ``DiskSpaceError`` if it can't fit even with no other job in
+        flight on that filesystem.
+        """
+        device = os.stat(path).st_dev
+        reservation = Reservation(self, device, needed or 0)
+        notified = False
+        with self._cond:
+            while True:
+                others = [r for r in self._active if r.device == device]
+                free = self._usage(path).free
+                if free - sum(r.outstanding for r in others) - reservation.needed >= self.floor:
+                    self._active.append(reservation)
+                    return reservation
+                if not others:
+                    raise DiskSpaceError(path, reservation.needed + self.floor, free)
+                if on_wait and not notified:
+                    notified = True
+                    on_wait(reservation.needed, free)
+                self._waiting += 1
+                try:
+                    self._cond.wait(_POLL_SECONDS)
+                finally:
+                    self._waiting -= 1
+
+    def _release(self, reservation: Reservation) -> None:
+        with self._cond:
+            if reservation in self._active:
+                self._active.remove(reservation)
+                self._cond.notify_all()
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "jobs": len(self._active),
+                "reserved": sum(r.outstanding for r in self._active),
+                "waiting": self._waiting,
+                "floor": self.floor,
+            }
+
+
+admission = DiskAdmission()
+
+
+def _fallocate_linux(fd: int, offset: int, length: int) -> bool:
+    libc = ctypes.CDLL(None, use_errno=True)
+    fallocate = libc.fallocate
+    fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+    return fallocate(fd, 1, offset, length) == 0  # 1 = FALLOC_FL_KEEP_SIZE
+
+
+def _fallocate_macos(fd: int, offset: int, length: int) -> bool:
+    import fcntl
+
+    f_preallocate, f_allocatecontig, f_allocateall, f_peofposmode = 42, 2, 4, 3
+    for flags in (f_allocatecontig | f_allocateall, f_allocateall):
+        try:
+            fcntl.fcntl(fd, f_preallocate, struct.pack("IiqqQ", flags, f_peofposmode, 0, length, 0))
+            return True
+        except OSError:
+            continue
+    return False
+
+
+def preallocate(path: str, size: int) -> bool:
+    """Reserve blocks for ``path`` up to ``size`` bytes, leaving its length
+    unchanged so an appending writer is unaffected. False if the platform or
+    filesystem can't."""
+    try:
+        with open(path, "ab") as fh:
+            current = os.fstat(fh.fileno()).st_size
+            if size <= current:
+                return False
+            if sys.platform.startswith("linux"):
+                return _fallocate_linux(fh.fileno(), current, size - current)
+            if sys.platform == "darwin":
+                return _fallocate_macos(fh.fileno(), current, size - current)
+    except (OSError, AttributeError):
+        pass
+    return False
+
+
+def preallocating_hook() -> Callable[[dict], None]:
+    """yt-dlp progress hook: preallocate each ``.part`` file once its exact
+    size is known."""
+    done: set = set()
+
+    def hook(d: dict) -> None:
+        part, total = d.get("tmpfilename"), d.get("total_bytes")
+        if d.get("status") != "downloading" or not part or not total or part in done:
+            return
+        done.add(part)
+        preallocate(part, int(total))
+
+    return hook
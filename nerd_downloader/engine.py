@@ -1,8 +1,10 @@
 """yt-dlp engine: metadata extraction and downloads with live progress.
 
-Two public entry points:
-  * ``extract_info(url)``  -> normalized dict describing the video
-  * ``download(url, ...)`` -> runs the download, streaming progress to a callback
+Public entry points:
+  * ``extract_info(url)``   -> normalized dict describing the video
+  * ``extract_many(urls)``  -> the same for many URLs, concurrently, as each finishes
+  * ``iter_playlist(url)``  -> lazily walks a playlist/channel, flat entries only
+  * ``download(url, ...)``  -> runs the download, streaming progress to a callback
 
 Both use the same resilience strategy the CLI version learned the hard way:
 try **without** browser cookies first (YouTube often returns a complete format
@@ -11,12 +13,33 @@ list that way), then retry **with** Chrome cookies if the first attempt fails.
 
 from __future__ import annotations
 
+import errno
+import functools
+import itertools
 import os
-import shutil
-from typing import Callable, Optional
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterable, Iterator, Optional, Sequence
 
 import yt_dlp
 
+from . import (
+    bandwidth,
+    config,
+    diskspace,
+    fragments,
+    pipeline,
+    records,
+    resume,
+    retry,
+    scratch,
+    subtitles,
+    toolchain,
+    transcode,
+    unavailable,
+)
+from .throughput import ThroughputEstimator
+
 DEFAULT_OUTPUT_DIR = os.path.expanduser("~/Downloads")
 
 # Realistic desktop UA — helps YouTube hand back the full HD/4K format list.
@@ -26,7 +49,8 @@ _USER_AGENT = (
 )
 
 # Download quality presets exposed in the UI. Each maps to a yt-dlp format
-# selector; ``postprocessors`` is optional (used for audio extraction).
+# selector; ``audio`` is optional and names the codec/bitrate to encode to
+# (done in ``transcode.pool``, not inline in the download thread).
 FORMAT_PRESETS: dict[str, dict] = {
     # Selectors prefer separate video+audio (merged to mp4); the final bare
     # fallbacks prefer an mp4 container so a low-tier video doesn't silently
@@ -63,24 +87,20 @@ FORMAT_PRESETS: dict[str, dict] = {
     "audio": {
         "label": "Nur Audio (MP3, 320 kbps)",
         "selector": "bestaudio/best",
-        "postprocessors": [
-            {
-                "key": "FFmpegExtractAudio",
-                "preferredcodec": "mp3",
-                "preferredquality": "320",
-            }
-        ],
+        "audio": {"codec": "mp3", "quality": "320"},
     },
 }
 
 
 class EngineError(Exception):
     """Raised on failure. ``user_message`` is a safe, user-facing string that is
-    OK to send to the browser (it never contains raw yt-dlp/network text)."""
+    OK to send to the browser (it never contains raw yt-dlp/network text).
+    ``error_class`` is set for video-side failures (see ``unavailable``)."""
 
-    def __init__(self, message: str) -> None:
+    def __init__(self, message: str, error_class: Optional[str] = None) -> None:
         super().__init__(message)
         self.user_message = message
+        self.error_class = error_class
 
 
 def format_presets_for_ui() -> list[dict]:
@@ -96,6 +116,8 @@ def _base_opts() -> dict:
         "noprogress": True,  # we stream progress to the browser, not the terminal
         "retries": 5,
         "fragment_retries": 5,
+        # ...with exponential, jittered pauses between them (``retry``).
+        "retry_sleep_functions": retry.YTDLP_SLEEP_FUNCTIONS,
         "ignoreerrors": False,  # fail loudly so the cookie fallback can kick in
         "http_headers": {
             "User-Agent": _USER_AGENT,
@@ -111,70 +133,155 @@ _STRATEGIES: list[tuple[str, dict]] = [
 ]
 
 
-def _fmt_duration(seconds: Optional[float]) -> str:
-    if not seconds:
-        return ""
-    seconds = int(seconds)
-    h, rem = divmod(seconds, 3600)
-    m, s = divmod(rem, 60)
-    if h:
-        return f"{h}:{m:02d}:{s:02d}"
-    return f"{m}:{s:02d}"
-
-
 def _normalize_info(info: dict) -> dict:
     """Reduce yt-dlp's huge info dict to what the UI actually needs."""
-    heights = sorted(
-        {
-            f.get("height")
-            for f in (info.get("formats") or [])
-            if isinstance(f, dict) and f.get("height")
-        },
-        reverse=True,
-    )
-    thumb = info.get("thumbnail")
-    if not thumb:
-        thumbs = info.get("thumbnails") or []
-        if thumbs:
-            thumb = thumbs[-1].get("url")
-    return {
-        "id": info.get("id"),
-        "title": info.get("title") or "Unbekannter Titel",
-        "uploader": info.get("uploader") or info.get("channel") or "",
-        "duration": info.get("duration"),
-        # Format ourselves for a consistent M:SS / H:MM:SS (yt-dlp sometimes
-        # returns bare seconds like "19").
-        "duration_string": _fmt_duration(info.get("duration")) or info.get("duration_string") or "",
-        "thumbnail": thumb,
-        "webpage_url": info.get("webpage_url") or info.get("original_url"),
-        "extractor": info.get("extractor_key") or info.get("extractor"),
-        "is_live": bool(info.get("is_live")),
-        "view_count": info.get("view_count"),
-        "upload_date": info.get("upload_date"),
-        "max_height": heights[0] if heights else None,
-        "available_heights": heights,
-    }
+    return records.VideoRecord.from_info(info).as_dict()
 
 
 def extract_info(url: str) -> dict:
     """Fetch metadata for ``url`` without downloading. Raises ``EngineError``."""
+    _raise_if_known_unavailable(url)
     last_error: Optional[Exception] = None
     for label, cookie_opts in _STRATEGIES:
-        opts = {**_base_opts(), "skip_download": True, **cookie_opts}
+        # Playlists/channels are read flat and only up to their first item;
+        # that one item is then resolved fully so the UI has a card to show.
+        # (The whole list is available via ``iter_playlist``.)
+        opts = {
+            **_base_opts(),
+            "skip_download": True,
+            "extract_flat": "in_playlist",
+            "playlist_items": "1",
+            **cookie_opts,
+        }
         try:
-            with yt_dlp.YoutubeDL(opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-            if info is None:
-                raise EngineError("Keine Video-Informationen gefunden.")
-            # Playlists/channels: take the first entry so the UI has something.
-            if info.get("_type") == "playlist" and info.get("entries"):
-                entries = [e for e in info["entries"] if e]
-                if entries:
-                    info = entries[0]
-            return _normalize_info(info)
+            return retry.call(functools.partial(_extract_once, url, opts))
         except Exception as exc:  # noqa: BLE001 — fall through to next strategy
             last_error = exc
-    raise EngineError(_friendly_error(last_error))
+            if retry.classify(exc) == retry.PERMANENT:
+                break
+    raise _give_up(url, last_error)
+
+
+def _extract_once(url: str, opts: dict) -> dict:
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+        if info is None:
+            raise EngineError("Keine Video-Informationen gefunden.")
+        playlist = None
+        if info.get("_type") == "playlist":
+            playlist = {"title": info.get("title"), "url": info.get("webpage_url") or url}
+            entries = [e for e in info.get("entries") or [] if e]
+            if entries:
+                info = ydl.extract_info(_entry_url(entries[0]), download=False)
+    normalized = _normalize_info(info)
+    normalized["playlist"] = playlist
+    return normalized
+
+
+# Shared by all bulk lookups, so several big pastes at once still run at
+# most ``NERDDL_INFO_WORKERS`` extractions in parallel.
+_info_pool = ThreadPoolExecutor(config.INFO_WORKERS, thread_name_prefix="info")
+
+
+def extract_many(urls: Iterable[str]) -> Iterator[tuple[int, Optional[dict], Optional[str]]]:
+    """Run ``extract_info`` for every URL on a bounded pool and yield
+    ``(index, info, None)`` or ``(index, None, user_message)`` in completion
+    order. Closing the generator early cancels lookups not yet started."""
+    futures = {_info_pool.submit(extract_info, url): index for index, url in enumerate(urls)}
+    try:
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                yield index, future.result(), None
+            except EngineError as exc:
+                yield index, None, exc.user_message
+            except Exception:  # noqa: BLE001 — one bad link must not end the stream
+                yield index, None, "Unerwarteter Fehler beim Lesen der Video-Infos."
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def iter_playlist(url: str, *, start: int = 1, limit: Optional[int] = None) -> Iterator[tuple[str, dict]]:
+    """Walk a playlist/channel lazily, yielding ``("playlist", header)`` once
+    and then ``("entry", item)`` per video as yt-dlp follows the continuation
+    pages — nothing beyond the pages actually consumed is fetched.
+
+    Entries are flat (id, title, url, duration, ...); formats are resolved
+    only when an entry is downloaded. A plain video URL yields one entry.
+    Raises ``EngineError`` if the list can't be opened or breaks mid-way.
+    """
+    opts = {
+        **_base_opts(),
+        "skip_download": True,
+        "noplaylist": False,
+        "extract_flat": "in_playlist",
+        "lazy_playlist": True,
+    }
+    last_error: Optional[Exception] = None
+    ydl = None
+    for label, cookie_opts in _STRATEGIES:
+        candidate = yt_dlp.YoutubeDL({**opts, **cookie_opts})
+        try:
+            info = _resolve_redirects(candidate, candidate.extract_info(url, download=False, process=False))
+            entries = info.get("entries") if info.get("_type") == "playlist" else [info]
+            skip = max(0, start - 1)
+            items = itertools.islice(
+                (e for e in entries or [] if e), skip, None if limit is None else skip + limit
+            )
+            # Open the first page before committing to this strategy, so a
+            # failure still falls through to the next one.
+            first = next(items, None)
+        except Exception as exc:  # noqa: BLE001 — fall through to next strategy
+            candidate.close()
+            last_error = exc
+            continue
+        ydl = candidate
+        break
+    if ydl is None:
+        raise EngineError(_friendly_error(last_error))
+
+    # The YoutubeDL instance stays open while the caller consumes entries:
+    # each further page is fetched on demand through it.
+    try:
+        yield "playlist", {
+            "id": info.get("id"),
+            "title": info.get("title") or "Unbekannte Playlist",
+            "uploader": info.get("uploader") or info.get("channel") or "",
+            "webpage_url": info.get("webpage_url") or url,
+        }
+        for index, entry in enumerate(itertools.chain([first] if first else [], items), start=skip + 1):
+            yield "entry", _normalize_entry(entry, index)
+    except EngineError:
+        raise
+    except Exception as exc:  # noqa: BLE001
+        raise EngineError(_friendly_error(exc)) from exc
+    finally:
+        ydl.close()
+
+
+def _resolve_redirects(ydl: yt_dlp.YoutubeDL, info: Optional[dict]) -> dict:
+    """With ``process=False`` a channel URL may answer with a pointer to its
+    videos tab; follow a few of those hops by hand."""
+    for _ in range(3):
+        if not info or info.get("_type") not in ("url", "url_transparent"):
+            break
+        info = ydl.extract_info(info["url"], download=False, process=False, ie_key=info.get("ie_key"))
+    if info is None:
+        raise EngineError("Keine Video-Informationen gefunden.")
+    return info
+
+
+def _entry_url(entry: dict) -> str:
+    url = entry.get("webpage_url") or entry.get("url") or entry.get("id") or ""
+    if entry.get("ie_key") == "Youtube" and not url.startswith("http"):
+        url = f"https://www.youtube.com/watch?v={url}"
+    return url
+
+
+def _normalize_entry(entry: dict, index: int) -> dict:
+    """Flat playlist item -> the fields a playlist view needs."""
+    return records.EntryRecord.from_entry(entry, index, _entry_url(entry)).as_dict()
 
 
 def download(
@@ -183,60 +290,420 @@ def download(
     format_id: str = "best",
     output_dir: Optional[str] = None,
     progress_cb: Optional[Callable[[dict], None]] = None,
+    estimator: Optional[ThroughputEstimator] = None,
+    share: Optional[bandwidth.BandwidthShare] = None,
+    checkpoint: Optional[resume.Checkpoint] = None,
+    subtitle_langs: Sequence[str] = (),
 ) -> dict:
     """Download ``url`` and return ``{filepath, output_dir, title}``.
 
     ``progress_cb`` receives normalized progress dicts (see ``_make_hook``).
-    Raises ``EngineError`` if every strategy fails.
+    ``estimator`` smooths speed/ETA; pass the job's registry entry so batch
+    aggregates see it. ``share`` is the job's slice of the global bandwidth
+    limit (released once the streams are fetched); without one the download
+    still counts against the limit, at weight 1. ``checkpoint`` records the
+    selected formats and ``.part`` offsets so a restarted process can pick
+    the download up again (``resume``). Subtitles in ``subtitle_langs``
+    that the video has are fetched alongside and muxed into the merged file
+    (``subtitles``). Like yt-dlp, a video whose file is already in the
+    output folder (or that is in ``NERDDL_DOWNLOAD_ARCHIVE``) is not
+    downloaded again unless ``NERDDL_OVERWRITES`` is set. Raises
+    ``EngineError`` if every strategy fails.
     """
+    estimator = estimator or ThroughputEstimator()
     preset = FORMAT_PRESETS.get(format_id) or FORMAT_PRESETS["best"]
     out_dir = _resolve_output_dir(output_dir)
 
     # ffmpeg is required to merge HD/4K video+audio and to extract MP3. Fail
-    # early with an actionable message instead of deep inside yt-dlp.
-    if (preset.get("merge") or preset.get("postprocessors")) and shutil.which("ffmpeg") is None:
+    # early with an actionable message instead of deep inside yt-dlp. The
+    # location comes from the cached toolchain probe, not a PATH walk per job.
+    ffmpeg = toolchain.ffmpeg_path()
+    if (preset.get("merge") or preset.get("audio")) and ffmpeg is None:
         raise EngineError("ffmpeg fehlt — bitte installieren: brew install ffmpeg")
+    if preset.get("audio"):
+        encoder = transcode.CODECS[preset["audio"]["codec"]][1]
+        if not toolchain.has_encoder(encoder):
+            raise EngineError(f"Dein ffmpeg kann kein {encoder} — bitte vollständiges ffmpeg installieren.")
+
+    _raise_if_known_unavailable(url)
+    # Streams, merge temp files and encodes live in the job's scratch
+    # directory (the output folder itself unless NERDDL_SCRATCH_DIR is set).
+    work = scratch.workdir(url, format_id, out_dir)
+    try:
+        base = {
+            **_base_opts(),
+            "outtmpl": os.path.join(work, "%(title)s.%(ext)s"),
+            # A resumed job asks for the formats it already has parts of.
+            "format": checkpoint.selector(preset["selector"]) if checkpoint else preset["selector"],
+        }
+        if preset.get("merge"):
+            base["merge_output_format"] = preset["merge"]
+        if config.DOWNLOAD_ARCHIVE:
+            base["download_archive"] = config.DOWNLOAD_ARCHIVE
+        if config.OVERWRITES:
+            base["overwrites"] = True
+        langs = [] if preset.get("audio") else subtitles.parse_langs(subtitle_langs)
+        audio = None
+        if preset.get("audio"):
+            audio = transcode.PooledExtractAudio(
+                preset["audio"]["codec"], preset["audio"].get("quality"), ffmpeg=ffmpeg, tags=True, cover=True
+            )
 
-    base = {
-        **_base_opts(),
-        "outtmpl": os.path.join(out_dir, "%(title)s.%(ext)s"),
-        "format": preset["selector"],
-    }
-    if preset.get("merge"):
-        base["merge_output_format"] = preset["merge"]
-    if preset.get("postprocessors"):
-        base["postprocessors"] = preset["postprocessors"]
+        share = share or bandwidth.limiter.register()
+        try:
+            fetched = _fetch_with_strategies(url, base, progress_cb, estimator, share, audio, out_dir, checkpoint, langs)
+        finally:
+            # A job that is merging no longer uses the link: hand its bandwidth on.
+            share.release()
+
+        if fetched.get("existing"):
+            scratch.discard(work, out_dir)
+            return {"filepath": fetched["filepath"], "output_dir": out_dir, "title": fetched["title"]}
+        try:
+            if fetched["streams"]:
+                _postprocess(fetched, ffmpeg, progress_cb)
+            if audio:
+                fetched["filepath"] = _finish_audio(audio, progress_cb) or fetched["filepath"]
+            if fetched["filepath"]:
+                fetched["filepath"] = _finalize(fetched["filepath"], out_dir, bool(base.get("overwrites")))
+                if fetched["subtitles"] is not None:
+                    # Not merged (or not embeddable): keep them next to the file.
+                    subtitles.write_sidecars(subtitles.collect(fetched["subtitles"]), fetched["filepath"])
+            if fetched.get("archive"):
+                fetched["archive"]()
+        finally:
+            # Merge headroom is free again; let waiting jobs in.
+            for reservation in fetched["reservations"]:
+                reservation.release()
+        scratch.discard(work, out_dir)
+        return {
+            "filepath": fetched["filepath"],
+            "output_dir": out_dir,
+            "title": fetched["title"],
+        }
+    finally:
+        # Failed jobs keep their files for a retry, but not the lock.
+        scratch.release(work)
 
+
+def _fetch_with_strategies(
+    url: str,
+    base: dict,
+    progress_cb: Optional[Callable[[dict], None]],
+    estimator: ThroughputEstimator,
+    share: bandwidth.BandwidthShare,
+    audio: Optional[transcode.PooledExtractAudio] = None,
+    out_dir: Optional[str] = None,
+    checkpoint: Optional[resume.Checkpoint] = None,
+    subtitle_langs: Sequence[str] = (),
+) -> dict:
+    """Fetch stage: resolve formats, reserve disk space for them
+    (``diskspace.admission``), then download the stream(s) while holding a
+    ``pipeline.fetch`` slot. Merging and audio encoding happen later, outside
+    that slot; the returned ``reservations`` must be released after them."""
     last_error: Optional[Exception] = None
     for label, cookie_opts in _STRATEGIES:
-        # Fresh capture + hooks per attempt so a partial earlier attempt can't
-        # leak a stale filepath/title into a later successful one.
-        captured: dict = {"filepath": None, "title": None}
-        opts = {
-            **base,
-            **cookie_opts,
-            "progress_hooks": [_make_hook(progress_cb, captured)],
-            "postprocessor_hooks": [_make_pp_hook(captured)],
-        }
+        attempt = functools.partial(
+            _fetch_once,
+            url,
+            {**base, **cookie_opts},
+            progress_cb,
+            estimator,
+            share,
+            audio,
+            out_dir,
+            checkpoint,
+            subtitle_langs,
+        )
         try:
-            with yt_dlp.YoutubeDL(opts) as ydl:
-                info = ydl.extract_info(url, download=True)
-            captured["title"] = (info or {}).get("title") or captured["title"]
-            if not captured["filepath"] and info:
-                # Best-effort final path when hooks didn't capture it.
-                req = info.get("requested_downloads") or []
-                if req and req[0].get("filepath"):
-                    captured["filepath"] = req[0]["filepath"]
-            return {
-                "filepath": captured["filepath"],
-                "output_dir": out_dir,
-                "title": captured["title"],
-            }
+            return retry.call(
+                attempt,
+                on_retry=lambda kind, delay: _notify(
+                    progress_cb,
+                    "retry",
+                    f"YouTube bremst — neuer Versuch in {delay:.0f} s…"
+                    if kind == retry.THROTTLED
+                    else f"Verbindungsproblem — neuer Versuch in {delay:.0f} s…",
+                ),
+                on_pause=lambda seconds: _notify(
+                    progress_cb, "queued", f"YouTube drosselt — alle Downloads pausieren {seconds:.0f} s…"
+                ),
+            )
         except Exception as exc:  # noqa: BLE001
             last_error = exc
+            if retry.classify(exc) == retry.PERMANENT:
+                break
             if progress_cb:
                 progress_cb({"status": "retry", "message": f"Versuch {label} fehlgeschlagen."})
-    raise EngineError(_friendly_error(last_error))
+    raise _give_up(url, last_error)
+
+
+def _fetch_once(
+    url: str,
+    opts: dict,
+    progress_cb: Optional[Callable[[dict], None]],
+    estimator: ThroughputEstimator,
+    share: bandwidth.BandwidthShare,
+    audio: Optional[transcode.PooledExtractAudio],
+    out_dir: Optional[str] = None,
+    checkpoint: Optional[resume.Checkpoint] = None,
+    subtitle_langs: Sequence[str] = (),
+) -> dict:
+    # Fresh capture + hooks per attempt so a partial earlier attempt can't
+    # leak a stale filepath/title into a later successful one.
+    captured: dict = {"filepath": None, "title": None}
+    opts = {**opts, "postprocessor_hooks": [_make_pp_hook(captured)]}
+    tuning = fragments.FragmentTuning(opts, estimator)
+    opts["progress_hooks"] = [
+        _make_hook(progress_cb, captured, estimator, share, on_stream_start=tuning.stream_started)
+    ]
+    opts["logger"] = fragments.ThrottleLogger(on_throttle=tuning.throttled)
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        if audio:
+            ydl.add_post_processor(audio, when="post_process")
+        info = ydl.extract_info(url, download=False)
+        if info is None:
+            raise EngineError("Keine Video-Informationen gefunden.")
+        existing = _already_downloaded(ydl, opts, info, out_dir or os.path.dirname(opts["outtmpl"]), audio)
+        if existing:
+            _notify(progress_cb, "processing", "Bereits heruntergeladen — übersprungen.")
+            return {**existing, "streams": [], "reservations": [], "subtitles": None}
+        size = _expected_size(info)
+        estimator.set_expected_total(size)
+        if checkpoint:
+            checkpoint.plan(info)
+            kept = checkpoint.restore()
+            if kept:
+                _notify(progress_cb, "queued", f"Setze unterbrochenen Download fort ({kept / 1e6:.0f} MB vorhanden)…")
+            # yt-dlp copied opts["progress_hooks"] when it was constructed.
+            ydl.add_progress_hook(checkpoint.hook())
+        # Fetched while the streams download; only languages the video has.
+        pending_subtitles = subtitles.pool.fetch(info, subtitle_langs) if subtitle_langs else None
+
+        def on_wait(needed: int, free: int) -> None:
+            _notify(progress_cb, "queued", f"Warte auf Speicherplatz ({needed / 1e9:.1f} GB nötig, {free / 1e9:.1f} GB frei)…")
+
+        work = os.path.dirname(opts["outtmpl"])
+        reservation = diskspace.admission.reserve(work, diskspace.required_bytes(info), on_wait=on_wait)
+        reservations = [reservation]
+        # Written bytes no longer count against the reservation.
+        ydl.add_progress_hook(lambda d: reservation.update(estimator.downloaded))
+        ydl.add_progress_hook(diskspace.preallocating_hook())
+        try:
+            if out_dir and not scratch.same_filesystem(work, out_dir):
+                # The finished file is copied over from scratch at the end.
+                reservations.append(diskspace.admission.reserve(out_dir, size, on_wait=on_wait))
+            with pipeline.fetch.slot(
+                priority=size,
+                on_wait=lambda: _notify(progress_cb, "queued", "Warte auf freien Download-Slot…"),
+            ):
+                lease = fragments.policy.acquire()
+                tuning.start(lease)
+                try:
+                    fetched = _fetch_streams(ydl, info, captured)
+                finally:
+                    lease.release()
+        except BaseException:
+            for held in reservations:
+                held.release()
+            raise
+        fetched["reservations"] = reservations
+        fetched["subtitles"] = pending_subtitles
+        if fetched["streams"]:
+            # yt-dlp's own download path (single files) applies these itself.
+            fetched["fixups"] = _fixup_args(opts, info)
+            if opts.get("download_archive"):
+                fetched["archive"] = functools.partial(ydl.record_download_archive, _archive_entry(info))
+        return fetched
+
+
+def _already_downloaded(
+    ydl: yt_dlp.YoutubeDL,
+    opts: dict,
+    info: dict,
+    out_dir: str,
+    audio: Optional[transcode.PooledExtractAudio],
+) -> Optional[dict]:
+    """What yt-dlp's ``process_info`` checks before downloading, for the file
+    as it will land in ``out_dir``: a video in the download archive is
+    skipped, and so is one whose finished file already exists (unless
+    ``overwrites`` is set; like yt-dlp, that one is then recorded in the
+    archive). Returns the result to report instead, or None."""
+    name = os.path.basename(ydl.prepare_filename(info))
+    if audio:
+        name = f"{os.path.splitext(name)[0]}.{transcode.CODECS[audio.codec][0]}"
+    target = os.path.join(out_dir, name)
+    exists = os.path.exists(target)
+    archived = bool(opts.get("download_archive")) and ydl.in_download_archive(info)
+    if not archived:
+        if not exists or opts.get("overwrites"):
+            return None
+        if opts.get("download_archive"):
+            ydl.record_download_archive(_archive_entry(info))
+    return {"title": info.get("title"), "filepath": target if exists else None, "existing": True}
+
+
+def _archive_entry(info: dict) -> dict:
+    """The fields ``record_download_archive`` needs, without the whole info dict."""
+    return {"id": info.get("id"), "extractor_key": info.get("extractor_key")}
+
+
+def _fixup_args(opts: dict, info: dict) -> list[str]:
+    """ffmpeg output args for the fixups yt-dlp would run after its own merge
+    (``process_info``), applied in our merge pass instead of another remux.
+    Of yt-dlp's fixups only the pixel aspect one applies to merged streams."""
+    ratio = info.get("stretched_ratio")
+    if opts.get("fixup") in ("ignore", "never", "warn") or ratio in (None, 1):
+        return []
+    return ["-aspect", f"{ratio:f}"]
+
+
+def _fetch_streams(ydl: yt_dlp.YoutubeDL, info: dict, captured: dict) -> dict:
+    """Download what the format selector picked.
+
+    A single file (progressive format, audio preset) goes through yt-dlp's
+    normal path including its post-processors. Separate video+audio streams
+    are fetched one by one *without* yt-dlp's inline merge; the caller merges
+    them in the post-process stage.
+    """
+    requested = info.get("requested_formats")
+    if not requested:
+        info = ydl.process_ie_result(info, download=True) or info
+        if not captured["filepath"]:
+            # Best-effort final path when hooks didn't capture it.
+            req = info.get("requested_downloads") or []
+            if req and req[0].get("filepath"):
+                captured["filepath"] = req[0]["filepath"]
+        return {
+            "title": info.get("title") or captured["title"],
+            "filepath": captured["filepath"],
+            "streams": [],
+        }
+
+    final = ydl.prepare_filename(info)
+    stem = os.path.splitext(final)[0]
+    streams = []
+    for fmt in requested:
+        path = f"{stem}.f{fmt['format_id']}.{fmt['ext']}"
+        stream_info = {**info, **fmt}
+        stream_info.pop("requested_formats", None)
+        ok, _ = ydl.dl(path, stream_info)
+        if not ok:
+            raise EngineError("Stream konnte nicht geladen werden.")
+        streams.append(
+            {
+                "path": path,
+                "vcodec": fmt.get("vcodec"),
+                "acodec": fmt.get("acodec"),
+                "protocol": fmt.get("protocol") or "",
+            }
+        )
+    return {"title": info.get("title"), "filepath": final, "streams": streams}
+
+
+def _postprocess(fetched: dict, ffmpeg: Optional[str], progress_cb) -> None:
+    """Post-process stage: merge the fetched streams while holding a
+    ``pipeline.postprocess`` slot (smallest inputs first)."""
+    size = sum(os.path.getsize(s["path"]) for s in fetched["streams"] if os.path.exists(s["path"]))
+    # Waited for before taking an ffmpeg slot; usually done long ago.
+    tracks = subtitles.collect(fetched["subtitles"])
+    with pipeline.postprocess.slot(
+        priority=size,
+        on_wait=lambda: _notify(progress_cb, "queued", "Warte auf freien ffmpeg-Slot…"),
+    ):
+        _notify(
+            progress_cb,
+            "processing",
+            "Füge Video, Audio und Untertitel zusammen…" if tracks else "Füge Video und Audio zusammen…",
+        )
+        if _merge_streams(ffmpeg or "ffmpeg", fetched["streams"], fetched["filepath"], tracks, fetched["fixups"]):
+            fetched["subtitles"] = None  # in the file now
+
+
+def _finish_audio(audio: transcode.PooledExtractAudio, progress_cb) -> Optional[str]:
+    """Wait for the job's encode in ``transcode.pool``; return the final path."""
+    codec = audio.codec.upper()
+    if audio.modes and audio.avoided == len(audio.modes):
+        _notify(progress_cb, "processing", f"Audio ist bereits {codec} — keine Neukodierung nötig…")
+    else:
+        _notify(progress_cb, "processing", f"Konvertiere zu {codec}…")
+    try:
+        paths = audio.wait()
+    except transcode.TranscodeError as exc:
+        raise EngineError("Audio-Konvertierung mit ffmpeg fehlgeschlagen.") from exc
+    return paths[-1] if paths else None
+
+
+def _merge_streams(
+    ffmpeg: str, streams: list[dict], output: str, tracks: Sequence[dict] = (), fixups: Sequence[str] = ()
+) -> bool:
+    """Remux video+audio into ``output`` without re-encoding (what yt-dlp's
+    FFmpegMerger does), with subtitle ``tracks`` muxed in and ``fixups``
+    (``_fixup_args``) applied in the same pass.
+    Returns whether they were; if ffmpeg rejects them, the merge is redone
+    without. Stream files are removed only after success, so a retry can
+    reuse them."""
+    stem, ext = os.path.splitext(output)
+    temp = f"{stem}.temp{ext}"
+    sub_inputs, sub_outputs = subtitles.merge_args(list(tracks), len(streams), output)
+    cmd = [ffmpeg, "-hide_banner", "-loglevel", "error", "-y"]
+    for stream in streams:
+        cmd += ["-i", stream["path"]]
+    cmd += sub_inputs
+    for i, stream in enumerate(streams):
+        if stream["vcodec"] != "none":
+            cmd += ["-map", f"{i}:v:0"]
+        if stream["acodec"] != "none":
+            cmd += ["-map", f"{i}:a:0"]
+            if stream["protocol"].startswith("m3u8") and (stream["acodec"] or "").startswith("mp4a"):
+                cmd += ["-bsf:a", "aac_adtstoasc"]
+    cmd += ["-c", "copy", *sub_outputs, *fixups, "-movflags", "+faststart", temp]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    except OSError as exc:
+        raise EngineError("ffmpeg fehlt — bitte installieren: brew install ffmpeg") from exc
+    if result.returncode != 0:
+        _remove_quietly(temp)
+        if sub_inputs:
+            return _merge_streams(ffmpeg, streams, output, fixups=fixups)
+        raise EngineError("Zusammenführen mit ffmpeg fehlgeschlagen.")
+    os.replace(temp, output)
+    for stream in streams:
+        _remove_quietly(stream["path"])
+    return bool(sub_inputs)
+
+
+def _finalize(path: str, out_dir: str, overwrite: bool = False) -> str:
+    """Move the finished file from scratch into the output folder."""
+    try:
+        return scratch.finalize(path, out_dir, overwrite)
+    except OSError as exc:
+        if exc.errno == errno.ENOSPC:
+            raise EngineError(_friendly_error(exc)) from exc
+        raise EngineError("Fertige Datei konnte nicht in den Zielordner verschoben werden.") from exc
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _expected_size(info: dict) -> Optional[int]:
+    """Sum of the selected formats' (approximate) sizes, or None if any is unknown."""
+    total = 0
+    for fmt in info.get("requested_formats") or [info]:
+        size = fmt.get("filesize") or fmt.get("filesize_approx")
+        if not size:
+            return None
+        total += int(size)
+    return total
+
+
+def _notify(progress_cb, status: str, message: str) -> None:
+    if progress_cb:
+        progress_cb({"status": status, "message": message})
 
 
 def _resolve_output_dir(output_dir: Optional[str]) -> str:
@@ -247,25 +714,45 @@ def _resolve_output_dir(output_dir: Optional[str]) -> str:
     return path
 
 
-def _make_hook(progress_cb, captured) -> Callable[[dict], None]:
+def _make_hook(
+    progress_cb,
+    captured,
+    estimator: ThroughputEstimator,
+    share: Optional[bandwidth.BandwidthShare] = None,
+    on_stream_start: Optional[Callable[[], None]] = None,
+) -> Callable[[dict], None]:
+    streams: set = set()
+
     def hook(d: dict) -> None:
         status = d.get("status")
         if status == "finished":
             captured["filepath"] = d.get("filename") or captured["filepath"]
-        if not progress_cb:
-            return
         if status == "downloading":
+            stream = d.get("filename") or ""
+            if stream not in streams:
+                streams.add(stream)
+                if on_stream_start:
+                    on_stream_start()
             total = d.get("total_bytes") or d.get("total_bytes_estimate")
             downloaded = d.get("downloaded_bytes") or 0
+            estimator.update(downloaded, total, stream=stream)
+            if share:
+                share.update(downloaded, stream)
+        if not progress_cb:
+            return
+        if status == "downloading":
             percent = (downloaded / total * 100) if total else None
+            # Smoothed values; yt-dlp's raw ones only as a fallback during the
+            # first fraction of a second.
+            eta = estimator.eta()
             progress_cb(
                 {
                     "status": "downloading",
                     "percent": percent,
                     "downloaded": downloaded,
                     "total": total,
-                    "speed": d.get("speed"),
-                    "eta": d.get("eta"),
+                    "speed": estimator.speed or d.get("speed"),
+                    "eta": eta if eta is not None else d.get("eta"),
                     "filename": os.path.basename(d.get("filename") or ""),
                 }
             )
@@ -292,22 +779,30 @@ def _make_pp_hook(captured) -> Callable[[dict], None]:
     return pp_hook
 
 
+def _raise_if_known_unavailable(url: str) -> None:
+    """Answer from the negative cache instead of asking YouTube again."""
+    known = unavailable.cache.get(url)
+    if known:
+        raise EngineError(known["message"], known["class"])
+
+
+def _give_up(url: str, exc: Optional[Exception]) -> EngineError:
+    """The error to raise once every strategy failed; video-side failures
+    are remembered in the negative cache."""
+    error_class = unavailable.classify(exc)
+    message = _friendly_error(exc)
+    unavailable.cache.put(url, error_class, message)
+    return EngineError(message, error_class)
+
+
 def _friendly_error(exc: Optional[Exception]) -> str:
     text = str(exc) if exc else "Unbekannter Fehler."
     low = text.lower()
-    if (
-        "sign in to confirm" in low
-        or "age-restricted" in low
-        or "age restricted" in low
-        or "inappropriate for some users" in low
-    ):
-        return "Video ist altersbeschränkt oder verlangt Anmeldung."
-    if "private" in low:
-        return "Dieses Video ist privat."
-    if "unavailable" in low or "removed" in low:
-        return "Video ist nicht verfügbar oder wurde entfernt."
-    if "unsupported url" in low or "is not a valid url" in low:
-        return "Diese URL wird nicht unterstützt."
+    error_class = unavailable.classify(text)
+    if error_class:
+        return unavailable.MESSAGES[error_class]
+    if "no space left on device" in low:
+        return "Nicht genug Speicherplatz im Zielordner."
     if "ffmpeg" in low:
         return "ffmpeg fehlt — wird für Zusammenführen/Audio benötigt."
     # Never surface raw yt-dlp/network text — it can contain internal details.
@@ -0,0 +1,209 @@
+"""Adaptive fragment concurrency for DASH/HLS downloads.
+
+YouTube serves HD/4K as DASH streams made of many small fragments; fetching
+them one at a time leaves most of a fast link idle, but blindly opening many
+connections per job invites HTTP 429 throttling — and several concurrent jobs
+multiply whatever we pick.
+
+``FragmentPolicy`` hands each job a ``FragmentLease``. The lease starts at a
+learned preferred value, is adjusted at every stream boundary (additive
+increase while more connections still buy throughput, multiplicative decrease
+on throttling), and all leases together stay within a global cap. Each job
+always keeps at least one connection, so with more jobs than the cap the
+total briefly exceeds it: a new job starts at one connection, leases above one
+give a connection back at each stream boundary while the total is over, and
+none grows again until there is room. With more jobs than the cap, every job
+ends up at one connection.
+
+yt-dlp reads ``concurrent_fragment_downloads`` from the live params dict when
+each stream starts, so ``FragmentTuning`` applies a new value simply by writing
+it into the opts handed to ``YoutubeDL``; ``ThrottleLogger`` reports the 429s
+yt-dlp only logs. The engine and the Tk GUI both drive their leases this way.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Callable, Optional
+
+from . import config, retry
+from .throughput import ThroughputEstimator
+
+# Per-job ceiling, independent of the global cap.
+_MAX_PER_JOB = 16
+
+# An extra connection must raise throughput by at least this factor to be kept.
+_MIN_GAIN = 1.10
+
+
+class FragmentLease:
+    """One job's share of the connection budget."""
+
+    def __init__(self, policy: "FragmentPolicy", connections: int) -> None:
+        self._policy = policy
+        self.connections = connections
+        self.throttle_count = 0
+        self._throttled_since_adjust = False
+        self._speed_at_level: Optional[float] = None
+        self._released = False
+
+    def throttled(self) -> int:
+        """Report an HTTP 429 / throttling signal; returns the new connection count."""
+        return self._policy._on_throttle(self)
+
+    def adjust(self, speed: Optional[float]) -> int:
+        """Re-evaluate at a stream boundary given the measured (smoothed) speed."""
+        return self._policy._on_adjust(self, speed)
+
+    def release(self) -> None:
+        self._policy._on_release(self)
+
+
+class FragmentPolicy:
+    def __init__(
+        self,
+        initial: int = config.FRAGMENTS_INITIAL,
+        global_cap: int = config.FRAGMENTS_GLOBAL_CAP,
+    ) -> None:
+        self.global_cap = global_cap
+        self._preferred = min(initial, _MAX_PER_JOB)
+        self._leases: set[FragmentLease] = set()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> FragmentLease:
+        with self._lock:
+            connections = max(1, min(self._preferred, self._free()))
+            lease = FragmentLease(self, connections)
+            self._leases.add(lease)
+            return lease
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "preferred": self._preferred,
+                "global_cap": self.global_cap,
+                "in_use": self._in_use(),
+                "jobs": len(self._leases),
+            }
+
+    def _in_use(self) -> int:
+        return sum(lease.connections for lease in self._leases)
+
+    def _free(self) -> int:
+        return self.global_cap - self._in_use()
+
+    def _on_throttle(self, lease: FragmentLease) -> int:
+        with self._lock:
+            lease.throttle_count += 1
+            if lease._throttled_since_adjust:
+                # Retries of the same stream keep reporting; halve once per stream.
+                return lease.connections
+            lease._throttled_since_adjust = True
+            lease.connections = max(1, lease.connections // 2)
+            lease._speed_at_level = None
+            # New jobs start lower too; a 429 usually means "this IP, all jobs".
+            self._preferred = max(1, min(self._preferred, lease.connections))
+            return lease.connections
+
+    def _on_adjust(self, lease: FragmentLease, speed: Optional[float]) -> int:
+        with self._lock:
+            if lease._released:
+                return lease.connections
+            if self._free() < 0 and lease.connections > 1:
+                # Over the cap (jobs joined when it was used up): give one back.
+                lease.connections -= 1
+                lease._speed_at_level = None
+                return lease.connections
+            if not speed:
+                return lease.connections
+            if lease._throttled_since_adjust:
+                # Hold the reduced level for one stream before probing again.
+                lease._throttled_since_adjust = False
+                lease._speed_at_level = speed
+                return lease.connections
+            previous = lease._speed_at_level
+            lease._speed_at_level = speed
+            if previous is None or speed >= previous * _MIN_GAIN:
+                if lease.connections < _MAX_PER_JOB and self._free() > 0:
+                    lease.connections += 1
+            return lease.connections
+
+    def _on_release(self, lease: FragmentLease) -> None:
+        with self._lock:
+            if lease._released:
+                return
+            lease._released = True
+            self._leases.discard(lease)
+            if not lease.throttle_count:
+                # Carry what this job learned over to the next one, one step at a time.
+                if lease.connections > self._preferred:
+                    self._preferred += 1
+                elif lease.connections < self._preferred:
+                    self._preferred -= 1
+
+
+class FragmentTuning:
+    """Applies a job's fragment lease to the live yt-dlp opts.
+
+    yt-dlp keeps a reference to the opts dict and reads
+    ``concurrent_fragment_downloads`` when each stream starts, so writing a
+    new value retunes the next stream of the running download.
+    """
+
+    def __init__(self, opts: dict, estimator: ThroughputEstimator) -> None:
+        self._opts = opts
+        self._estimator = estimator
+        self._lease: Optional[FragmentLease] = None
+        self._streams: set = set()
+
+    def start(self, lease: FragmentLease) -> None:
+        self._lease = lease
+        self._opts["concurrent_fragment_downloads"] = lease.connections
+
+    def hook(self, d: dict) -> None:
+        """yt-dlp progress hook: re-evaluate when a new stream starts."""
+        if d.get("status") == "downloading":
+            stream = d.get("filename") or ""
+            if stream not in self._streams:
+                self._streams.add(stream)
+                self.stream_started()
+
+    def stream_started(self) -> None:
+        if self._lease:
+            self._opts["concurrent_fragment_downloads"] = self._lease.adjust(self._estimator.speed)
+
+    def throttled(self) -> None:
+        if self._lease:
+            self._opts["concurrent_fragment_downloads"] = self._lease.throttled()
+
+
+class ThrottleLogger:
+    """Silent yt-dlp logger that watches for throttling.
+
+    With a ``logger`` set, yt-dlp routes all of its output here instead of the
+    terminal — including fragment retry notices such as
+    ``Got error: HTTP Error 429: Too Many Requests``.
+    """
+
+    def __init__(self, on_throttle: Optional[Callable[[], None]] = None) -> None:
+        self._on_throttle = on_throttle
+
+    def _check(self, msg: str) -> None:
+        if self._on_throttle and retry.is_throttled(msg):
+            self._on_throttle()
+
+    def debug(self, msg: str) -> None:
+        self._check(msg)
+
+    def info(self, msg: str) -> None:
+        self._check(msg)
+
+    def warning(self, msg: str) -> None:
+        self._check(msg)
+
+    def error(self, msg: str) -> None:
+        self._check(msg)
+
+
+# Module-level singleton shared by all download paths in this process.
+policy = FragmentPolicy()
@@ -2,7 +2,8 @@
 
 A download runs in a background thread; its progress events are pushed onto a
 thread-safe queue. The SSE endpoint drains that queue and forwards each event
-to the browser. Jobs are ephemeral — fine for a single-user local app.
+to the browser. Jobs are ephemeral — fine for a single-user local app; what
+a download needs to survive a restart is checkpointed by ``resume``.
 """
 
 from __future__ import annotations
@@ -32,8 +33,9 @@ class JobManager:
         self._jobs: dict[str, Job] = {}
         self._lock = threading.Lock()
 
-    def create(self) -> Job:
-        job = Job(uuid.uuid4().hex)
+    def create(self, job_id: Optional[str] = None) -> Job:
+        """New job; ``job_id`` reuses the ID of a job resumed after a restart."""
+        job = Job(job_id or uuid.uuid4().hex)
         with self._lock:
             self._reap()
             self._jobs[job.id] = job
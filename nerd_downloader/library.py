@@ -0,0 +1,232 @@
+"""Scan a download folder: what is complete, what is not, what is there twice.
+
+People point the app at the same ``~/Downloads`` for years. ``scan(root)``
+walks it with ``os.scandir``, reads video headers on a worker pool
+(``mediainfo.probe_file``) and reports:
+
+  * ``partials``      — ``.part`` leftovers yt-dlp can resume
+  * ``incomplete``    — media files that end before their headers say
+  * ``below_quality`` — videos under ``min_height``
+  * ``duplicates``    — groups of files with identical content
+  * ``unreadable``    — video files neither the parser nor ffprobe understood
+
+Results are kept in an index keyed on ``(inode, mtime, size)``, so a repeat
+scan only reads files that changed since the last one.
+
+CLI: ``python -m nerd_downloader scan [DIR] [--min-height N] [--json]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from . import config, mediainfo
+
+VIDEO_EXTS = {".mp4", ".m4v", ".mov", ".mkv", ".webm", ".avi", ".flv"}
+AUDIO_EXTS = {".m4a", ".mp3", ".flac", ".opus", ".ogg", ".wav"}
+PARTIAL_EXTS = {".part", ".ytdl"}
+
+# Headers worth parsing: the in-process parser covers these (plus ffprobe for
+# the odd .avi/.flv). Plain audio files only need stat + duplicate checks.
+_PROBED_EXTS = VIDEO_EXTS | {".m4a"}
+
+# Bytes hashed from each end of a file to tell same-size files apart.
+_FINGERPRINT_BYTES = 1 << 20
+
+_INDEX_VERSION = 1
+
+
+def default_index_path(root: str) -> str:
+    """One index per scanned folder, under ``config.STATE_DIR``."""
+    digest = hashlib.sha1(os.path.abspath(root).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(config.STATE_DIR, "library", f"{digest}.json")
+
+
+def scan(
+    root: str,
+    *,
+    min_height: int = 1080,
+    index_path: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> dict:
+    """Scan ``root`` recursively and return the report (see module doc)."""
+    started = time.perf_counter()
+    root = os.path.abspath(os.path.expanduser(root))
+    if not os.path.isdir(root):
+        raise NotADirectoryError(root)
+    index_path = index_path or default_index_path(root)
+    previous = _load_index(index_path)
+
+    entries: dict[str, dict] = {}
+    partials: list[dict] = []
+    to_probe: list[tuple[str, dict]] = []
+    reused = 0
+    for path, stat in _walk(root):
+        ext = os.path.splitext(path)[1].lower()
+        if ext in PARTIAL_EXTS:
+            if ext == ".part":
+                partials.append({"path": path, "size": stat.st_size, "target": path[: -len(ext)]})
+            continue
+        if ext not in VIDEO_EXTS and ext not in AUDIO_EXTS:
+            continue
+        key = f"{stat.st_ino}:{stat.st_mtime_ns}:{stat.st_size}"
+        cached = previous.get(key)
+        if cached is not None and cached.get("path") == path:
+            entries[key] = cached
+            reused += 1
+            continue
+        entry = {"path": path, "size": stat.st_size, "info": None, "fingerprint": None}
+        entries[key] = entry
+        if ext in _PROBED_EXTS:
+            to_probe.append((path, entry))
+
+    with ThreadPoolExecutor(workers or config.SCAN_WORKERS, thread_name_prefix="scan") as pool:
+        for entry, info in zip(
+            (entry for _, entry in to_probe),
+            pool.map(mediainfo.probe_file, (path for path, _ in to_probe)),
+        ):
+            entry["info"] = info
+        duplicates = _find_duplicates(entries.values(), pool)
+
+    _save_index(index_path, entries)
+
+    report = {
+        "root": root,
+        "files": len(entries),
+        "read": len(to_probe),
+        "reused": reused,
+        "partials": sorted(partials, key=lambda p: p["path"]),
+        "incomplete": [],
+        "below_quality": [],
+        "duplicates": duplicates,
+        "unreadable": [],
+        "min_height": min_height,
+    }
+    for entry in sorted(entries.values(), key=lambda e: e["path"]):
+        ext = os.path.splitext(entry["path"])[1].lower()
+        info = entry["info"]
+        if ext not in _PROBED_EXTS:
+            continue
+        if info is None:
+            report["unreadable"].append(entry["path"])
+        elif not info.get("complete", True):
+            report["incomplete"].append({"path": entry["path"], "size": entry["size"]})
+        elif ext in VIDEO_EXTS and info.get("height") and info["height"] < min_height:
+            report["below_quality"].append(
+                {"path": entry["path"], "width": info.get("width"), "height": info["height"]}
+            )
+    report["elapsed"] = round(time.perf_counter() - started, 3)
+    return report
+
+
+def _walk(root: str):
+    """Yield ``(path, stat)`` for every regular file under ``root``."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                for item in it:
+                    if item.name.startswith("."):
+                        continue
+                    try:
+                        if item.is_dir(follow_symlinks=False):
+                            stack.append(item.path)
+                        elif item.is_file(follow_symlinks=False):
+                            yield item.path, item.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+def _find_duplicates(entries, pool: ThreadPoolExecutor) -> list[list[str]]:
+    """Same size first (free), then a head+tail hash for the candidates."""
+    by_size: dict[int, list[dict]] = {}
+    for entry in entries:
+        if entry["size"]:
+            by_size.setdefault(entry["size"], []).append(entry)
+    candidates = [e for group in by_size.values() if len(group) > 1 for e in group]
+    missing = [e for e in candidates if not e.get("fingerprint")]
+    for entry, fingerprint in zip(missing, pool.map(_fingerprint, (e["path"] for e in missing))):
+        entry["fingerprint"] = fingerprint
+
+    groups: dict[tuple, list[str]] = {}
+    for entry in candidates:
+        if entry["fingerprint"]:
+            groups.setdefault((entry["size"], entry["fingerprint"]), []).append(entry["path"])
+    return sorted(sorted(paths) for paths in groups.values() if len(paths) > 1)
+
+
+def _fingerprint(path: str) -> Optional[str]:
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, "rb") as fh:
+            digest.update(fh.read(_FINGERPRINT_BYTES))
+            if os.fstat(fh.fileno()).st_size > 2 * _FINGERPRINT_BYTES:
+                fh.seek(-_FINGERPRINT_BYTES, os.SEEK_END)
+            digest.update(fh.read(_FINGERPRINT_BYTES))
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+_index_lock = threading.Lock()
+
+
+def _load_index(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != _INDEX_VERSION:
+        return {}
+    return data.get("entries") or {}
+
+
+def _save_index(path: str, entries: dict) -> None:
+    """Write atomically so an interrupted scan never leaves a torn index."""
+    with _index_lock:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp = f"{path}.tmp"
+        with open(temp, "w", encoding="utf-8") as fh:
+            json.dump({"version": _INDEX_VERSION, "entries": entries}, fh)
+        os.replace(temp, path)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m nerd_downloader scan", description="Download-Ordner prüfen.")
+    parser.add_argument("directory", nargs="?", default=os.path.expanduser("~/Downloads"))
+    parser.add_argument("--min-height", type=int, default=1080)
+    parser.add_argument("--json", action="store_true", help="Bericht als JSON ausgeben")
+    args = parser.parse_args(argv)
+
+    try:
+        report = scan(args.directory, min_height=args.min_height)
+    except NotADirectoryError:
+        print(f"Kein Ordner: {args.directory}")
+        return 2
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return 0
+
+    print(f"{report['files']} Dateien in {report['root']} ({report['read']} neu gelesen, {report['elapsed']}s)")
+    for item in report["partials"]:
+        print(f"  ⏸  fortsetzbar:     {item['path']} ({item['size']} B)")
+    for item in report["incomplete"]:
+        print(f"  ✂  unvollständig:   {item['path']}")
+    for item in report["below_quality"]:
+        print(f"  ⬇  unter {args.min_height}p:    {item['path']} ({item['width']}x{item['height']})")
+    for group in report["duplicates"]:
+        print(f"  ⧉  doppelt:         {' = '.join(group)}")
+    for path in report["unreadable"]:
+        print(f"  ?  nicht lesbar:    {path}")
+    return 0
@@ -0,0 +1,298 @@
+"""Read resolution, duration and codecs straight from container headers.
+
+Checking a finished file used to mean one ``ffprobe`` process per file. For
+MP4/M4A/MOV and WebM/Matroska — everything yt-dlp hands us from YouTube — the
+few header boxes that matter (``moov``/``mvhd``/``tkhd``/``stsd``, or the EBML
+``Info`` and ``Tracks`` elements) are parsed in-process from a memory map, so
+only the header pages are ever read, even for multi-GB files whose ``moov``
+sits behind ``mdat``. Anything else falls back to ``ffprobe`` (path from the
+cached ``toolchain`` probe).
+
+``probe_file(path)`` returns::
+
+    {"container", "width", "height", "duration", "vcodec", "acodec",
+     "complete", "source"}
+
+``complete`` is False when the file ends before its own headers say it should
+(an aborted download); ``source`` is ``"header"`` or ``"ffprobe"``.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import subprocess
+from typing import Optional
+
+from . import toolchain
+
+_MP4_BRANDS = (b"ftyp", b"moov", b"mdat", b"free", b"wide", b"skip")
+_EBML_MAGIC = b"\x1a\x45\xdf\xa3"
+
+
+def probe_file(path: str) -> Optional[dict]:
+    """Media info for ``path``, or None if neither the header parser nor
+    ffprobe can make sense of it."""
+    try:
+        with open(path, "rb") as fh:
+            size = os.fstat(fh.fileno()).st_size
+            if size < 8:
+                return None
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if data[4:8] in _MP4_BRANDS:
+                    return _parse_mp4(data)
+                if data[:4] == _EBML_MAGIC:
+                    return _parse_matroska(data)
+    except (OSError, ValueError, struct.error, IndexError):
+        # Unreadable or mangled header: let ffprobe have a go.
+        pass
+    return _ffprobe(path)
+
+
+def _result(container: str) -> dict:
+    return {
+        "container": container,
+        "width": None,
+        "height": None,
+        "duration": None,
+        "vcodec": None,
+        "acodec": None,
+        "complete": True,
+        "source": "header",
+    }
+
+
+# ---------- MP4 / ISO BMFF ----------
+
+
+def _boxes(data, start: int, end: int):
+    """Yield ``(type, payload_start, box_end)`` for the boxes in [start, end).
+    ``box_end`` may lie beyond ``end`` for a truncated file."""
+    pos = start
+    while pos + 8 <= end:
+        size, kind = struct.unpack_from(">I4s", data, pos)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", data, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header:
+            raise ValueError("bad box size")
+        yield kind, pos + header, pos + size
+        pos += size
+
+
+def _child(data, start: int, end: int, kind: bytes) -> Optional[tuple[int, int]]:
+    for child, payload, box_end in _boxes(data, start, end):
+        if child == kind:
+            return payload, min(box_end, end)
+    return None
+
+
+def _parse_mp4(data) -> dict:
+    info = _result("mp4")
+    end = len(data)
+    moov = None
+    for kind, payload, box_end in _boxes(data, 0, end):
+        if box_end > end:
+            info["complete"] = False
+        if kind == b"ftyp" and data[payload:payload + 4] in (b"M4A ", b"M4B "):
+            info["container"] = "m4a"
+        elif kind == b"moov":
+            moov = (payload, min(box_end, end))
+    if moov is None:
+        # Nothing playable without a moov (download stopped before it).
+        info["complete"] = False
+        return info
+
+    mvhd = _child(data, *moov, b"mvhd")
+    if mvhd:
+        version = data[mvhd[0]]
+        if version == 1:
+            timescale, duration = struct.unpack_from(">IQ", data, mvhd[0] + 20)
+        else:
+            timescale, duration = struct.unpack_from(">II", data, mvhd[0] + 12)
+        if timescale:
+            info["duration"] = duration / timescale
+
+    for kind, payload, box_end in _boxes(data, *moov):
+        if kind != b"trak":
+            continue
+        trak = (payload, min(box_end, moov[1]))
+        handler, codec = _track_handler_and_codec(data, trak)
+        if handler == b"vide" and info["vcodec"] is None:
+            info["vcodec"] = codec
+            tkhd = _child(data, *trak, b"tkhd")
+            if tkhd:
+                width, height = struct.unpack_from(">II", data, tkhd[1] - 8)
+                info["width"], info["height"] = width >> 16, height >> 16
+        elif handler == b"soun" and info["acodec"] is None:
+            info["acodec"] = codec
+    return info
+
+
+def _track_handler_and_codec(data, trak: tuple[int, int]) -> tuple[Optional[bytes], Optional[str]]:
+    mdia = _child(data, *trak, b"mdia")
+    if not mdia:
+        return None, None
+    hdlr = _child(data, *mdia, b"hdlr")
+    handler = bytes(data[hdlr[0] + 8:hdlr[0] + 12]) if hdlr else None
+    codec = None
+    minf = _child(data, *mdia, b"minf")
+    stbl = minf and _child(data, *minf, b"stbl")
+    stsd = stbl and _child(data, *stbl, b"stsd")
+    if stsd:
+        # version/flags, entry_count, then the first sample entry's size + type
+        codec = bytes(data[stsd[0] + 12:stsd[0] + 16]).decode("latin-1").strip()
+    return handler, codec
+
+
+# ---------- WebM / Matroska (EBML) ----------
+
+_SEGMENT = 0x18538067
+_INFO = 0x1549A966
+_TRACKS = 0x1654AE6B
+_CLUSTER = 0x1F43B675
+_DOCTYPE = 0x4282
+
+
+def _vint(data, pos: int, keep_marker: bool) -> tuple[Optional[int], int]:
+    """Decode an EBML variable-length integer at ``pos``; returns
+    ``(value, length)``. Sizes of all ones mean "unknown" (None)."""
+    first = data[pos]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        raise ValueError("bad EBML vint")
+    value = first if keep_marker else first & (mask - 1)
+    for i in range(1, length):
+        value = (value << 8) | data[pos + i]
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        return None, length
+    return value, length
+
+
+def _elements(data, start: int, end: int):
+    """Yield ``(id, payload_start, payload_end)`` for EBML children in
+    [start, end). Unknown sizes run to ``end``; ``payload_end`` may exceed
+    ``end`` for a truncated file."""
+    pos = start
+    while pos < end:
+        try:
+            element, id_len = _vint(data, pos, keep_marker=True)
+            size, size_len = _vint(data, pos + id_len, keep_marker=False)
+        except IndexError:
+            return  # file ends inside an element header
+        payload = pos + id_len + size_len
+        payload_end = end if size is None else payload + size
+        yield element, payload, payload_end
+        pos = payload_end
+
+
+def _uint(data, start: int, end: int) -> int:
+    return int.from_bytes(data[start:end], "big")
+
+
+def _parse_matroska(data) -> dict:
+    info = _result("matroska")
+    end = len(data)
+    for element, payload, payload_end in _elements(data, 0, end):
+        if element == 0x1A45DFA3:
+            for child, start, stop in _elements(data, payload, payload_end):
+                if child == _DOCTYPE:
+                    info["container"] = bytes(data[start:stop]).decode("ascii", "replace")
+        elif element == _SEGMENT:
+            if payload_end > end:
+                info["complete"] = False
+            _parse_segment(data, payload, min(payload_end, end), info)
+            break
+    return info
+
+
+def _parse_segment(data, start: int, end: int, info: dict) -> None:
+    seen_info = seen_tracks = False
+    for element, payload, payload_end in _elements(data, start, end):
+        stop = min(payload_end, end)
+        if element == _INFO:
+            seen_info = True
+            scale, duration = 1_000_000, None
+            for child, cstart, cstop in _elements(data, payload, stop):
+                if child == 0x2AD7B1:  # TimecodeScale (ns)
+                    scale = _uint(data, cstart, cstop)
+                elif child == 0x4489:  # Duration (float, in TimecodeScale units)
+                    fmt = ">f" if cstop - cstart == 4 else ">d"
+                    duration = struct.unpack_from(fmt, data, cstart)[0]
+            if duration is not None:
+                info["duration"] = duration * scale / 1e9
+        elif element == _TRACKS:
+            seen_tracks = True
+            for child, cstart, cstop in _elements(data, payload, stop):
+                if child == 0xAE:  # TrackEntry
+                    _parse_track(data, cstart, cstop, info)
+        elif element == _CLUSTER:
+            # Media data starts here; headers come first in files we write.
+            if seen_info and seen_tracks:
+                return
+        if payload_end > end:
+            info["complete"] = False
+            return
+
+
+def _parse_track(data, start: int, end: int, info: dict) -> None:
+    kind, codec, width, height = None, None, None, None
+    for element, payload, payload_end in _elements(data, start, end):
+        if element == 0x83:  # TrackType: 1 video, 2 audio
+            kind = _uint(data, payload, payload_end)
+        elif element == 0x86:  # CodecID, e.g. V_VP9 / A_OPUS
+            codec = bytes(data[payload:payload_end]).decode("ascii", "replace")
+        elif element == 0xE0:  # Video
+            for child, cstart, cstop in _elements(data, payload, payload_end):
+                if child == 0xB0:
+                    width = _uint(data, cstart, cstop)
+                elif child == 0xBA:
+                    height = _uint(data, cstart, cstop)
+    if kind == 1 and info["vcodec"] is None:
+        info["vcodec"], info["width"], info["height"] = codec, width, height
+    elif kind == 2 and info["acodec"] is None:
+        info["acodec"] = codec
+
+
+# ---------- fallback ----------
+
+
+def _ffprobe(path: str) -> Optional[dict]:
+    ffprobe = toolchain.ffprobe_path()
+    if not ffprobe:
+        return None
+    cmd = [
+        ffprobe, "-v", "error",
+        "-show_entries", "format=format_name,duration:stream=codec_type,codec_name,width,height",
+        "-of", "json", path,
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        probed = json.loads(result.stdout or "{}")
+    except (OSError, subprocess.SubprocessError, ValueError):
+        return None
+    fmt = probed.get("format")
+    if not fmt:
+        return None
+    info = _result(fmt.get("format_name", "").split(",")[0])
+    info["source"] = "ffprobe"
+    try:
+        info["duration"] = float(fmt["duration"])
+    except (KeyError, TypeError, ValueError):
+        pass
+    for stream in probed.get("streams") or []:
+        if stream.get("codec_type") == "video" and info["vcodec"] is None:
+            info["vcodec"] = stream.get("codec_name")
+            info["width"], info["height"] = stream.get("width"), stream.get("height")
+        elif stream.get("codec_type") == "audio" and info["acodec"] is None:
+            info["acodec"] = stream.get("codec_name")
+    return info
@@ -0,0 +1,101 @@
+"""Staged download pipeline: network fetch and ffmpeg post-processing.
+
+A job used to hold its slot from the first byte until ffmpeg finished merging,
+so the link idled while ffmpeg ran and the CPU idled while bytes arrived. Now a
+job passes through two independently bounded stages:
+
+  * ``fetch``       — downloading the video/audio streams (network bound)
+  * ``postprocess`` — merging / transcoding with ffmpeg (CPU/disk bound)
+
+A job leaves ``fetch`` as soon as its streams are on disk, so job N+1 starts
+downloading while job N is merged. Waiting jobs are admitted
+shortest-first (by expected size), FIFO among equals.
+
+Each download still runs on its own thread (see ``app._run_download``); the
+stages only decide when that thread may proceed, so no work is handed between
+threads and progress callbacks keep working unchanged.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from . import config, subtitles, tagging, transcode
+
+
+class Stage:
+    """At most ``limit`` jobs inside at once; the rest wait by priority."""
+
+    def __init__(self, name: str, limit: int) -> None:
+        self.name = name
+        self._limit = max(1, limit)
+        self._active = 0
+        self._waiting: list[tuple[float, int]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(
+        self,
+        priority: Optional[float] = None,
+        on_wait: Optional[Callable[[], None]] = None,
+    ) -> Iterator[None]:
+        """Hold one slot for the ``with`` block. Lower ``priority`` goes first;
+        ``None`` (unknown size) queues behind every known one. ``on_wait`` is
+        called once if the job has to queue."""
+        ticket = (float("inf") if priority is None else priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            if not self._may_enter(ticket) and on_wait:
+                on_wait()
+            while not self._may_enter(ticket):
+                self._cond.wait()
+            heapq.heappop(self._waiting)
+            self._active += 1
+            # The next ticket in line may fit too (limit raised, several free slots).
+            self._cond.notify_all()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    def set_limit(self, limit: int) -> None:
+        with self._cond:
+            self._limit = max(1, limit)
+            self._cond.notify_all()
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "limit": self._limit,
+                "active": self._active,
+                "waiting": len(self._waiting),
+            }
+
+    def _may_enter(self, ticket: tuple[float, int]) -> bool:
+        return self._active < self._limit and self._waiting[0] == ticket
+
+
+# Module-level stages shared by every download in this process.
+fetch = Stage("fetch", config.FETCH_WORKERS)
+postprocess = Stage("postprocess", config.POSTPROCESS_WORKERS)
+
+
+def snapshot() -> dict:
+    return {
+        "fetch": fetch.snapshot(),
+        "postprocess": postprocess.snapshot(),
+        "transcode": transcode.pool.snapshot(),
+        "tagging": tagging.pool.snapshot(),
+        "subtitles": subtitles.pool.snapshot(),
+    }
@@ -0,0 +1,147 @@
+"""Compact records projected from yt-dlp info dicts.
+
+A resolved info dict is large: hundreds of ``formats`` (each with its URL,
+headers and fragment list), ``automatic_captions`` for every language, the
+``heatmap``, the full description. Kept around for a playlist preview or a
+long batch, a few of them cost more than the rest of the process. What the
+app reads from all that is a handful of fields, so that is all a record
+keeps:
+
+  * ``VideoRecord`` — one resolved video; of the formats only the distinct
+    heights survive (that is all the quality picker needs);
+  * ``EntryRecord`` — one flat playlist item.
+
+Both use ``__slots__`` and intern the strings that repeat across a list
+(uploader, extractor), so a 1,000-entry playlist is a few hundred KB
+instead of the raw dicts' hundreds of MB (``benchmarks/bench_records.py``).
+``as_dict()`` gives the JSON shape the web API has always returned.
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import Optional
+
+from . import thumbs
+
+
+def fmt_duration(seconds: Optional[float]) -> str:
+    if not seconds:
+        return ""
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    if h:
+        return f"{h}:{m:02d}:{s:02d}"
+    return f"{m}:{s:02d}"
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _thumbnail(info: dict) -> Optional[str]:
+    thumb = info.get("thumbnail")
+    if not thumb:
+        candidates = info.get("thumbnails") or []
+        if candidates:
+            thumb = candidates[-1].get("url")
+    return thumb
+
+
+class VideoRecord:
+    """The fields of a resolved video the UI and the GUI use."""
+
+    __slots__ = (
+        "id", "title", "uploader", "duration", "duration_string", "thumbnail_url",
+        "webpage_url", "extractor", "is_live", "view_count", "upload_date", "heights",
+    )
+
+    def __init__(self, **fields) -> None:
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_info(cls, info: dict) -> "VideoRecord":
+        heights = sorted(
+            {
+                f.get("height")
+                for f in (info.get("formats") or [])
+                if isinstance(f, dict) and f.get("height")
+            },
+            reverse=True,
+        )
+        return cls(
+            id=info.get("id"),
+            title=info.get("title") or "Unbekannter Titel",
+            uploader=_intern(info.get("uploader") or info.get("channel") or ""),
+            duration=info.get("duration"),
+            # Format ourselves for a consistent M:SS / H:MM:SS (yt-dlp sometimes
+            # returns bare seconds like "19").
+            duration_string=fmt_duration(info.get("duration")) or info.get("duration_string") or "",
+            thumbnail_url=_thumbnail(info),
+            webpage_url=info.get("webpage_url") or info.get("original_url"),
+            extractor=_intern(info.get("extractor_key") or info.get("extractor")),
+            is_live=bool(info.get("is_live")),
+            view_count=info.get("view_count"),
+            upload_date=info.get("upload_date"),
+            heights=tuple(heights),
+        )
+
+    @property
+    def max_height(self) -> Optional[int]:
+        return self.heights[0] if self.heights else None
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "uploader": self.uploader,
+            "duration": self.duration,
+            "duration_string": self.duration_string,
+            # Served resized and cached by /api/thumb; the original stays available.
+            "thumbnail": thumbs.local_url(self.id, self.thumbnail_url),
+            "thumbnail_url": self.thumbnail_url,
+            "webpage_url": self.webpage_url,
+            "extractor": self.extractor,
+            "is_live": self.is_live,
+            "view_count": self.view_count,
+            "upload_date": self.upload_date,
+            "max_height": self.max_height,
+            "available_heights": list(self.heights),
+        }
+
+
+class EntryRecord:
+    """One flat playlist item."""
+
+    __slots__ = ("index", "id", "title", "url", "uploader", "duration", "thumbnail_url")
+
+    def __init__(self, **fields) -> None:
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_entry(cls, entry: dict, index: int, url: str) -> "EntryRecord":
+        return cls(
+            index=index,
+            id=entry.get("id"),
+            title=entry.get("title") or "Unbekannter Titel",
+            url=url,
+            uploader=_intern(entry.get("uploader") or entry.get("channel") or ""),
+            duration=entry.get("duration"),
+            thumbnail_url=_thumbnail(entry),
+        )
+
+    def as_dict(self) -> dict:
+        return {
+            "index": self.index,
+            "id": self.id,
+            "title": self.title,
+            "url": self.url,
+            "uploader": self.uploader,
+            "duration": self.duration,
+            "duration_string": fmt_duration(self.duration),
+            "thumbnail": thumbs.local_url(self.id, self.thumbnail_url),
+            "thumbnail_url": self.thumbnail_url,
+        }
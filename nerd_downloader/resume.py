@@ -0,0 +1,243 @@
+"""Resume interrupted downloads across restarts.
+
+``JobManager`` lives in memory, so a killed server used to forget its jobs,
+and the next attempt re-probed the video — often picking other formats, and
+with them other ``.part`` names, so it started from zero. Each web download
+now keeps a checkpoint in ``<STATE_DIR>/resume.json``: URL, preset, output
+folder, weight, subtitle languages, the format IDs yt-dlp selected, and for
+every ``.part`` file the byte offset reached plus a digest of the bytes
+just before it.
+
+After a restart, ``app.resume_interrupted`` restarts those jobs under their
+old IDs. The saved format IDs are pinned at the front of the format selector
+(the preset stays as fallback), so the ``.part`` paths come out the same.
+Before yt-dlp appends, every recorded ``.part`` is validated: it must still
+reach the saved offset and the digest must match. A plain HTTP ``.part`` is
+then cut back to that offset — anything after it was never checked — and
+yt-dlp continues with a ``Range`` request from there. A ``.part`` that fails
+the check is deleted and that stream starts over. Fragmented (DASH/HLS)
+downloads resume via yt-dlp's own ``.ytdl`` fragment index and are only
+validated, never cut.
+
+A checkpoint is dropped once its job ends, successfully or not; only jobs
+cut off by a dying process are resumed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Optional, Sequence
+
+from . import config
+
+# Seconds between checkpoint writes while a job downloads.
+_SAVE_INTERVAL = 5.0
+
+# Bytes before the saved offset that must match on resume.
+_WINDOW = 64 << 10
+
+# Checkpoints older than this are not resumed (matches ``scratch._MAX_AGE``).
+_MAX_AGE = 7 * 24 * 3600
+
+
+def _digest(path: str, offset: int) -> Optional[str]:
+    try:
+        with open(path, "rb") as fh:
+            fh.seek(max(0, offset - _WINDOW))
+            data = fh.read(min(offset, _WINDOW))
+    except OSError:
+        return None
+    return hashlib.sha256(data).hexdigest()
+
+
+def _remove_part(path: str) -> None:
+    """Delete a ``.part`` and yt-dlp's fragment state (``<final>.ytdl``) next to it."""
+    final = path[: -len(".part")] if path.endswith(".part") else path
+    for stale in (path, f"{final}.ytdl"):
+        try:
+            os.remove(stale)
+        except OSError:
+            pass
+
+
+def validate(path: str, record: dict) -> bool:
+    """Check ``path`` against its checkpoint ``record`` and trim it to the
+    verified offset. False (and the file removed) if it can't be trusted."""
+    offset = int(record.get("offset") or 0)
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return False
+    if size < offset or _digest(path, offset) != record.get("digest"):
+        _remove_part(path)
+        return False
+    if size > offset and not record.get("fragmented"):
+        with open(path, "r+b") as fh:
+            fh.truncate(offset)
+    return True
+
+
+class ResumeStore:
+    """Checkpoints of running downloads, persisted as one JSON file."""
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path or os.path.join(config.STATE_DIR, "resume.json")
+        self._lock = threading.Lock()
+        self._entries: Optional[dict[str, dict]] = None
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._load().get(job_id)
+        return json.loads(json.dumps(entry)) if entry else None
+
+    def put(self, entry: dict) -> None:
+        with self._lock:
+            entries = self._load()
+            entries[entry["job_id"]] = json.loads(json.dumps(entry))
+            self._save(entries)
+
+    def drop(self, job_id: str) -> None:
+        with self._lock:
+            entries = self._load()
+            if entries.pop(job_id, None) is not None:
+                self._save(entries)
+
+    def pending(self) -> list[dict]:
+        """Interrupted jobs, oldest first."""
+        with self._lock:
+            return sorted(self._load().values(), key=lambda e: e["created"])
+
+    def _load(self) -> dict[str, dict]:
+        if self._entries is None:
+            try:
+                with open(self.path, encoding="utf-8") as fh:
+                    data = json.load(fh)
+            except (OSError, ValueError):
+                data = {}
+            cutoff = time.time() - _MAX_AGE
+            self._entries = {
+                k: e for k, e in (data.items() if isinstance(data, dict) else ())
+                if isinstance(e, dict) and e.get("updated", 0) > cutoff
+            }
+        return self._entries
+
+    def _save(self, entries: dict[str, dict]) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp = f"{self.path}.tmp"
+            with open(temp, "w", encoding="utf-8") as fh:
+                json.dump(entries, fh)
+            os.replace(temp, self.path)
+        except OSError:
+            pass  # a lost checkpoint only means starting over
+
+
+default_store = ResumeStore()
+
+
+class Checkpoint:
+    """One job's resume state; picks up a saved one for the same ``job_id``."""
+
+    def __init__(
+        self,
+        job_id: str,
+        url: str,
+        format_id: str,
+        output_dir: str,
+        weight: float = 1.0,
+        subtitle_langs: Sequence[str] = (),
+        *,
+        store: Optional[ResumeStore] = None,
+    ) -> None:
+        self._store = store or default_store
+        now = time.time()
+        self.entry = self._store.get(job_id) or {
+            "job_id": job_id,
+            "url": url,
+            "format": format_id,
+            "output_dir": output_dir,
+            "weight": weight,
+            "subtitle_langs": list(subtitle_langs),
+            "format_ids": None,
+            "parts": {},
+            "created": now,
+        }
+        self.entry["updated"] = now
+        self._live: dict[str, tuple[int, bool]] = {}
+        self._saved_at = 0.0
+        self._lock = threading.Lock()
+        self._store.put(self.entry)
+
+    @property
+    def format_ids(self) -> Optional[list[str]]:
+        return self.entry.get("format_ids")
+
+    def selector(self, fallback: str) -> str:
+        """``fallback`` with the saved formats pinned in front of it."""
+        return f"{'+'.join(self.format_ids)}/{fallback}" if self.format_ids else fallback
+
+    def plan(self, info: dict) -> None:
+        """Record the formats yt-dlp selected; parts of other formats are stale."""
+        ids = [f["format_id"] for f in info.get("requested_formats") or [info] if f.get("format_id")]
+        with self._lock:
+            if ids != self.format_ids:
+                for path in {*self.entry["parts"], *self._live}:
+                    _remove_part(path)
+                self.entry["parts"] = {}
+                self._live.clear()
+            self.entry["format_ids"] = ids
+            self._save()
+
+    def restore(self) -> int:
+        """Validate the recorded ``.part`` files; returns the bytes kept."""
+        kept = 0
+        with self._lock:
+            for path, record in list(self.entry["parts"].items()):
+                if validate(path, record):
+                    kept += os.path.getsize(path)
+                else:
+                    del self.entry["parts"][path]
+            self._save()
+        return kept
+
+    def hook(self) -> Callable[[dict], None]:
+        """yt-dlp progress hook that records offsets, saving now and then."""
+
+        def hook(d: dict) -> None:
+            status = d.get("status")
+            part = d.get("tmpfilename") or (f"{d['filename']}.part" if d.get("filename") else None)
+            if not part:
+                return
+            with self._lock:
+                if status == "downloading":
+                    new = part not in self._live
+                    self._live[part] = (int(d.get("downloaded_bytes") or 0), d.get("fragment_index") is not None)
+                    if new or time.monotonic() - self._saved_at >= _SAVE_INTERVAL:
+                        self._save()
+                elif status == "finished":
+                    self._live.pop(part, None)
+                    self.entry["parts"].pop(part, None)
+                    self._save()
+
+        return hook
+
+    def done(self) -> None:
+        """The job ended (either way); nothing left to resume."""
+        self._store.drop(self.entry["job_id"])
+
+    def _save(self) -> None:
+        for path, (downloaded, fragmented) in self._live.items():
+            try:
+                offset = min(downloaded, os.path.getsize(path))
+            except OSError:
+                continue
+            digest = _digest(path, offset)
+            if digest:
+                self.entry["parts"][path] = {"offset": offset, "digest": digest, "fragmented": fragmented}
+        self.entry["updated"] = time.time()
+        self._saved_at = time.monotonic()
+        self._store.put(self.entry)
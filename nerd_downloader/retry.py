@@ -0,0 +1,205 @@
+"""Retry governor: classify failures, back off with jitter, stop the herd on 429.
+
+Every yt-dlp attempt in the app (``engine.extract_info``/``download`` and the
+strategy loops of the Tk GUI and ``EnhancedDownloader``) runs through
+``call``. A failure is sorted into one of four classes:
+
+  * ``transient`` — network hiccups, 5xx, timeouts: retry the same attempt
+    after an exponential, jittered delay;
+  * ``throttled`` — HTTP 429 / "too many requests": retry with a longer
+    backoff, and count towards the circuit breaker;
+  * ``auth``      — private, age-restricted, "confirm you're not a bot", a
+    thin format list: retrying the same request won't help, but the next
+    strategy (browser cookies) might;
+  * ``permanent`` — removed, unsupported, disk full: nothing will help, stop.
+
+The circuit breaker is shared by all jobs. When throttled outcomes make up
+too large a share of recent attempts it opens, and every new attempt waits
+out a cool-down (doubling on repeated trips) instead of all jobs hammering
+YouTube in lockstep.
+"""
+
+from __future__ import annotations
+
+import collections
+import random
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+from . import unavailable
+
+TRANSIENT = "transient"
+THROTTLED = "throttled"
+AUTH = "auth"
+PERMANENT = "permanent"
+
+_THROTTLE_MARKERS = ("http error 429", "too many requests", "rate-limited", "rate limited")
+
+# YouTube's "Sign in to confirm you're not a bot" wall is lifted by cookies,
+# not by waiting: straight on to the next strategy.
+_BOT_WALL_MARKERS = ("not a bot", "sign in to confirm")
+
+# A cookie session often gets the fuller format list, so a missing format is
+# worth another strategy rather than a retry.
+_FORMAT_MARKERS = ("requested format", "format unavailable", "format is not available", "no video formats")
+
+# Server errors and timeouts, checked before the "unavailable" lookup: a
+# "503 Service Unavailable" is a reason to retry, not a removed video.
+_TRANSIENT_MARKERS = ("http error 5", "timed out", "temporarily")
+
+# Attempts per strategy, and backoff (base, cap) in seconds, per class.
+_ATTEMPTS = {TRANSIENT: 3, THROTTLED: 4, AUTH: 1, PERMANENT: 1}
+_BACKOFF = {TRANSIENT: (1.0, 30.0), THROTTLED: (5.0, 120.0)}
+
+T = TypeVar("T")
+
+# Indirection so tests can skip the real waiting.
+_sleep = time.sleep
+
+
+def is_throttled(text: str) -> bool:
+    """Does this error or log line say YouTube is rate-limiting us?"""
+    low = text.lower()
+    return any(marker in low for marker in _THROTTLE_MARKERS)
+
+
+def classify(error: object) -> str:
+    """One of ``transient``/``throttled``/``auth``/``permanent``."""
+    low = str(error or "").lower()
+    if is_throttled(low):
+        return THROTTLED
+    if any(marker in low for marker in _BOT_WALL_MARKERS + _FORMAT_MARKERS):
+        return AUTH
+    if "no space left on device" in low:
+        return PERMANENT
+    if any(marker in low for marker in _TRANSIENT_MARKERS):
+        return TRANSIENT
+    error_class = unavailable.classify(low)
+    if error_class in ("removed", "unsupported"):
+        return PERMANENT
+    if error_class:
+        return AUTH
+    return TRANSIENT
+
+
+def backoff(attempt: int, kind: str = TRANSIENT) -> float:
+    """Delay before retry number ``attempt`` (1-based): exponential, capped,
+    with "equal jitter" — half fixed, half random — so parallel jobs spread
+    out but never retry instantly."""
+    base, cap = _BACKOFF.get(kind, _BACKOFF[TRANSIENT])
+    ceiling = min(cap, base * 2 ** max(0, attempt - 1))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+def _ytdlp_sleep(n: int) -> float:
+    return backoff(n + 1)
+
+
+# For yt-dlp's own ``retries``/``fragment_retries``: back off between its
+# internal retries instead of firing them back to back.
+YTDLP_SLEEP_FUNCTIONS = {"http": _ytdlp_sleep, "fragment": _ytdlp_sleep, "extractor": _ytdlp_sleep}
+
+
+class CircuitBreaker:
+    """Opens when the throttled share of recent attempts crosses ``threshold``."""
+
+    def __init__(
+        self,
+        *,
+        window: float = 60.0,
+        threshold: float = 0.5,
+        min_events: int = 4,
+        cooldown: float = 30.0,
+        max_cooldown: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.window = window
+        self.threshold = threshold
+        self.min_events = min_events
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._clock = clock
+        self._events: collections.deque[tuple[float, bool]] = collections.deque()
+        self._open_until = 0.0
+        self._trips = 0
+        self._lock = threading.Lock()
+
+    def record(self, throttled: bool, *, success: bool = False) -> None:
+        """Count one attempt's outcome; a success after a trip resets the
+        cool-down escalation."""
+        with self._lock:
+            now = self._clock()
+            self._events.append((now, throttled))
+            while self._events and self._events[0][0] < now - self.window:
+                self._events.popleft()
+            if success and now >= self._open_until:
+                self._trips = 0
+            if not throttled:
+                return
+            hits = sum(1 for _, t in self._events if t)
+            if now >= self._open_until and len(self._events) >= self.min_events and hits / len(self._events) >= self.threshold:
+                self._open_until = now + min(self.max_cooldown, self.cooldown * 2 ** self._trips)
+                self._trips += 1
+                self._events.clear()
+
+    def remaining(self) -> float:
+        with self._lock:
+            return max(0.0, self._open_until - self._clock())
+
+    def wait(self, on_wait: Optional[Callable[[float], None]] = None) -> float:
+        """Block while the breaker is open; returns the seconds waited."""
+        waited = 0.0
+        while True:
+            left = self.remaining()
+            if left <= 0:
+                return waited
+            if on_wait and not waited:
+                on_wait(left)
+            _sleep(left)
+            waited += left
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            now = self._clock()
+            recent = [t for at, t in self._events if at >= now - self.window]
+            return {
+                "open": now < self._open_until,
+                "open_for": round(max(0.0, self._open_until - now), 1),
+                "trips": self._trips,
+                "recent": len(recent),
+                "throttled": sum(recent),
+            }
+
+
+breaker = CircuitBreaker()
+
+
+def call(
+    fn: Callable[[], T],
+    *,
+    on_retry: Optional[Callable[[str, float], None]] = None,
+    on_pause: Optional[Callable[[float], None]] = None,
+) -> T:
+    """Run ``fn`` under the governor: wait while the breaker is open, retry
+    transient/throttled failures with backoff, re-raise everything else (and
+    the last failure once the attempts are used up). ``on_retry(kind, delay)``
+    and ``on_pause(seconds)`` let the caller tell the user why it's waiting."""
+    attempt = 0
+    while True:
+        breaker.wait(on_pause)
+        try:
+            result = fn()
+        except Exception as exc:
+            kind = classify(exc)
+            breaker.record(kind == THROTTLED)
+            attempt += 1
+            if attempt >= _ATTEMPTS[kind]:
+                raise
+            delay = backoff(attempt, kind)
+            if on_retry:
+                on_retry(kind, delay)
+            _sleep(delay)
+            continue
+        breaker.record(False, success=True)
+        return result
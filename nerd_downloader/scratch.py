@@ -0,0 +1,220 @@
+"""Scratch space for downloads in progress.
+
+With ``NERDDL_SCRATCH_DIR`` set (a local SSD or a tmpfs), everything a job
+writes while it runs — ``.part`` files and fragments, the separate video and
+audio streams, ffmpeg's merge temp file, audio encodes — goes to a job
+directory there instead of the output folder, which may well be a slow USB
+disk or a network share. Only the finished file moves to the output folder:
+by ``os.replace`` when both are on the same filesystem, otherwise by one
+streamed copy into a hidden temp file next to the target, ``fsync``, then a
+rename. Either way the output folder never shows a half-written file, and
+an existing file of the same name is never replaced unless asked to: the
+new one gets the next free ``name (n).ext``.
+
+Job directories are named after video and format, so a retry finds its
+``.part`` files again. A running job holds a lock on its directory; a second
+job for the same video and format (in this process or another) gets a
+directory of its own. They are removed once the job is done; ones left
+behind by failed jobs are pruned after ``_MAX_AGE``.
+
+Without a scratch directory, ``workdir`` is the output folder itself and
+``finalize`` is a no-op.
+"""
+
+from __future__ import annotations
+
+import errno
+import hashlib
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from . import config, urls
+
+try:
+    import fcntl
+except ImportError:  # Windows: job directories are not locked
+    fcntl = None
+
+# Job directories untouched for this long belong to jobs nobody will retry.
+_MAX_AGE = 7 * 24 * 3600
+
+_PREFIX = "job-"
+_LOCK = ".lock"
+_CHUNK = 8 << 20
+
+# Lock file descriptors of the job directories this process holds.
+_held: dict[str, int] = {}
+_held_lock = threading.Lock()
+
+
+def workdir(url: str, format_id: str, output_dir: str, root: Optional[str] = None) -> str:
+    """Directory the job for ``url``/``format_id`` writes into, locked for
+    it until ``discard`` or ``release``."""
+    root = config.SCRATCH_DIR if root is None else root
+    if not root:
+        return output_dir
+    os.makedirs(root, exist_ok=True)
+    _prune(root)
+    digest = hashlib.sha1(f"{urls.canonical(url) or url.strip()}|{format_id}".encode()).hexdigest()[:16]
+    for n in itertools.count(1):
+        path = os.path.join(root, _PREFIX + digest + ("" if n == 1 else f"-{n}"))
+        os.makedirs(path, exist_ok=True)
+        if _acquire(path):
+            return path
+
+
+def same_filesystem(a: str, b: str) -> bool:
+    return os.stat(a).st_dev == os.stat(b).st_dev
+
+
+def finalize(path: str, output_dir: str, overwrite: bool = False) -> str:
+    """Move the finished file ``path`` into ``output_dir``; returns its new path.
+
+    A file of the same name already there is replaced only with
+    ``overwrite``; otherwise the new one is named ``name (n).ext``. Raises
+    ``OSError`` (e.g. ENOSPC) if the copy fails; the file then stays in
+    scratch and nothing is left behind in ``output_dir``.
+    """
+    if os.path.dirname(os.path.abspath(path)) == os.path.abspath(output_dir):
+        return path
+    target = os.path.join(output_dir, os.path.basename(path))
+    try:
+        return _place(path, target, overwrite)
+    except OSError as exc:
+        if exc.errno != errno.EXDEV:
+            raise
+    target = _copy_durably(path, target, overwrite)
+    os.remove(path)
+    return target
+
+
+def discard(path: str, output_dir: str) -> None:
+    """Remove a finished job's directory (never the output folder)."""
+    if os.path.abspath(path) != os.path.abspath(output_dir):
+        shutil.rmtree(path, ignore_errors=True)
+    release(path)
+
+
+def release(path: str) -> None:
+    """Give up the lock on a job directory (kept on disk for a retry)."""
+    with _held_lock:
+        fd = _held.pop(os.path.abspath(path), None)
+    if fd is not None:
+        os.close(fd)
+
+
+def _acquire(path: str) -> bool:
+    """Lock ``path`` for this job; False if another job holds it."""
+    if fcntl is None:
+        return True
+    fd = os.open(os.path.join(path, _LOCK), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return False
+    with _held_lock:
+        _held[os.path.abspath(path)] = fd
+    return True
+
+
+def _place(src: str, target: str, overwrite: bool) -> str:
+    """Rename ``src`` to ``target``, or (without ``overwrite``) to the first
+    free ``target (n)``; a hard link claims the name atomically."""
+    if overwrite:
+        os.replace(src, target)
+        return target
+    stem, ext = os.path.splitext(target)
+    for n in itertools.count():
+        candidate = target if n == 0 else f"{stem} ({n}){ext}"
+        try:
+            os.link(src, candidate)
+        except FileExistsError:
+            continue
+        except OSError as exc:
+            if exc.errno not in (errno.EPERM, errno.ENOTSUP, errno.EOPNOTSUPP, errno.EMLINK):
+                raise
+            # No hard links on this filesystem (FAT, some shares).
+            if os.path.lexists(candidate):
+                continue
+            os.replace(src, candidate)
+            return candidate
+        os.remove(src)
+        return candidate
+
+
+def _copy_durably(src: str, target: str, overwrite: bool) -> str:
+    directory, name = os.path.split(target)
+    fd, temp = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+    try:
+        with open(src, "rb") as fsrc, os.fdopen(fd, "wb") as fdst:
+            _stream(fsrc, fdst)
+            fdst.flush()
+            os.fsync(fdst.fileno())
+        shutil.copymode(src, temp)
+        target = _place(temp, target, overwrite)
+    except BaseException:
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(directory)
+    return target
+
+
+def _stream(fsrc, fdst) -> None:
+    """Copy in the kernel where possible (``sendfile``), else in 8 MiB chunks."""
+    if sys.platform.startswith("linux"):
+        size = os.fstat(fsrc.fileno()).st_size
+        offset = 0
+        try:
+            while offset < size:
+                sent = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, min(_CHUNK, size - offset))
+                if not sent:
+                    break
+                offset += sent
+            if offset >= size:
+                return
+        except OSError:
+            if offset:
+                raise
+        fsrc.seek(offset)
+        fdst.seek(offset)
+    shutil.copyfileobj(fsrc, fdst, _CHUNK)
+
+
+def _fsync_dir(directory: str) -> None:
+    """Persist the rename itself; not every platform can open a directory."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _prune(root: str) -> None:
+    cutoff = time.time() - _MAX_AGE
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.name.startswith(_PREFIX) and entry.is_dir() and entry.stat().st_mtime < cutoff:
+                if _acquire(entry.path):  # not while a job still runs in it
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                    release(entry.path)
+        except OSError:
+            continue
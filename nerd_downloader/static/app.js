@@ -69,7 +69,11 @@ async function api(path, body) {
     body: JSON.stringify(body || {}),
   });
   const data = await res.json().catch(() => ({}));
-  if (!res.ok) throw new Error(data.error || `Fehler (${res.status})`);
+  if (!res.ok) {
+    const err = new Error(data.error || `Fehler (${res.status})`);
+    err.unavailable = data.unavailable || null;
+    throw err;
+  }
   return data;
 }
 
@@ -93,9 +97,32 @@ async function init() {
     if (!meta.is_mac) {
       els.chooseFolderBtn.style.display = "none";
     }
+    if (meta.toolchain && !meta.toolchain.ffmpeg.path) {
+      showError("ffmpeg nicht gefunden — für HD/4K und MP3 nötig: brew install ffmpeg");
+    }
   } catch (e) {
     showError("Konnte App-Daten nicht laden: " + e.message);
   }
+  resumeInterrupted();
+}
+
+// Downloads the server picked up again after a restart: follow the first one.
+async function resumeInterrupted() {
+  try {
+    const { jobs } = await (await fetch("/api/resume")).json();
+    if (!jobs || !jobs.length) return;
+    const job = jobs[0];
+    state.currentUrl = job.url;
+    els.urlInput.value = job.url;
+    els.downloadBtn.disabled = true;
+    els.downloadBtn.querySelector(".dl-label").textContent = "Läuft…";
+    els.progressCard.classList.remove("hidden");
+    els.result.classList.add("hidden");
+    const more = jobs.length > 1 ? ` (+${jobs.length - 1} weitere)` : "";
+    setStatus("Setze unterbrochenen Download fort…" + more, null);
+    setIndeterminate(true);
+    listenProgress(job.job_id);
+  } catch (e) {}
 }
 
 function buildPresets(home) {
@@ -152,7 +179,12 @@ async function analyze() {
     state.currentUrl = info.webpage_url || url;
     renderInfo(info);
   } catch (e) {
-    showError(e.message);
+    if (e.unavailable) {
+      const until = new Date(e.unavailable.until * 1000).toLocaleString("de-DE", { dateStyle: "short", timeStyle: "short" });
+      showError(`${e.message} (bekannt — wird bis ${until} nicht erneut versucht)`);
+    } else {
+      showError(e.message);
+    }
   } finally {
     state.analyzing = false;
     els.analyzeBtn.disabled = false;
@@ -164,9 +196,18 @@ function renderInfo(info) {
   els.videoTitle.textContent = info.title;
   els.videoUploader.textContent = info.uploader || "";
   if (info.thumbnail) {
-    els.thumb.src = info.thumbnail;
+    if (info.thumbnail.startsWith("/api/thumb/")) {
+      // Local proxy: small WebP/JPEG variants, cached by the browser for good.
+      els.thumb.srcset = `${info.thumbnail}?w=320 320w, ${info.thumbnail}?w=640 640w`;
+      els.thumb.sizes = "(max-width: 640px) 100vw, 168px";
+      els.thumb.src = `${info.thumbnail}?w=320`;
+    } else {
+      els.thumb.removeAttribute("srcset");
+      els.thumb.src = info.thumbnail;
+    }
     els.thumb.alt = info.title;
   } else {
+    els.thumb.removeAttribute("srcset");
     els.thumb.removeAttribute("src");
   }
   els.badgeDuration.textContent = info.duration_string || "";
@@ -289,8 +330,11 @@ function handleProgress(d) {
     if (d.total) parts.push(`${fmtBytes(d.downloaded)} / ${fmtBytes(d.total)}`);
     if (d.speed) parts.push(`${fmtBytes(d.speed)}/s`);
     if (d.eta != null) parts.push(`ETA ${fmtEta(d.eta)}`);
+    if (d.batch && d.batch.active > 1 && d.batch.eta != null) {
+      parts.push(`Alle ${d.batch.active}: ETA ${fmtEta(d.batch.eta)}`);
+    }
     els.progressStats.textContent = parts.join("   ");
-  } else if (d.status === "processing") {
+  } else if (d.status === "processing" || d.status === "queued") {
     setStatus(d.message || "Verarbeite…", null);
     setIndeterminate(true);
   } else if (d.status === "retry") {
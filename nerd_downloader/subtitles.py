@@ -0,0 +1,245 @@
+"""Subtitles: only the tracks that exist, fetched beside the media, cached.
+
+yt-dlp's ``writesubtitles``/``writeautomaticsub`` fetch every requested
+language one after another *before* the video download starts, and
+embedding them is another full ffmpeg remux afterwards. Here:
+
+  * ``select`` reads the already-extracted info dict and picks, per wanted
+    language, an uploaded track or else an automatic caption. Languages the
+    video doesn't have cost no request at all.
+  * ``SubtitlePool.fetch`` downloads the picked tracks on a small pool of
+    its own (``NERDDL_SUBTITLE_WORKERS``) while the streams are downloading.
+  * ``SubtitleCache`` keeps them in ``<STATE_DIR>/subtitles`` per video ID,
+    language and kind, so a retry or a second format of the same video
+    doesn't fetch them again.
+  * The engine maps them into the video+audio merge it runs anyway
+    (``merge_args``). Files that are not merged get sidecar files next to
+    them (``write_sidecars``; ``Sidecars`` does that for yt-dlp's own
+    download path in the Tk GUI).
+
+Subtitles are optional extras: a track that can't be fetched is left out,
+never an error.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import shutil
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable, Optional
+
+from yt_dlp.postprocessor.common import PostProcessor
+from yt_dlp.utils import ISO639Utils
+
+from . import config, thumbs
+
+# Formats ffmpeg reads as subtitle input, best first.
+_FORMATS = ("vtt", "srt")
+
+# Container -> ffmpeg subtitle codec for embedding; others get sidecars.
+_CODECS = {".mp4": "mov_text", ".m4v": "mov_text", ".mov": "mov_text", ".mkv": "srt", ".webm": "webvtt"}
+
+# Cached tracks kept on disk; the oldest go first.
+_MAX_FILES = 4000
+
+_LANG_RE = re.compile(r"[A-Za-z]{2,3}(-[\w]{1,8})*", re.ASCII)
+
+
+def parse_langs(value: Iterable[str]) -> list[str]:
+    """Valid language codes from ``value``, in order, without repeats."""
+    langs = [str(v).strip() for v in value]
+    return list(dict.fromkeys(lang for lang in langs if _LANG_RE.fullmatch(lang)))
+
+
+def _pick(tracks: dict, lang: str) -> Optional[tuple[str, dict]]:
+    """``(key, format)`` for ``lang`` (or a regional variant like ``en-GB``)."""
+    keys = [lang] + sorted(k for k in tracks if k.startswith(f"{lang}-") and not k.endswith("-orig"))
+    for key in keys:
+        formats = {f.get("ext"): f for f in tracks.get(key) or [] if f.get("url")}
+        for ext in _FORMATS:
+            if ext in formats:
+                return key, formats[ext]
+    return None
+
+
+def select(info: dict, langs: Iterable[str], automatic: bool = True) -> list[dict]:
+    """The tracks of ``info`` for ``langs``: uploaded subtitles first, then
+    (with ``automatic``) YouTube's automatic captions. Languages with
+    neither are skipped."""
+    picked = []
+    for lang in langs:
+        found = _pick(info.get("subtitles") or {}, lang)
+        auto = False
+        if found is None and automatic:
+            found, auto = _pick(info.get("automatic_captions") or {}, lang), True
+        if found is None:
+            continue
+        key, fmt = found
+        picked.append({"lang": key, "ext": fmt["ext"], "url": fmt["url"], "automatic": auto})
+    return picked
+
+
+def codec_for(path: str) -> Optional[str]:
+    """ffmpeg subtitle codec to embed into ``path``'s container, or None."""
+    return _CODECS.get(os.path.splitext(path)[1].lower())
+
+
+def merge_args(tracks: list[dict], first_input: int, output: str) -> tuple[list[str], list[str]]:
+    """``(input args, output args)`` adding ``tracks`` to an ffmpeg remux
+    whose other inputs are numbered below ``first_input``."""
+    codec = codec_for(output)
+    if not tracks or codec is None:
+        return [], []
+    inputs, outputs = [], []
+    for n, track in enumerate(tracks):
+        inputs += ["-i", track["path"]]
+        outputs += ["-map", f"{first_input + n}:0"]
+        language = ISO639Utils.short2long(track["lang"].split("-")[0])
+        if language:
+            outputs += [f"-metadata:s:s:{n}", f"language={language}"]
+    outputs += ["-c:s", codec]
+    return inputs, outputs
+
+
+def write_sidecars(tracks: list[dict], media_path: str) -> list[str]:
+    """Copy ``tracks`` next to ``media_path`` as ``<stem>.<lang>.<ext>``."""
+    stem = os.path.splitext(media_path)[0]
+    written = []
+    for track in tracks:
+        target = f"{stem}.{track['lang']}.{track['ext']}"
+        try:
+            shutil.copyfile(track["path"], target)
+        except OSError:
+            continue
+        written.append(target)
+    return written
+
+
+class SubtitleCache:
+    """Fetched subtitle files per video ID, language and kind, on disk."""
+
+    def __init__(self, directory: Optional[str] = None, fetch: Callable[[str], bytes] = thumbs.fetch) -> None:
+        self.directory = directory or os.path.join(config.STATE_DIR, "subtitles")
+        self._fetch = fetch
+        self._locks = [threading.Lock() for _ in range(16)]
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, video_id: str, track: dict) -> Optional[str]:
+        """Path of the cached ``track`` (fetching it on a miss), or None."""
+        if not thumbs.valid_id(video_id or "") or not _LANG_RE.fullmatch(track["lang"]):
+            return None
+        kind = ".auto" if track["automatic"] else ""
+        name = f"{video_id}.{track['lang']}{kind}.{track['ext']}"
+        path = os.path.join(self.directory, name)
+        with self._locks[hash(name) % len(self._locks)]:
+            if os.path.exists(path):
+                self.hits += 1
+                return path
+            try:
+                data = self._fetch(track["url"])
+            except Exception:  # noqa: BLE001 — a missing track is not an error
+                return None
+            if not data:
+                return None
+            self.misses += 1
+            return self._store(path, data)
+
+    def _store(self, path: str, data: bytes) -> Optional[str]:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temp = f"{path}.tmp"
+            with open(temp, "wb") as fh:
+                fh.write(data)
+            os.replace(temp, path)
+            entries = sorted(os.scandir(self.directory), key=lambda e: e.stat().st_mtime)
+            for entry in entries[: max(0, len(entries) - _MAX_FILES)]:
+                os.remove(entry.path)
+        except OSError:
+            return None
+        return path
+
+
+class SubtitlePool:
+    """Small pool fetching the tracks of one video per task."""
+
+    def __init__(self, workers: int, cache: Optional[SubtitleCache] = None) -> None:
+        self.workers = max(1, workers)
+        self.cache = cache or SubtitleCache()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._fetched = 0
+        self._skipped = 0
+
+    def fetch(self, info: dict, langs: Iterable[str], automatic: bool = True) -> "Future[list[dict]]":
+        """Start fetching ``info``'s tracks for ``langs``; the future resolves
+        to the tracks that could be had, each with its cached ``path``."""
+        tracks = select(info, langs, automatic)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="subtitles")
+            return self._executor.submit(self._fetch, info.get("id"), tracks)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "fetched": self._fetched,
+                "skipped": self._skipped,
+                "cache_hits": self.cache.hits,
+                "cache_misses": self.cache.misses,
+            }
+
+    def _fetch(self, video_id: Optional[str], tracks: list[dict]) -> list[dict]:
+        done = []
+        for track in tracks:
+            path = self.cache.get(video_id, track)
+            with self._lock:
+                if path:
+                    self._fetched += 1
+                else:
+                    self._skipped += 1
+            if path:
+                done.append({**track, "path": path})
+        return done
+
+
+def collect(future: Optional["Future[list[dict]]"]) -> list[dict]:
+    """The tracks of a ``SubtitlePool.fetch``; [] without one."""
+    if future is None:
+        return []
+    try:
+        return future.result()
+    except Exception:  # noqa: BLE001 — subtitles never fail a download
+        return []
+
+
+class Sidecars(PostProcessor):
+    """Subtitles for downloads that yt-dlp finishes itself (the Tk GUI).
+
+    Register twice: ``when="before_dl"`` starts the fetch from the selected
+    video's info as its streams begin downloading, ``when="after_move"``
+    writes the tracks next to the final file.
+    """
+
+    def __init__(self, langs: Iterable[str], subtitles: Optional[SubtitlePool] = None, downloader=None) -> None:
+        super().__init__(downloader)
+        self.langs = parse_langs(langs)
+        self._pool = subtitles or pool
+        self._pending: dict[str, Future] = {}
+        self.written: list[str] = []
+
+    def run(self, information: dict):
+        key = information.get("id") or information.get("webpage_url") or ""
+        if information.get("filepath") and key in self._pending:
+            tracks = collect(self._pending.pop(key))
+            self.written += write_sidecars(tracks, information["filepath"])
+        elif key not in self._pending and self.langs:
+            self._pending[key] = self._pool.fetch(information, self.langs)
+        return [], information
+
+
+# Module-level pool shared by the web app and the GUI.
+pool = SubtitlePool(config.SUBTITLE_WORKERS)
@@ -0,0 +1,191 @@
+"""Incremental channel/playlist sync: fetch only what is new since last time.
+
+Each source (channel or playlist URL) keeps a high-water mark in
+``<STATE_DIR>/sync.json``: the video IDs already taken, plus — for playlists —
+how long the list was. A sync walks the flat listing (``engine.iter_playlist``)
+and stops as early as it can:
+
+  * channels list newest first, so the walk ends at the first known ID —
+    usually within the first page;
+  * playlists grow at the end, so the walk starts a little before the last
+    known length and keeps only unknown IDs.
+
+Nothing is resolved beyond those flat pages; formats are extracted only for
+the entries that actually get downloaded. Marks are written by ``commit``
+after the caller has handled the entries; entries that failed are kept as
+``pending`` and offered again next time (a channel walk stops before them).
+
+CLI: ``python -m nerd_downloader sync URL [URL ...] [--dry-run] [--format F]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from . import config, engine
+
+# IDs remembered per source; enough to cover any realistic playlist.
+_SEEN_LIMIT = 5000
+
+# Playlists are re-walked from this many items before their last known end,
+# so removals earlier in the list can't make us skip new items.
+_PLAYLIST_OVERLAP = 50
+
+_CHANNEL_RE = re.compile(r"youtube\.com/(?:@[^/?#]+|channel/|c/|user/)", re.IGNORECASE)
+
+
+def source_kind(url: str) -> str:
+    """``"channel"`` (newest first) or ``"playlist"`` (appended at the end)."""
+    return "channel" if _CHANNEL_RE.search(url) and "list=" not in url else "playlist"
+
+
+class SyncStore:
+    """High-water marks per source, persisted as one JSON file."""
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path or os.path.join(config.STATE_DIR, "sync.json")
+        self._lock = threading.Lock()
+
+    def get(self, source: str) -> Optional[dict]:
+        with self._lock:
+            return self._load().get(source)
+
+    def update(self, source: str, state: dict) -> None:
+        with self._lock:
+            data = self._load()
+            data[source] = state
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp = f"{self.path}.tmp"
+            with open(temp, "w", encoding="utf-8") as fh:
+                json.dump(data, fh)
+            os.replace(temp, self.path)
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+
+def check(url: str, *, store: Optional[SyncStore] = None, initial_limit: Optional[int] = None) -> dict:
+    """List the entries of ``url`` not seen before, walking as little as possible.
+
+    On the first sync of a source every entry is new (at most
+    ``initial_limit`` of them). Returns ``{source, kind, title, new, walked,
+    count, first_sync}``; pass it to ``commit`` once the entries are handled.
+    Raises ``EngineError`` like ``engine.iter_playlist``.
+    """
+    store = store or default_store
+    kind = source_kind(url)
+    state = store.get(url)
+    seen = set(state["seen"]) if state else set()
+
+    start, limit = 1, None
+    if state is None:
+        limit = initial_limit
+    elif kind == "playlist":
+        start = max(1, state.get("count", 0) - _PLAYLIST_OVERLAP + 1)
+
+    title, new, walked, count = "", [], 0, 0
+    stream = engine.iter_playlist(url, start=start, limit=limit)
+    try:
+        for item_kind, item in stream:
+            if item_kind == "playlist":
+                title = item["title"]
+                continue
+            walked += 1
+            count = item["index"]
+            if item["id"] in seen:
+                if kind == "channel":
+                    break  # everything below is older and already known
+                continue
+            new.append(item)
+    finally:
+        stream.close()
+
+    # Earlier failures first get another chance (unless they came up anyway).
+    listed = {item["id"] for item in new}
+    new = [e for e in (state or {}).get("pending", []) if e["id"] not in listed] + new
+
+    return {
+        "source": url,
+        "kind": kind,
+        "title": title,
+        "new": new,
+        "walked": walked,
+        "count": max(count, state.get("count", 0) if state else 0),
+        "first_sync": state is None,
+    }
+
+
+def commit(result: dict, done: Optional[list[dict]] = None, *, store: Optional[SyncStore] = None) -> None:
+    """Record ``done`` (default: all of ``result["new"]``) as seen."""
+    store = store or default_store
+    done = result["new"] if done is None else done
+    state = store.get(result["source"]) or {"seen": [], "count": 0}
+    fresh = [e["id"] for e in done if e.get("id")]
+    seen = list(dict.fromkeys(fresh + state["seen"]))[:_SEEN_LIMIT]
+    taken = set(fresh)
+    pending = [e for e in result["new"] if e.get("id") not in taken]
+    store.update(
+        result["source"],
+        {
+            "kind": result["kind"],
+            "title": result["title"] or state.get("title", ""),
+            "seen": seen,
+            "pending": pending,
+            "count": result["count"] if result["kind"] == "playlist" else state.get("count", 0),
+            "last_sync": time.time(),
+        },
+    )
+
+
+default_store = SyncStore()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m nerd_downloader sync", description="Nur neue Videos von Kanälen/Playlists laden.")
+    parser.add_argument("urls", nargs="+", metavar="URL")
+    parser.add_argument("--format", default="best", choices=list(engine.FORMAT_PRESETS))
+    parser.add_argument("--output", default=engine.DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--initial", type=int, default=None, metavar="N", help="beim ersten Sync nur die N neuesten Einträge")
+    parser.add_argument("--dry-run", action="store_true", help="nur anzeigen, nichts laden oder merken")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    with ThreadPoolExecutor(config.FETCH_WORKERS, thread_name_prefix="sync") as pool:
+        for url in args.urls:
+            try:
+                result = check(url, initial_limit=args.initial)
+            except engine.EngineError as exc:
+                print(f"✗ {url}: {exc.user_message}")
+                failed += 1
+                continue
+            print(f"{result['title'] or url}: {len(result['new'])} neu ({result['walked']} Einträge gelesen)")
+            if args.dry_run:
+                for entry in result["new"]:
+                    print(f"   + {entry['title']}  {entry['url']}")
+                continue
+
+            def fetch(entry: dict) -> Optional[dict]:
+                try:
+                    engine.download(entry["url"], format_id=args.format, output_dir=args.output)
+                    print(f"   ✓ {entry['title']}")
+                    return entry
+                except engine.EngineError as exc:
+                    print(f"   ✗ {entry['title']}: {exc.user_message}")
+                    return None
+
+            done = [entry for entry in pool.map(fetch, result["new"]) if entry]
+            failed += len(result["new"]) - len(done)
+            commit(result, done)
+    return 1 if failed else 0
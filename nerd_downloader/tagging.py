@@ -0,0 +1,267 @@
+"""Metadata and cover art, written in place with mutagen.
+
+yt-dlp's ``FFmpegMetadata``/``EmbedThumbnail`` post-processors run ffmpeg
+again for every file and rewrite all of it into a new one — several MB per
+track, twice, just to add a few hundred bytes of tags and a cover. Here the
+tags go straight into the file with mutagen (ID3 for MP3, Vorbis comments
+and a picture block for FLAC, ``ilst`` atoms for M4A). mutagen edits the
+tag region in place and only shifts audio data when the new tag outgrows the
+padding already there; it then leaves fresh padding, so later edits don't.
+
+The cover is the video's thumbnail, downloaded and resized once with PIL
+(at most ``_COVER_SIZE`` px, JPEG) and kept in ``<STATE_DIR>/covers`` per
+video ID, so a re-download or a second format reuses it.
+
+Tagging runs on its own small pool (``NERDDL_TAG_WORKERS``) chained behind
+the audio encode (``transcode.PooledExtractAudio``), so the download threads
+never wait for it. A file that can't be tagged is still a good download:
+failures are counted, not raised.
+
+mutagen and Pillow are optional (they come with the Tk GUI's requirements);
+without them ``available()`` is False and files stay untagged.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from . import config, thumbs
+
+try:
+    from mutagen.flac import FLAC, Picture
+    from mutagen.id3 import APIC, COMM, ID3, TALB, TDRC, TIT2, TPE1, TRCK, ID3NoHeaderError
+    from mutagen.mp4 import MP4, MP4Cover
+    from PIL import Image
+except ImportError:  # pragma: no cover — exercised only without the GUI deps
+    Image = None
+
+# Longest cover edge in pixels, and its JPEG quality.
+_COVER_SIZE = 600
+_COVER_QUALITY = 88
+
+# Covers kept on disk; the oldest go first.
+_MAX_COVERS = 2000
+
+# info_dict keys a tag job needs; the rest of the (large) dict is not kept.
+_FIELDS = (
+    "id", "title", "track", "uploader", "artist", "channel", "album",
+    "playlist_title", "playlist_index", "upload_date", "release_year",
+    "webpage_url", "thumbnail",
+)
+
+
+def available() -> bool:
+    return Image is not None
+
+
+def fields(info: dict) -> dict:
+    """The part of a yt-dlp info dict that ends up in tags."""
+    return {key: info[key] for key in _FIELDS if info.get(key) is not None}
+
+
+def _tag_values(meta: dict) -> dict:
+    year = meta.get("release_year") or (meta.get("upload_date") or "")[:4]
+    return {
+        "title": meta.get("track") or meta.get("title"),
+        "artist": meta.get("artist") or meta.get("uploader") or meta.get("channel"),
+        "album": meta.get("album") or meta.get("playlist_title"),
+        "date": str(year) if year else None,
+        "track": str(meta["playlist_index"]) if meta.get("playlist_index") else None,
+        "comment": meta.get("webpage_url"),
+    }
+
+
+class CoverCache:
+    """Resized thumbnails per video ID, on disk."""
+
+    def __init__(self, directory: Optional[str] = None, fetch: Callable[[str], bytes] = thumbs.fetch) -> None:
+        self.directory = directory or os.path.join(config.STATE_DIR, "covers")
+        self._fetch = fetch
+        # Striped by video ID: one download per cover, however many files want it.
+        self._locks = [threading.Lock() for _ in range(16)]
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, video_id: str, url: Optional[str]) -> Optional[bytes]:
+        """JPEG bytes of the cover, or None if there is none to be had."""
+        if not video_id or not url:
+            return None
+        path = os.path.join(self.directory, f"{video_id}.jpg")
+        with self._locks[hash(video_id) % len(self._locks)]:
+            try:
+                with open(path, "rb") as fh:
+                    data = fh.read()
+                self.hits += 1
+                return data
+            except OSError:
+                pass
+            try:
+                data = _resize(self._fetch(url))
+            except Exception:  # noqa: BLE001 — no cover is not an error
+                return None
+            self.misses += 1
+            self._store(path, data)
+            return data
+
+    def _store(self, path: str, data: bytes) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temp = f"{path}.tmp"
+            with open(temp, "wb") as fh:
+                fh.write(data)
+            os.replace(temp, path)
+            entries = sorted(os.scandir(self.directory), key=lambda e: e.stat().st_mtime)
+            for entry in entries[: max(0, len(entries) - _MAX_COVERS)]:
+                os.remove(entry.path)
+        except OSError:
+            pass  # tagged from memory this time
+
+
+def _resize(data: bytes) -> bytes:
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert("RGB")
+        image.thumbnail((_COVER_SIZE, _COVER_SIZE), Image.Resampling.LANCZOS)
+        out = io.BytesIO()
+        image.save(out, "JPEG", quality=_COVER_QUALITY, optimize=True)
+    return out.getvalue()
+
+
+def _keep_padding(info) -> int:
+    """mutagen padding policy: reuse the space a file has, so tags that fit
+    never move audio data (mutagen's default would trim large padding)."""
+    return info.padding if info.padding >= 0 else info.get_default_padding()
+
+
+def write(path: str, meta: dict, cover: Optional[bytes] = None) -> bool:
+    """Tag ``path`` in place from ``meta`` (see ``fields``); False for
+    containers without a writer here."""
+    values = {k: v for k, v in _tag_values(meta).items() if v}
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".mp3":
+        _write_id3(path, values, cover)
+    elif ext == ".flac":
+        _write_flac(path, values, cover)
+    elif ext in (".m4a", ".m4b"):
+        _write_mp4(path, values, cover)
+    else:
+        return False
+    return True
+
+
+def _write_id3(path: str, values: dict, cover: Optional[bytes]) -> None:
+    try:
+        tags = ID3(path)
+    except ID3NoHeaderError:
+        tags = ID3()
+    frames = {"title": TIT2, "artist": TPE1, "album": TALB, "date": TDRC, "track": TRCK}
+    for key, frame in frames.items():
+        if key in values:
+            tags.setall(frame.__name__, [frame(encoding=3, text=values[key])])
+    if "comment" in values:
+        tags.setall("COMM", [COMM(encoding=3, lang="eng", desc="", text=values["comment"])])
+    if cover:
+        tags.setall("APIC", [APIC(encoding=3, mime="image/jpeg", type=3, desc="Cover", data=cover)])
+    tags.save(path, padding=_keep_padding)
+
+
+def _write_flac(path: str, values: dict, cover: Optional[bytes]) -> None:
+    audio = FLAC(path)
+    names = {"title": "TITLE", "artist": "ARTIST", "album": "ALBUM", "date": "DATE", "track": "TRACKNUMBER", "comment": "COMMENT"}
+    for key, name in names.items():
+        if key in values:
+            audio[name] = values[key]
+    if cover:
+        picture = Picture()
+        picture.type, picture.mime, picture.desc, picture.data = 3, "image/jpeg", "Cover", cover
+        audio.clear_pictures()
+        audio.add_picture(picture)
+    audio.save(padding=_keep_padding)
+
+
+def _write_mp4(path: str, values: dict, cover: Optional[bytes]) -> None:
+    audio = MP4(path)
+    atoms = {"title": "\xa9nam", "artist": "\xa9ART", "album": "\xa9alb", "date": "\xa9day", "comment": "\xa9cmt"}
+    for key, atom in atoms.items():
+        if key in values:
+            audio[atom] = [values[key]]
+    if "track" in values:
+        audio["trkn"] = [(int(values["track"]), 0)]
+    if cover:
+        audio["covr"] = [MP4Cover(cover, imageformat=MP4Cover.FORMAT_JPEG)]
+    audio.save(padding=_keep_padding)
+
+
+class TagPool:
+    """Small pool of tag jobs, chained behind encodes."""
+
+    def __init__(self, workers: int, covers: Optional[CoverCache] = None) -> None:
+        self.workers = max(1, workers)
+        self.covers = covers or CoverCache()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._tagged = 0
+        self._failed = 0
+
+    def submit(self, path: str, meta: dict, cover: bool = True) -> "Future[str]":
+        """Queue ``path`` for tagging; the future resolves to ``path``."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="tagging")
+            self._queued += 1
+            return self._executor.submit(self._tag, path, meta, cover)
+
+    def after(self, future: "Future[str]", meta: dict, cover: bool = True) -> "Future[str]":
+        """Tag the file ``future`` resolves to, once it does. The returned
+        future fails only if ``future`` does."""
+        chained: Future = Future()
+
+        def relay(done: Future) -> None:
+            try:
+                chained.set_result(done.result())
+            except BaseException as exc:  # noqa: BLE001 — handed to the waiter
+                chained.set_exception(exc)
+
+        def start(done: Future) -> None:
+            if done.exception() is not None:
+                relay(done)
+            else:
+                self.submit(done.result(), meta, cover).add_done_callback(relay)
+
+        future.add_done_callback(start)
+        return chained
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queued": self._queued,
+                "tagged": self._tagged,
+                "failed": self._failed,
+                "cover_hits": self.covers.hits,
+                "cover_downloads": self.covers.misses,
+            }
+
+    def _tag(self, path: str, meta: dict, cover: bool) -> str:
+        with self._lock:
+            self._queued -= 1
+        ok = False
+        try:
+            art = self.covers.get(meta.get("id"), meta.get("thumbnail")) if cover else None
+            ok = write(path, meta, art)
+        except Exception:  # noqa: BLE001 — an untagged file is still a download
+            ok = False
+        with self._lock:
+            if ok:
+                self._tagged += 1
+            else:
+                self._failed += 1
+        return path
+
+
+# Module-level pool shared by the web app and the GUI.
+pool = TagPool(config.TAG_WORKERS)
@@ -0,0 +1,167 @@
+"""Smoothed download speed / ETA, shared by the web app and the Tk GUI.
+
+yt-dlp's ``speed`` and ``eta`` are instantaneous values: they jump with every
+received block and say nothing once several jobs share one link. Instead we
+feed the raw byte counters into an EWMA (half-life in seconds, so the result
+doesn't depend on how often yt-dlp calls the hook) and derive the ETA from the
+smoothed rate.
+
+``ThroughputRegistry`` keeps one estimator per active job and aggregates them,
+which gives a stable ETA for the whole batch. (Waiting jobs are ordered by
+expected size in ``pipeline``; none of them has a rate yet.)
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Optional
+
+# Smoothing half-life: after this many seconds an old rate counts half.
+_HALF_LIFE = 3.0
+
+# Samples closer together than this are coalesced; yt-dlp can call the hook
+# hundreds of times per second on fast links.
+_MIN_INTERVAL = 0.2
+
+
+class ThroughputEstimator:
+    """EWMA throughput for one job, across all of its streams.
+
+    A job can consist of several streams (video + audio are fetched one after
+    the other and yt-dlp restarts its byte counter for each), so progress is
+    tracked per ``stream`` key and summed.
+    """
+
+    def __init__(
+        self,
+        half_life: float = _HALF_LIFE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.half_life = half_life
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._streams: dict[str, list] = {}  # stream -> [downloaded, total]
+        self._expected_total: Optional[int] = None
+        self._rate: Optional[float] = None
+        self._sample_t: Optional[float] = None
+        self._sample_bytes = 0
+
+    def set_expected_total(self, total: Optional[int]) -> None:
+        """Total size of all streams, if known up front (e.g. from the format list)."""
+        with self._lock:
+            self._expected_total = total or None
+
+    def update(
+        self,
+        downloaded: int,
+        total: Optional[int] = None,
+        stream: str = "",
+        now: Optional[float] = None,
+    ) -> None:
+        now = self._clock() if now is None else now
+        with self._lock:
+            entry = self._streams.setdefault(stream, [0, None])
+            restarted = downloaded < entry[0]
+            entry[0] = downloaded
+            if total:
+                entry[1] = total
+            current = self._downloaded()
+            if self._sample_t is None or restarted:
+                # First sample, or the stream restarted (retry): new baseline.
+                self._sample_t, self._sample_bytes = now, current
+                return
+            dt = now - self._sample_t
+            if dt < _MIN_INTERVAL:
+                return
+            instant = max(current - self._sample_bytes, 0) / dt
+            if self._rate is None:
+                self._rate = instant
+            else:
+                alpha = 1.0 - 0.5 ** (dt / self.half_life)
+                self._rate += alpha * (instant - self._rate)
+            self._sample_t, self._sample_bytes = now, current
+
+    @property
+    def speed(self) -> Optional[float]:
+        """Smoothed bytes per second, or None before the first interval."""
+        with self._lock:
+            return self._rate
+
+    @property
+    def downloaded(self) -> int:
+        with self._lock:
+            return self._downloaded()
+
+    @property
+    def remaining(self) -> Optional[int]:
+        """Bytes still to fetch, or None while the total is unknown."""
+        with self._lock:
+            return self._remaining()
+
+    def eta(self) -> Optional[float]:
+        """Seconds until this job's streams are fetched, or None if unknown."""
+        with self._lock:
+            remaining = self._remaining()
+            if remaining is None or not self._rate:
+                return None
+            return remaining / self._rate
+
+    def _downloaded(self) -> int:
+        return sum(entry[0] for entry in self._streams.values())
+
+    def _remaining(self) -> Optional[int]:
+        known = sum(entry[1] or 0 for entry in self._streams.values())
+        total = max(self._expected_total or 0, known)
+        if not total:
+            return None
+        return max(total - self._downloaded(), 0)
+
+
+class ThroughputRegistry:
+    """Per-job estimators plus batch-wide aggregates."""
+
+    def __init__(self) -> None:
+        self._jobs: dict[str, ThroughputEstimator] = {}
+        self._lock = threading.Lock()
+
+    def start(self, job_id: str) -> ThroughputEstimator:
+        estimator = ThroughputEstimator()
+        with self._lock:
+            self._jobs[job_id] = estimator
+        return estimator
+
+    def get(self, job_id: str) -> Optional[ThroughputEstimator]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def finish(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def snapshot(self) -> dict:
+        """Aggregate ``{active, speed, remaining, eta}`` over all active jobs.
+
+        ``eta`` is the batch ETA: everything still to fetch divided by the
+        combined rate, which is what the shared link actually delivers.
+        """
+        with self._lock:
+            estimators = list(self._jobs.values())
+        speed = sum(e.speed or 0 for e in estimators)
+        remaining = [e.remaining for e in estimators]
+        known = [r for r in remaining if r is not None]
+        total_remaining = sum(known) if known else None
+        eta = None
+        # Only claim a batch ETA when every job's size is known.
+        if speed and known and len(known) == len(remaining):
+            eta = total_remaining / speed
+        return {
+            "active": len(estimators),
+            "speed": speed or None,
+            "remaining": total_remaining,
+            "eta": eta,
+        }
+
+
+# Module-level singleton shared by the Flask app and the engine.
+registry = ThroughputRegistry()
@@ -0,0 +1,206 @@
+"""Thumbnail proxy for the web UI: resized once, cached on disk, served immutable.
+
+YouTube's thumbnail for a video is usually a 1280×720 JPEG; the UI shows it
+168 px wide. ``/api/thumb/<id>`` fetches it once, scales it to one of a few
+fixed widths (``WIDTHS``) as WebP — or JPEG for browsers that don't accept
+WebP — and keeps the result in ``<STATE_DIR>/thumbs``. Responses carry an
+ETag and ``Cache-Control: immutable``, so the browser doesn't even ask again,
+and a reload or a second batch preview never touches YouTube's CDN.
+
+The cache is an LRU bounded by total size (``NERDDL_THUMB_CACHE_MB``); a hit
+touches the file's mtime, so the order survives restarts.
+
+Source URLs come from the info dicts the engine has normalized
+(``local_url`` remembers them); for any other ID the standard
+``i.ytimg.com`` URL is used. Without Pillow nothing is resized and the
+endpoint redirects to the source.
+"""
+
+from __future__ import annotations
+
+import collections
+import hashlib
+import io
+import os
+import re
+import threading
+import urllib.request
+from typing import Callable, Optional
+
+from . import config
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover — Pillow is optional
+    Image = None
+
+# Widths a thumbnail is rendered at; requests round up to the next one.
+WIDTHS = (160, 320, 480, 640)
+DEFAULT_WIDTH = 320
+
+_QUALITY = {"webp": 80, "jpeg": 85}
+_MIMETYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+# Source URLs remembered per video ID.
+_MAX_SOURCES = 10_000
+
+_ID_RE = re.compile(r"[\w-]{1,64}", re.ASCII)
+
+
+def fetch(url: str) -> bytes:
+    """GET ``url`` with a browser-like UA (YouTube's CDN is picky)."""
+    request = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
+    with urllib.request.urlopen(request, timeout=15) as response:
+        return response.read()
+
+
+def available() -> bool:
+    return Image is not None
+
+
+def valid_id(video_id: str) -> bool:
+    return bool(_ID_RE.fullmatch(video_id or ""))
+
+
+def mimetype(fmt: str) -> str:
+    return _MIMETYPES[fmt]
+
+
+def width_for(requested: Optional[int]) -> int:
+    """The smallest rendered width that is at least ``requested``."""
+    if not requested:
+        return DEFAULT_WIDTH
+    return next((w for w in WIDTHS if w >= requested), WIDTHS[-1])
+
+
+class ThumbCache:
+    """Resized thumbnails on disk, least recently used evicted first."""
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_bytes: int = config.THUMB_CACHE_MB << 20,
+        fetch: Callable[[str], bytes] = fetch,
+    ) -> None:
+        self.directory = directory or os.path.join(config.STATE_DIR, "thumbs")
+        self.max_bytes = max_bytes
+        self._fetch = fetch
+        self._lock = threading.Lock()
+        self._locks = [threading.Lock() for _ in range(16)]
+        self._sources: collections.OrderedDict[str, str] = collections.OrderedDict()
+        self._lru: Optional[collections.OrderedDict[str, int]] = None
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def remember(self, video_id: str, url: str) -> None:
+        with self._lock:
+            self._sources[video_id] = url
+            self._sources.move_to_end(video_id)
+            while len(self._sources) > _MAX_SOURCES:
+                self._sources.popitem(last=False)
+
+    def source(self, video_id: str) -> str:
+        with self._lock:
+            url = self._sources.get(video_id)
+        return url or f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
+
+    def get(self, video_id: str, width: int, fmt: str) -> Optional[tuple[bytes, str]]:
+        """``(image bytes, ETag value)`` of the variant, rendering it on a miss;
+        None if the source can't be fetched or decoded."""
+        name = f"{video_id}-{width}.{'webp' if fmt == 'webp' else 'jpg'}"
+        path = os.path.join(self.directory, name)
+        with self._locks[hash(name) % len(self._locks)]:
+            data = self._read(name, path)
+            if data is None:
+                try:
+                    data = _render(self._fetch(self.source(video_id)), width, fmt)
+                except Exception:  # noqa: BLE001 — a broken thumbnail is just missing
+                    return None
+                self.misses += 1
+                self._write(name, path, data)
+            else:
+                self.hits += 1
+        return data, hashlib.sha1(data).hexdigest()[:20]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._index()
+            return {
+                "files": len(self._lru),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _index(self) -> collections.OrderedDict:
+        """The LRU order, built from the directory's mtimes on first use."""
+        if self._lru is None:
+            try:
+                entries = [e for e in os.scandir(self.directory) if e.is_file() and not e.name.endswith(".tmp")]
+            except OSError:
+                entries = []
+            stats = sorted(((e.stat().st_mtime, e.name, e.stat().st_size) for e in entries))
+            self._lru = collections.OrderedDict((name, size) for _, name, size in stats)
+            self._bytes = sum(self._lru.values())
+        return self._lru
+
+    def _read(self, name: str, path: str) -> Optional[bytes]:
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+            os.utime(path)
+        except OSError:
+            return None
+        with self._lock:
+            lru = self._index()
+            if name in lru:
+                lru.move_to_end(name)
+        return data
+
+    def _write(self, name: str, path: str, data: bytes) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temp = f"{path}.tmp"
+            with open(temp, "wb") as fh:
+                fh.write(data)
+            os.replace(temp, path)
+        except OSError:
+            return  # served from memory this time
+        with self._lock:
+            lru = self._index()
+            self._bytes += len(data) - lru.pop(name, 0)
+            lru[name] = len(data)
+            while self._bytes > self.max_bytes and len(lru) > 1:
+                old, size = lru.popitem(last=False)
+                self._bytes -= size
+                try:
+                    os.remove(os.path.join(self.directory, old))
+                except OSError:
+                    pass
+
+
+def _render(data: bytes, width: int, fmt: str) -> bytes:
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert("RGB")
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.Resampling.LANCZOS)
+        out = io.BytesIO()
+        if fmt == "webp":
+            image.save(out, "WEBP", quality=_QUALITY["webp"], method=4)
+        else:
+            image.save(out, "JPEG", quality=_QUALITY["jpeg"], optimize=True, progressive=True)
+    return out.getvalue()
+
+
+cache = ThumbCache()
+
+
+def local_url(video_id: Optional[str], source: Optional[str]) -> Optional[str]:
+    """The proxy path for ``video_id`` (remembering ``source`` for it), or
+    ``source`` itself when there is no usable ID."""
+    if not source or not video_id or not valid_id(video_id):
+        return source
+    cache.remember(video_id, source)
+    return f"/api/thumb/{video_id}"
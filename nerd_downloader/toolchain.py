@@ -0,0 +1,109 @@
+"""ffmpeg/ffprobe discovery, probed once and cached.
+
+Finding ffmpeg used to cost a ``PATH`` walk (or a ``ffmpeg -version``
+subprocess) per job. ``probe()`` runs once — the app starts it in the
+background at startup — and records where both tools live, their versions and
+which encoders/muxers the ffmpeg build has. Everything else reads the cached
+result; it is re-probed only when asked (``probe(refresh=True)``, e.g. after
+installing ffmpeg while the app is running).
+"""
+
+from __future__ import annotations
+
+import re
+import shutil
+import subprocess
+import threading
+import time
+from typing import Optional
+
+# Encoders/muxers the app relies on; reported individually in ``snapshot()``.
+_WATCHED_ENCODERS = ("libmp3lame", "aac", "libfdk_aac", "flac", "libopus")
+_WATCHED_MUXERS = ("mp4", "ipod", "mp3", "flac", "webm", "matroska")
+
+_lock = threading.Lock()
+_cache: Optional[dict] = None
+
+
+def probe(refresh: bool = False) -> dict:
+    """Locate ffmpeg/ffprobe and read their capabilities (cached)."""
+    global _cache
+    with _lock:
+        if _cache is None or refresh:
+            _cache = _probe()
+        return _cache
+
+
+def cached() -> Optional[dict]:
+    """The last probe's result without probing; None if there was none yet."""
+    with _lock:
+        return _cache
+
+
+def ffmpeg_path() -> Optional[str]:
+    return probe()["ffmpeg"]["path"]
+
+
+def ffprobe_path() -> Optional[str]:
+    return probe()["ffprobe"]["path"]
+
+
+def has_encoder(name: str) -> bool:
+    """Whether ffmpeg can encode with ``name``. An ffmpeg whose encoder list
+    could not be read counts as capable — let the real run report errors."""
+    info = probe()
+    return not info["encoders"] or name in info["encoders"]
+
+
+def snapshot() -> dict:
+    """JSON-friendly summary for ``/api/meta``."""
+    info = probe()
+    return {
+        "ffmpeg": info["ffmpeg"],
+        "ffprobe": info["ffprobe"],
+        "encoders": {name: name in info["encoders"] for name in _WATCHED_ENCODERS},
+        "muxers": {name: name in info["muxers"] for name in _WATCHED_MUXERS},
+        "probed_at": info["probed_at"],
+    }
+
+
+def _probe() -> dict:
+    ffmpeg = shutil.which("ffmpeg")
+    ffprobe = shutil.which("ffprobe")
+    return {
+        "ffmpeg": {"path": ffmpeg, "version": _version(ffmpeg)},
+        "ffprobe": {"path": ffprobe, "version": _version(ffprobe)},
+        "encoders": _list(ffmpeg, "-encoders") if ffmpeg else set(),
+        "muxers": _list(ffmpeg, "-muxers") if ffmpeg else set(),
+        "probed_at": time.time(),
+    }
+
+
+def _output(cmd: list[str]) -> str:
+    try:
+        return subprocess.run(cmd, capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def _version(path: Optional[str]) -> Optional[str]:
+    """``ffmpeg version 6.1.1 Copyright ...`` -> ``"6.1.1"``."""
+    if not path:
+        return None
+    match = re.match(r"\S+ version (\S+)", _output([path, "-hide_banner", "-version"]))
+    return match.group(1) if match else None
+
+
+# `ffmpeg -encoders` / `-muxers` rows: a flags column, then the name
+# (" A....D libmp3lame  libmp3lame MP3 ...", "  E mp4  MP4 ...").
+_ROW = re.compile(r"^\s*([A-Z.]{1,6})\s+([\w,]+)\s")
+
+
+def _list(ffmpeg: str, flag: str) -> set[str]:
+    names: set[str] = set()
+    for line in _output([ffmpeg, "-hide_banner", flag]).splitlines():
+        match = _ROW.match(line)
+        if match and "=" not in line:
+            # Muxer rows may list aliases: "E matroska,webm ..."
+            names.update(match.group(2).split(","))
+    return names
@@ -0,0 +1,322 @@
+"""Audio transcoding off the download thread.
+
+yt-dlp's ``FFmpegExtractAudio`` encodes inline: the thread that fetched track
+N encodes it before it may fetch track N+1, so a 200-track playlist keeps one
+core busy at a time. Here the encode is handed to a shared pool sized to the
+CPU count and the download moves on; callers collect the results at the end
+(``PooledExtractAudio.wait``).
+
+The pool's workers are threads, but each of them drives its own ffmpeg
+process, so encodes do run in parallel on separate cores without pickling
+jobs into Python worker processes.
+
+Before encoding, ``plan`` looks at the downloaded format's ``acodec``/``ext``:
+a file that already is the requested codec is kept as is (``copy``) or only
+rewrapped with ``-acodec copy`` (``remux``). The pool counts those avoided
+transcodes and estimates the CPU time they saved from the encodes it did run.
+
+With ``tags=True`` each result is then tagged (and given its cover) in place
+on ``tagging.pool`` — instead of further ffmpeg passes over the file.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from yt_dlp.postprocessor.common import PostProcessor
+
+from . import config, tagging, toolchain
+
+# codec -> (file extension, ffmpeg encoder)
+CODECS: dict[str, tuple[str, str]] = {
+    "mp3": ("mp3", "libmp3lame"),
+    "m4a": ("m4a", "aac"),
+    "flac": ("flac", "flac"),
+}
+
+# Target codec -> ``acodec`` prefixes (as reported by yt-dlp) that already are it.
+_SAME_CODEC: dict[str, tuple[str, ...]] = {
+    "mp3": ("mp3",),
+    "m4a": ("mp4a", "aac"),
+    "flac": ("flac",),
+}
+
+# CPU seconds per second of audio, used to estimate savings until this process
+# has measured real encodes (roughly one laptop core).
+_DEFAULT_CPU_PER_SECOND = {"mp3": 0.02, "m4a": 0.02, "flac": 0.01}
+
+
+class TranscodeError(Exception):
+    """ffmpeg failed (or is missing) for one file."""
+
+
+def plan(codec: str, acodec: Optional[str], ext: Optional[str]) -> str:
+    """How to turn a download with ``acodec``/``ext`` into ``codec``:
+    ``"copy"`` (already there), ``"remux"`` (right codec, other container)
+    or ``"encode"``."""
+    if not (acodec or "").lower().startswith(_SAME_CODEC[codec]):
+        return "encode"
+    return "copy" if ext == CODECS[codec][0] else "remux"
+
+
+def audio_command(
+    ffmpeg: str,
+    src: str,
+    dst: str,
+    codec: str,
+    quality: Optional[str] = None,
+    mode: str = "encode",
+) -> list[str]:
+    """ffmpeg arguments equivalent to yt-dlp's ``FFmpegExtractAudio``.
+
+    ``quality`` above 10 is a bitrate in kbps (``"320"``); lossless and
+    unset qualities use the encoder default. ``mode="remux"`` copies the
+    audio stream into the target container instead.
+    """
+    cmd = [ffmpeg, "-hide_banner", "-loglevel", "error", "-y", "-i", src, "-vn"]
+    if mode == "remux":
+        cmd += ["-acodec", "copy"]
+        if codec == "m4a":
+            cmd += ["-bsf:a", "aac_adtstoasc"]
+        return cmd + [dst]
+    _, encoder = CODECS[codec]
+    cmd += ["-acodec", encoder]
+    try:
+        bitrate = float(quality) if quality else None
+    except ValueError:
+        bitrate = None
+    if bitrate and bitrate > 10 and codec != "flac":
+        cmd += ["-b:a", f"{bitrate:g}k"]
+    return cmd + [dst]
+
+
+def _run(cmd: list[str]) -> tuple[int, Optional[float]]:
+    """Run ffmpeg; return its exit code and the CPU seconds it used (when the
+    platform can tell us per child)."""
+    proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if hasattr(os, "wait4"):
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        return proc.returncode, usage.ru_utime + usage.ru_stime
+    return proc.wait(), None
+
+
+class TranscodePool:
+    """Bounded pool of ffmpeg encodes with queue-depth counters."""
+
+    def __init__(self, workers: int) -> None:
+        self.workers = max(1, workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._cpu_seconds = 0.0
+        # Avoided transcodes: count, estimated CPU saved, the latest few files.
+        self._avoided = 0
+        self._cpu_saved = 0.0
+        self._recent_avoided: deque = deque(maxlen=20)
+        # codec -> [cpu seconds, audio seconds] of encodes measured so far
+        self._encode_cost: dict[str, list[float]] = {}
+
+    def submit(
+        self,
+        src: str,
+        codec: str,
+        quality: Optional[str] = None,
+        ffmpeg: Optional[str] = None,
+        mode: str = "encode",
+        duration: Optional[float] = None,
+    ) -> "Future[str]":
+        """Queue ``src`` for encoding (or remuxing, see ``plan``); the future
+        resolves to the new path. ``duration`` (seconds of audio) feeds the
+        CPU-saved estimate.
+
+        The source file is removed once the encode succeeded.
+        """
+        if codec not in CODECS:
+            raise ValueError(f"unsupported codec: {codec}")
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="transcode")
+            self._queued += 1
+            return self._executor.submit(self._encode, src, codec, quality, ffmpeg, mode, duration)
+
+    def skip(self, src: str, codec: str, duration: Optional[float] = None) -> "Future[str]":
+        """Record that ``src`` already is ``codec``; return a done future."""
+        self._record_avoided(src, codec, "copy", duration, spent=0.0)
+        future: Future = Future()
+        future.set_result(src)
+        return future
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queued": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "cpu_seconds": round(self._cpu_seconds, 1),
+                "avoided": self._avoided,
+                "cpu_saved_seconds": round(self._cpu_saved, 1),
+                "recent_avoided": list(self._recent_avoided),
+            }
+
+    def _record_avoided(self, src: str, codec: str, mode: str, duration: Optional[float], spent: float) -> None:
+        with self._lock:
+            cpu, media = self._encode_cost.get(codec, (0.0, 0.0))
+            rate = cpu / media if media else _DEFAULT_CPU_PER_SECOND[codec]
+            saved = max(0.0, rate * (duration or 0) - spent)
+            self._avoided += 1
+            self._cpu_saved += saved
+            self._recent_avoided.append(
+                {"file": os.path.basename(src), "codec": codec, "mode": mode, "cpu_saved_seconds": round(saved, 2)}
+            )
+
+    def _encode(
+        self,
+        src: str,
+        codec: str,
+        quality: Optional[str],
+        ffmpeg: Optional[str],
+        mode: str,
+        duration: Optional[float],
+    ) -> str:
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        ok = False
+        try:
+            dst = self._transcode(
+                src, codec, quality, ffmpeg or toolchain.ffmpeg_path() or "ffmpeg", mode, duration
+            )
+            ok = True
+            return dst
+        finally:
+            with self._lock:
+                self._running -= 1
+                if ok:
+                    self._completed += 1
+                else:
+                    self._failed += 1
+
+    def _transcode(
+        self,
+        src: str,
+        codec: str,
+        quality: Optional[str],
+        ffmpeg: str,
+        mode: str,
+        duration: Optional[float],
+    ) -> str:
+        ext, _ = CODECS[codec]
+        stem = os.path.splitext(src)[0]
+        dst = f"{stem}.{ext}"
+        temp = f"{stem}.temp.{ext}"
+        try:
+            returncode, cpu = _run(audio_command(ffmpeg, src, temp, codec, quality, mode))
+        except OSError as exc:
+            raise TranscodeError("ffmpeg not found") from exc
+        if returncode != 0:
+            _remove_quietly(temp)
+            raise TranscodeError(f"ffmpeg exited with {returncode} for {os.path.basename(src)}")
+        if cpu is not None:
+            with self._lock:
+                self._cpu_seconds += cpu
+                if mode == "encode" and duration:
+                    cost = self._encode_cost.setdefault(codec, [0.0, 0.0])
+                    cost[0] += cpu
+                    cost[1] += duration
+        if mode != "encode":
+            self._record_avoided(src, codec, mode, duration, spent=cpu or 0.0)
+        os.replace(temp, dst)
+        if dst != src:
+            _remove_quietly(src)
+        return dst
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class PooledExtractAudio(PostProcessor):
+    """Drop-in for ``FFmpegExtractAudio`` that hands the encode to ``pool``.
+
+    Register with ``ydl.add_post_processor(pp, when="post_process")``.
+    ``run`` returns immediately, so yt-dlp goes on to the next playlist entry;
+    call ``wait()`` once the download finished to get the final paths.
+    """
+
+    def __init__(
+        self,
+        codec: str,
+        quality: Optional[str] = None,
+        transcoder: Optional[TranscodePool] = None,
+        ffmpeg: Optional[str] = None,
+        downloader=None,
+        *,
+        tags: bool = False,
+        cover: bool = False,
+        tagger: Optional[tagging.TagPool] = None,
+    ) -> None:
+        super().__init__(downloader)
+        self.codec = codec
+        self.quality = quality
+        self.ffmpeg = ffmpeg
+        self._pool = transcoder or pool
+        # Tag each result (with cover art if ``cover``) once it is encoded.
+        self.tags = tags and tagging.available()
+        self.cover = cover
+        self._tagger = tagger or tagging.pool
+        self.futures: list[Future] = []
+        # How each queued file is handled: "copy", "remux" or "encode".
+        self.modes: list[str] = []
+
+    def run(self, information: dict):
+        path = information["filepath"]
+        mode = plan(self.codec, information.get("acodec"), information.get("ext"))
+        duration = information.get("duration")
+        self.modes.append(mode)
+        if mode == "copy":
+            self.to_screen(f"Not converting audio {path}; already {self.codec}")
+            future = self._pool.skip(path, self.codec, duration)
+        else:
+            self.to_screen(f"Queued for {self.codec} {mode}: {path}")
+            future = self._pool.submit(path, self.codec, self.quality, self.ffmpeg, mode=mode, duration=duration)
+        if self.tags:
+            future = self._tagger.after(future, tagging.fields(information), cover=self.cover)
+        self.futures.append(future)
+        return [], information
+
+    @property
+    def avoided(self) -> int:
+        """Files that got away without a re-encode (copied or remuxed)."""
+        return sum(mode != "encode" for mode in self.modes)
+
+    def wait(self) -> list[str]:
+        """Block until every queued encode is done; return the output paths.
+        Raises the first ``TranscodeError`` after all encodes have finished."""
+        paths, error = [], None
+        for future in self.futures:
+            try:
+                paths.append(future.result())
+            except TranscodeError as exc:
+                error = error or exc
+        self.futures = []
+        if error:
+            raise error
+        return paths
+
+
+# Module-level pool shared by the web app, the GUI and the CLI downloader.
+pool = TranscodePool(config.TRANSCODE_WORKERS)
@@ -0,0 +1,140 @@
+"""Remember videos that can't be fetched, so nobody asks YouTube twice.
+
+A private, removed or age-restricted video fails the same way on every try —
+after walking both cookie strategies. When a lookup or download gives up with
+one of those errors, the video is recorded here under its canonical URL
+(``urls.canonical``, i.e. per video ID) together with the error class. Until
+the class-specific TTL runs out, ``engine`` answers straight from this cache
+and the UI can mark the link as known-unavailable without a round trip to
+YouTube.
+
+Entries live in memory and in ``<STATE_DIR>/unavailable.json``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Optional, Union
+
+from . import config, urls
+
+# (class, text fragments, TTL seconds, user message), checked in order. A
+# TTL of 0 means "classify, but don't remember": the "confirm you're not a
+# bot" sign-in wall is about us, not the video.
+_CLASSES = (
+    ("age_restricted", ("age-restricted", "age restricted", "inappropriate for some users"), 24 * 3600,
+     "Video ist altersbeschränkt oder verlangt Anmeldung."),
+    ("login", ("sign in to confirm",), 0,
+     "Video ist altersbeschränkt oder verlangt Anmeldung."),
+    ("private", ("private",), 24 * 3600,
+     "Dieses Video ist privat."),
+    ("removed", ("video unavailable", "video is unavailable", "no longer available", "has been removed",
+                 "account associated with this video has been terminated"), 7 * 24 * 3600,
+     "Video ist nicht verfügbar oder wurde entfernt."),
+    ("unsupported", ("unsupported url", "is not a valid url"), 30 * 24 * 3600,
+     "Diese URL wird nicht unterstützt."),
+)
+
+# Server errors and "try again later" are about the moment, not the video,
+# whatever else the message says.
+_TRANSIENT_MARKERS = ("http error 5", "try again later", "temporarily", "timed out")
+
+MESSAGES = {name: message for name, _, _, message in _CLASSES}
+TTLS = {name: ttl for name, _, ttl, _ in _CLASSES}
+
+# Upper bound on remembered videos; the ones expiring soonest go first.
+_MAX_ENTRIES = 10_000
+
+
+def classify(error: Union[BaseException, str, None]) -> Optional[str]:
+    """Error class for a yt-dlp failure, or None if it may well work next time."""
+    low = str(error or "").lower()
+    if any(marker in low for marker in _TRANSIENT_MARKERS):
+        return None
+    for name, fragments, _, _ in _CLASSES:
+        if any(fragment in low for fragment in fragments):
+            return name
+    return None
+
+
+def key(url: str) -> str:
+    """Cache key: the canonical video URL, so every link form shares one entry."""
+    return urls.canonical(url) or url.strip()
+
+
+class NegativeCache:
+    """Known-unavailable videos with per-class expiry, persisted as JSON."""
+
+    def __init__(self, path: Optional[str] = None, ttls: Optional[dict[str, int]] = None) -> None:
+        self.path = path or os.path.join(config.STATE_DIR, "unavailable.json")
+        self.ttls = {**TTLS, **(ttls or {})}
+        self._lock = threading.Lock()
+        self._entries: Optional[dict[str, dict]] = None
+
+    def get(self, url: str) -> Optional[dict]:
+        """``{url, class, message, since, until}`` while the entry is fresh."""
+        with self._lock:
+            entry = self._load().get(key(url))
+        if entry is None or entry["until"] <= time.time():
+            return None
+        return entry
+
+    def put(self, url: str, error_class: Optional[str], message: str) -> Optional[dict]:
+        """Remember ``url`` as unavailable; no-op for classes with no TTL."""
+        ttl = self.ttls.get(error_class or "", 0)
+        if ttl <= 0:
+            return None
+        now = time.time()
+        entry = {"url": key(url), "class": error_class, "message": message, "since": now, "until": now + ttl}
+        with self._lock:
+            entries = self._load()
+            entries[entry["url"]] = entry
+            self._save(entries)
+        return entry
+
+    def forget(self, url: str) -> bool:
+        with self._lock:
+            entries = self._load()
+            if entries.pop(key(url), None) is None:
+                return False
+            self._save(entries)
+            return True
+
+    def snapshot(self) -> list[dict]:
+        now = time.time()
+        with self._lock:
+            return sorted((e for e in self._load().values() if e["until"] > now), key=lambda e: -e["since"])
+
+    def _load(self) -> dict[str, dict]:
+        if self._entries is None:
+            try:
+                with open(self.path, encoding="utf-8") as fh:
+                    data = json.load(fh)
+            except (OSError, ValueError):
+                data = {}
+            now = time.time()
+            self._entries = {
+                k: e for k, e in (data.items() if isinstance(data, dict) else ())
+                if isinstance(e, dict) and e.get("until", 0) > now
+            }
+        return self._entries
+
+    def _save(self, entries: dict[str, dict]) -> None:
+        now = time.time()
+        fresh = sorted((e for e in entries.values() if e["until"] > now), key=lambda e: e["until"])
+        entries.clear()
+        entries.update((e["url"], e) for e in fresh[-_MAX_ENTRIES:])
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp = f"{self.path}.tmp"
+            with open(temp, "w", encoding="utf-8") as fh:
+                json.dump(entries, fh)
+            os.replace(temp, self.path)
+        except OSError:
+            pass  # still cached in memory; persistence is best effort
+
+
+cache = NegativeCache()
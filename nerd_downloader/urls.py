@@ -0,0 +1,105 @@
+"""Find YouTube links in free text and reduce them to one canonical URL each.
+
+One precompiled pattern covers every form we see in pastes and link lists —
+``watch?v=``, ``youtu.be/``, ``embed/``, ``v/``, ``shorts/``, ``live/``,
+``music.``/``m.`` hosts and ``playlist?list=`` — and is applied in a single
+pass. Videos become ``https://www.youtube.com/watch?v=ID``, playlists
+``https://www.youtube.com/playlist?list=ID``; so ``youtu.be/X`` and
+``watch?v=X&t=42`` count as the same video. Duplicates are dropped with a set,
+keeping first-seen order.
+
+Input is consumed line by line (in chunks of a few thousand lines), so files
+with millions of lines or stdin stream through in constant memory apart from
+the seen-set.
+
+CLI: ``python -m nerd_downloader urls [FILE ...]`` (``-`` or nothing = stdin)
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import re
+import sys
+from typing import Iterable, Iterator, Optional
+
+# Lines scanned per regex call. A URL never spans a line break, so joining
+# lines is safe and saves a Python-level loop iteration per line.
+_CHUNK_LINES = 4096
+
+_ID = r"([\w-]+)"
+
+# Anchored on the literal "youtu" so the engine can skip ahead with a fast
+# substring search; scheme and subdomain (www., m., music.) are irrelevant
+# for the canonical form and therefore not matched at all. The lookbehind
+# right after the literal keeps that fast path and makes the host start a
+# label (after "/", ".", "@", a quote, a space): "evilyoutube.com" and
+# "notyoutu.be" are not YouTube. Groups: youtu.be, watch?v=, path form,
+# playlist.
+_URL_RE = re.compile(
+    r"youtu(?<![\w-]youtu)(?:\.be/" + _ID
+    + r"|be(?:-nocookie)?\.com/(?:"
+    r"watch\?(?:v=|[^\s#]*?[&;]v=)" + _ID
+    + r"|(?:embed|v|shorts|live)/" + _ID
+    + r"|playlist\?(?:list=|[^\s#]*?[&;]list=)" + _ID
+    + r"))",
+    re.ASCII,
+)
+
+_VIDEO_URL = "https://www.youtube.com/watch?v="
+_PLAYLIST_URL = "https://www.youtube.com/playlist?list="
+
+
+def iter_urls(lines: Iterable[str]) -> Iterator[str]:
+    """Canonical, de-duplicated YouTube URLs from ``lines``, in order."""
+    seen: set[str] = set()
+    findall = _URL_RE.findall
+    lines = iter(lines)
+    while True:
+        chunk = list(itertools.islice(lines, _CHUNK_LINES))
+        if not chunk:
+            return
+        for short, watch, path, playlist in findall("\n".join(chunk)):
+            video = short or watch or path
+            url = _VIDEO_URL + video if video else _PLAYLIST_URL + playlist
+            if url not in seen:
+                seen.add(url)
+                yield url
+
+
+def canonical(url: str) -> Optional[str]:
+    """Canonical video/playlist URL for a single link, or None if it isn't one."""
+    match = _URL_RE.search(url)
+    if match is None:
+        return None
+    short, watch, path, playlist = match.groups()
+    video = short or watch or path
+    return _VIDEO_URL + video if video else _PLAYLIST_URL + playlist
+
+
+def extract(text: str) -> list[str]:
+    """All canonical YouTube URLs in ``text`` (first occurrence order)."""
+    return list(iter_urls(text.splitlines()))
+
+
+def iter_sources(paths: Iterable[str]) -> Iterator[str]:
+    """Lines from each file in ``paths``; ``-`` reads stdin."""
+    for path in paths:
+        if path == "-":
+            yield from sys.stdin
+            continue
+        with open(path, encoding="utf-8", errors="replace") as fh:
+            yield from fh
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m nerd_downloader urls", description="YouTube-Links aus Text/Dateien ziehen.")
+    parser.add_argument("files", nargs="*", default=["-"], metavar="FILE")
+    args = parser.parse_args(argv)
+
+    write = sys.stdout.write
+    count = 0
+    for url in iter_urls(iter_sources(args.files)):
+        write(url + "\n")
+        count += 1
+    return 0 if count else 1
@@ -9,6 +9,8 @@ import os
 import logging
 from typing import Optional
 
+from nerd_downloader import bandwidth, retry, transcode
+
 class EnhancedDownloader:
     """
     A downloader that strictly attempts to download in 4K, falls back to 1080p,
@@ -24,6 +26,8 @@ class EnhancedDownloader:
                         Defaults to '~/Downloads'.
         """
         self.output_dir = output_dir or os.path.expanduser("~/Downloads")
+        # (url, transcoder) pairs whose MP3 encode is still in the pool
+        self._pending_audio = []
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
 
@@ -52,6 +56,7 @@ class EnhancedDownloader:
             'noplaylist': True,
             'retries': 3,
             'fragment_retries': 3,
+            'retry_sleep_functions': retry.YTDLP_SLEEP_FUNCTIONS,  # backoff between yt-dlp's own retries
             'quiet': True,  # We do our own logging
             'no_warnings': True,
             'ignoreerrors': False, # Important: Fail on error to allow fallback
@@ -61,6 +66,18 @@ class EnhancedDownloader:
             'cookiesfrombrowser': ('chrome', None), # Try to use chrome cookies
         }
 
+    def _download(self, opts: dict, url: str, postprocessor=None):
+        """Runs one yt-dlp download, paced by the process-wide bandwidth limit."""
+        share = bandwidth.limiter.register()
+        try:
+            opts = {**opts, 'progress_hooks': [*opts.get('progress_hooks', []), share.hook]}
+            with yt_dlp.YoutubeDL(opts) as ydl:
+                if postprocessor:
+                    ydl.add_post_processor(postprocessor, when='post_process')
+                return ydl.extract_info(url, download=True)
+        finally:
+            share.release()
+
     def _attempt_download(self, url: str, format_selector: str, quality_label: str) -> bool:
         """
         Tries to download a video with a specific format selector.
@@ -89,14 +106,20 @@ class EnhancedDownloader:
             self.logger.info(f"Attempting to download '{url}' as {quality_label} {strategy_label}...")
 
             try:
-                with yt_dlp.YoutubeDL(opts) as ydl:
-                    # The download happens here
-                    ydl.extract_info(url, download=True)
+                # The download happens here; transient errors and throttling
+                # are retried with backoff before we move on
+                retry.call(
+                    lambda: self._download(opts, url),
+                    on_retry=lambda kind, delay: self.logger.info(f"Retrying '{url}' in {delay:.0f}s ({kind})."),
+                    on_pause=lambda seconds: self.logger.warning(f"YouTube is throttling; pausing {seconds:.0f}s."),
+                )
                 self.logger.info(f"SUCCESS: Downloaded '{url}' as {quality_label} {strategy_label}.")
                 return True
             except yt_dlp.utils.DownloadError as e:
                 # This error is often raised when no suitable stream is found
                 self.logger.warning(f"Could not download '{url}' as {quality_label} {strategy_label}. Reason: No suitable stream found or access denied. ({str(e)[:100]}...)")
+                if retry.classify(e) == retry.PERMANENT:
+                    break
             except Exception as e:
                 self.logger.error(f"An unexpected error occurred while trying to download '{url}' as {quality_label} {strategy_label}: {e}")
 
@@ -125,30 +148,45 @@ class EnhancedDownloader:
         # 3. Abort if both failed
         self.logger.error(f"FAILURE: Could not download '{url}'. No 4K or 1080p stream available or accessible.")
 
-    def download_audio(self, url: str):
+    def download_audio(self, url: str, wait: bool = True):
         """
         Downloads the best available audio and converts it to MP3.
 
+        The MP3 encode runs in the shared transcode pool. With wait=False
+        this returns as soon as the download is done; call
+        wait_for_audio() later to collect the encodes.
+
         Args:
             url: The YouTube URL to download.
+            wait: Block until the MP3 is written.
         """
         self.logger.info(f"--- Starting AUDIO download process for URL: {url} ---")
 
         opts = self._get_base_opts(os.path.join(self.output_dir, '%(title)s.%(ext)s'))
         opts['format'] = 'bestaudio/best'
-        opts['postprocessors'] = [{
-            'key': 'FFmpegExtractAudio',
-            'preferredcodec': 'mp3',
-            'preferredquality': '320', # High quality MP3
-        }]
+        # High quality MP3, tagged with title/artist/cover in place afterwards
+        transcoder = transcode.PooledExtractAudio('mp3', '320', tags=True, cover=True)
 
         try:
-            with yt_dlp.YoutubeDL(opts) as ydl:
-                ydl.extract_info(url, download=True)
-            self.logger.info(f"SUCCESS: Downloaded audio for '{url}' as MP3.")
+            self._download(opts, url, postprocessor=transcoder)
+            self.logger.info(f"Downloaded audio for '{url}', MP3 encode queued.")
+            self._pending_audio.append((url, transcoder))
         except Exception as e:
             self.logger.error(f"FAILURE: Could not download audio for '{url}'. Reason: {e}")
 
+        if wait:
+            self.wait_for_audio()
+
+    def wait_for_audio(self):
+        """Waits for all queued MP3 encodes and logs their outcome."""
+        pending, self._pending_audio = self._pending_audio, []
+        for url, transcoder in pending:
+            try:
+                transcoder.wait()
+                self.logger.info(f"SUCCESS: Downloaded audio for '{url}' as MP3.")
+            except Exception as e:
+                self.logger.error(f"FAILURE: Could not convert audio for '{url}' to MP3. Reason: {e}")
+
 def batch_download(urls: list[str], mode: str, output_dir: Optional[str] = None):
     """
     Performs a batch download of videos or audios.
@@ -163,4 +201,6 @@ def batch_download(urls: list[str], mode: str, output_dir: Optional[str] = None)
         if mode == 'video':
             downloader.download_video(url)
         elif mode == 'audio':
-            downloader.download_audio(url)
+            # Keep fetching while earlier tracks encode
+            downloader.download_audio(url, wait=False)
+    downloader.wait_for_audio()
@@ -5,7 +5,7 @@ Einfaches Menü zum Auswählen von Video oder Audio Download
 """
 
 import os
-import re
+from nerd_downloader import urls
 from src.downloader_enhanced import EnhancedDownloader, batch_download
 
 def clear_screen():
@@ -49,34 +49,8 @@ def get_youtube_url():
         return url
 
 def extract_youtube_urls(text):
-    """Extract all YouTube URLs from text using regex"""
-    patterns = [
-        r'https?://(?:www\.)?youtube\.com/watch\?v=[\w-]+(?:&[\w=&-]*)?',
-        r'https?://youtu\.be/[\w-]+(?:\?[\w=&-]*)?',
-        r'https?://(?:www\.)?youtube\.com/embed/[\w-]+',
-        r'https?://(?:www\.)?youtube\.com/v/[\w-]+'
-    ]
-
-    urls = []
-    for pattern in patterns:
-        found = re.findall(pattern, text)
-        urls.extend(found)
-
-    seen = set()
-    unique_urls = []
-    for url in urls:
-        if 'youtube.com/watch?v=' in url:
-            video_id_match = re.search(r'v=([\w-]+)', url)
-            if video_id_match:
-                clean_url = f"https://www.youtube.com/watch?v={video_id_match.group(1)}"
-                if clean_url not in seen:
-                    seen.add(clean_url)
-                    unique_urls.append(clean_url)
-        elif url not in seen:
-            seen.add(url)
-            unique_urls.append(url)
-
-    return unique_urls
+    """Extract all YouTube URLs from text, canonical and de-duplicated"""
+    return urls.extract(text)
 
 def get_batch_urls():
     """Get multiple YouTube URLs from user"""
@@ -0,0 +1,63 @@
+import gzip
+import re
+
+import pytest
+from flask import request
+
+from nerd_downloader import assets
+from nerd_downloader.app import create_app
+
+
+@pytest.fixture
+def client():
+    return create_app().test_client()
+
+
+def _hashed(client, name):
+    page = client.get("/").get_data(as_text=True)
+    stem, ext = name.rsplit(".", 1)
+    match = re.search(rf"/static/({stem}\.[0-9a-f]{{10}}\.{ext})", page)
+    assert match, f"index.html does not reference a hashed {name}"
+    return match.group(1)
+
+
+def test_index_references_hashed_assets_and_revalidates(client):
+    response = client.get("/")
+    page = response.get_data(as_text=True)
+    assert '"/static/app.js"' not in page and '"/static/styles.css"' not in page
+    assert response.headers["Cache-Control"] == "no-cache"
+    assert client.get("/", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+
+def test_hashed_assets_are_immutable_and_gzipped(client):
+    name = _hashed(client, "app.js")
+    response = client.get(f"/static/{name}", headers={"Accept-Encoding": "gzip, deflate"})
+
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == assets.IMMUTABLE
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    plain = client.get(f"/static/{name}")
+    assert "Content-Encoding" not in plain.headers
+    assert gzip.decompress(response.get_data()) == plain.get_data()
+    assert plain.headers["ETag"] != response.headers["ETag"]
+
+    again = client.get(f"/static/{name}", headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["ETag"]})
+    assert again.status_code == 304 and again.get_data() == b""
+
+
+def test_unhashed_names_still_work_but_revalidate(client):
+    response = client.get("/static/styles.css")
+    assert response.status_code == 200 and response.mimetype == "text/css"
+    assert response.headers["Cache-Control"] == "no-cache"
+    assert client.get("/static/nope.js").status_code == 404
+
+
+def test_brotli_is_preferred_when_available(tmp_path):
+    pytest.importorskip("brotli")
+    (tmp_path / "app.js").write_text("console.log('x');" * 100)
+    bundle = assets.AssetBundle(str(tmp_path))
+    app = create_app()
+    with app.test_request_context(headers={"Accept-Encoding": "gzip, br"}):
+        response = bundle.serve(bundle.url("app.js").rsplit("/", 1)[1], request)
+    assert response.headers["Content-Encoding"] == "br"
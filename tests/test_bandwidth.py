@@ -0,0 +1,69 @@
+import pytest
+
+from nerd_downloader import app as app_module
+from nerd_downloader import bandwidth
+from nerd_downloader.app import create_app
+
+
+def test_limit_is_split_by_weight_and_reassigned_when_jobs_finish():
+    limiter = bandwidth.BandwidthLimiter(bandwidth.parse_rate("3M"))
+    high = limiter.register("high", weight=2)
+    low = limiter.register("low", weight=1)
+    assert (high.rate, low.rate) == (2 * 1024**2, 1024**2)
+
+    low.release()
+    assert high.rate == 3 * 1024**2
+
+    limiter.set_limit(None)
+    assert high.rate is None
+    assert limiter.snapshot() == {"limit": None, "jobs": [{"key": "high", "weight": 2.0, "rate": None}]}
+
+
+def test_share_sleeps_off_bytes_above_its_rate(monkeypatch):
+    now = [100.0]
+    slept = []
+    monkeypatch.setattr(bandwidth.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(bandwidth.time, "sleep", slept.append)
+
+    limiter = bandwidth.BandwidthLimiter(1_000_000)
+    share = limiter.register("job")
+
+    share.hook({"status": "downloading", "downloaded_bytes": 500_000, "filename": "v.mp4"})
+    share.hook({"status": "downloading", "downloaded_bytes": 1_000_000, "filename": "v.mp4"})
+    assert slept == [0.5, 1.0]
+
+    # Time passed while sleeping refills the bucket: no further delay.
+    now[0] += 1.5
+    share.hook({"status": "downloading", "downloaded_bytes": 1_000_000, "filename": "v.mp4"})
+    assert slept == [0.5, 1.0]
+
+
+def test_bandwidth_endpoint_validates_before_applying(monkeypatch):
+    limiter = bandwidth.BandwidthLimiter(bandwidth.parse_rate("3M"))
+    limiter.register("job", weight=1)
+    monkeypatch.setattr(bandwidth, "limiter", limiter)
+    client = create_app().test_client()
+
+    res = client.post("/api/bandwidth", json={"limit": "1M", "job_id": "nope", "weight": 2})
+    assert res.status_code == 404
+    assert limiter.limit == 3 * 1024**2
+
+    for raw in ('{"job_id": "job", "weight": NaN}', '{"job_id": "job", "weight": Infinity}',
+                '{"job_id": "job", "weight": 0}', '{"limit": Infinity}'):
+        res = client.post("/api/bandwidth", data=raw, content_type="application/json")
+        assert res.status_code == 400, raw
+    assert limiter.snapshot()["jobs"][0]["weight"] == 1.0
+
+    with pytest.raises(ValueError):
+        limiter.set_weight("job", float("inf"))
+
+
+def test_download_rejects_an_explicit_zero_weight(monkeypatch):
+    started = []
+    monkeypatch.setattr(app_module, "_run_download", lambda *args: started.append(args))
+    client = create_app().test_client()
+
+    for weight in (0, "", -1):
+        res = client.post("/api/download", json={"url": "https://youtu.be/x", "weight": weight})
+        assert res.status_code == 400, weight
+    assert started == []
@@ -0,0 +1,90 @@
+import json
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from nerd_downloader import batch, engine
+
+
+def fake_download(url, *, format_id, output_dir, progress_cb, estimator, share):
+    if url.endswith("broken"):
+        raise engine.EngineError("Video nicht verfügbar.")
+    for percent in (10, 50, 90):
+        progress_cb({"status": "downloading", "percent": percent})
+    progress_cb({"status": "processing", "message": "verarbeite"})
+    return {"filepath": f"{output_dir}/{url[-3:]}.mp4", "output_dir": output_dir, "title": url[-3:]}
+
+
+def test_batch_emits_json_lines_and_fails_the_exit_status(monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(batch.engine, "download", fake_download)
+    links = tmp_path / "links.txt"
+    links.write_text(
+        "https://youtu.be/aaa\nkein Link\nhttps://www.youtube.com/watch?v=aaa\n"
+        "https://youtu.be/broken https://youtu.be/ccc\n"
+    )
+
+    limit = batch.pipeline.fetch.limit
+    status = batch.main([str(links), "--jobs", "2", "--interval", "60", "--output", str(tmp_path)])
+    assert batch.pipeline.fetch.limit == limit
+
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert status == batch.EXIT_FAILED
+    assert [e["url"] for e in events if e["type"] == "queued"] == [
+        "https://www.youtube.com/watch?v=aaa",
+        "https://www.youtube.com/watch?v=broken",
+        "https://www.youtube.com/watch?v=ccc",
+    ]
+    assert sorted(e["title"] for e in events if e["type"] == "done") == ["aaa", "ccc"]
+    assert [e["message"] for e in events if e["type"] == "error"] == ["Video nicht verfügbar."]
+    # Throttled: one "downloading" line per job, stage changes always.
+    progress = [e["status"] for e in events if e["type"] == "progress" and e["index"] == 1]
+    assert progress == ["downloading", "processing"]
+    assert events[-1]["type"] == "summary"
+    assert {k: events[-1][k] for k in ("total", "ok", "failed", "interrupted")} == {
+        "total": 3, "ok": 2, "failed": 1, "interrupted": False,
+    }
+
+
+def test_batch_rejects_missing_input_files(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exc:
+        batch.main([str(tmp_path / "fehlt.txt")])
+    assert exc.value.code == batch.EXIT_USAGE
+
+
+def test_sigterm_while_waiting_for_the_last_jobs_stops_them_and_still_summarizes(monkeypatch, tmp_path, capsys):
+    started = threading.Barrier(2)
+    sent = threading.Event()
+
+    def slow_download(url, *, format_id, output_dir, progress_cb, estimator, share):
+        started.wait(5)
+        if not sent.is_set():
+            sent.set()
+            # The main thread is blocked in the pool shutdown by now.
+            time.sleep(0.1)
+            os.kill(os.getpid(), signal.SIGTERM)
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            progress_cb({"status": "downloading", "percent": 1})
+            time.sleep(0.01)
+        return {"filepath": None, "output_dir": output_dir, "title": "zu spät"}
+
+    monkeypatch.setattr(batch.engine, "download", slow_download)
+    links = tmp_path / "links.txt"
+    links.write_text("https://youtu.be/aaa\nhttps://youtu.be/bbb\n")
+    handler = signal.getsignal(signal.SIGTERM)
+
+    began = time.monotonic()
+    status = batch.main([str(links), "--jobs", "2", "--output", str(tmp_path)])
+
+    assert status == batch.EXIT_INTERRUPTED
+    assert time.monotonic() - began < 4
+    assert signal.getsignal(signal.SIGTERM) == handler
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert not [e for e in events if e["type"] == "done"]
+    assert events[-1]["type"] == "summary"
+    assert {k: events[-1][k] for k in ("total", "ok", "failed", "interrupted")} == {
+        "total": 2, "ok": 0, "failed": 0, "interrupted": True,
+    }
@@ -6,20 +6,21 @@ from start import extract_youtube_urls
 from src import downloader, downloader_enhanced
 
 
-def test_extract_youtube_urls_normalizes_duplicate_watch_urls_and_preserves_forms():
+def test_extract_youtube_urls_canonicalizes_every_form_and_deduplicates():
     text = """
     https://youtube.com/watch?v=abc123XYZ&feature=share
     https://www.youtube.com/watch?v=abc123XYZ&t=42
     https://youtu.be/shortId-1?si=token
     https://www.youtube.com/embed/embedId_2
     https://youtube.com/v/legacyId-3
+    https://youtu.be/abc123XYZ
     """
 
     assert extract_youtube_urls(text) == [
         "https://www.youtube.com/watch?v=abc123XYZ",
-        "https://youtu.be/shortId-1?si=token",
-        "https://www.youtube.com/embed/embedId_2",
-        "https://youtube.com/v/legacyId-3",
+        "https://www.youtube.com/watch?v=shortId-1",
+        "https://www.youtube.com/watch?v=embedId_2",
+        "https://www.youtube.com/watch?v=legacyId-3",
     ]
 
 
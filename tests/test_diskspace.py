@@ -0,0 +1,109 @@
+import os
+import sys
+import threading
+from collections import namedtuple
+
+import pytest
+
+from nerd_downloader import diskspace, engine
+
+Usage = namedtuple("Usage", "total used free")
+
+
+def test_required_bytes_adds_merge_headroom_for_separate_streams():
+    video = {"filesize": 600, "ext": "mp4"}
+    audio = {"filesize_approx": 100, "ext": "m4a"}
+    assert diskspace.required_bytes({"requested_formats": [video, audio]}) == 1400
+    assert diskspace.required_bytes({"filesize": 500}) == 500
+    assert diskspace.required_bytes({"tbr": 800, "duration": 10}) == 1000 * 1000
+    assert diskspace.required_bytes({"requested_formats": [video, {"ext": "m4a"}]}) is None
+
+
+def test_jobs_wait_for_space_held_by_in_flight_jobs(tmp_path):
+    free = {"bytes": 1000}
+    admission = diskspace.DiskAdmission(floor=100, usage=lambda path: Usage(0, 0, free["bytes"]))
+
+    first = admission.reserve(str(tmp_path), 600)
+    waited = []
+    admitted = threading.Event()
+
+    def second_job():
+        admission.reserve(str(tmp_path), 500, on_wait=lambda needed, now_free: waited.append((needed, now_free)))
+        admitted.set()
+
+    thread = threading.Thread(target=second_job)
+    thread.start()
+    assert not admitted.wait(0.2)
+    assert waited == [(500, 1000)]
+    assert admission.snapshot()["waiting"] == 1
+
+    # The first job wrote 600 bytes and merged; its headroom is back.
+    first.update(600)
+    free["bytes"] = 700
+    first.release()
+    assert admitted.wait(2)
+    thread.join()
+
+    with pytest.raises(diskspace.DiskSpaceError) as exc:
+        diskspace.DiskAdmission(floor=100, usage=lambda path: Usage(0, 0, 1000)).reserve(str(tmp_path), 950)
+    assert "no space left on device" in str(exc.value).lower()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="fallocate is Linux-only")
+def test_preallocate_reserves_blocks_without_growing_the_file(tmp_path):
+    part = tmp_path / "clip.mp4.part"
+    part.write_bytes(b"x" * 10)
+    if not diskspace.preallocate(str(part), 4 << 20):
+        pytest.skip("filesystem does not support fallocate")
+    stat = os.stat(part)
+    assert stat.st_size == 10
+    assert stat.st_blocks * 512 >= 4 << 20
+
+
+def test_download_shrinks_its_reservation_and_preallocates_parts(monkeypatch, tmp_path):
+    admission = diskspace.DiskAdmission(floor=0, usage=lambda path: Usage(0, 0, 10**9))
+    monkeypatch.setattr(diskspace, "admission", admission)
+    preallocated = []
+    monkeypatch.setattr(diskspace, "preallocate", lambda path, size: preallocated.append((path, size)))
+    part = tmp_path / "Clip.mp4.part"
+    seen = {}
+
+    class FakeYoutubeDL:
+        def __init__(self, opts):
+            self.opts = opts
+            # Like yt-dlp: hooks are fixed here, later edits to opts don't count.
+            self._progress_hooks = list(opts.get("progress_hooks") or [])
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def add_progress_hook(self, hook):
+            self._progress_hooks.append(hook)
+
+        def extract_info(self, url, download):
+            return {"title": "Clip", "format_id": "22", "ext": "mp4", "filesize": 2000}
+
+        def prepare_filename(self, info):
+            return str(tmp_path / "Clip.mp4")
+
+        def process_ie_result(self, info, download):
+            part.write_bytes(b"v" * 1500)
+            for hook in self._progress_hooks:
+                hook({"status": "downloading", "tmpfilename": str(part), "downloaded_bytes": 1500, "total_bytes": 2000})
+            seen["reserved"] = admission.snapshot()["reserved"]
+            os.replace(part, tmp_path / "Clip.mp4")
+            for hook in self._progress_hooks:
+                hook({"status": "finished", "filename": str(tmp_path / "Clip.mp4")})
+            return info
+
+    monkeypatch.setattr(engine.yt_dlp, "YoutubeDL", FakeYoutubeDL)
+    monkeypatch.setattr(engine.toolchain, "ffmpeg_path", lambda: "/usr/bin/ffmpeg")
+
+    engine.download("https://youtu.be/x", format_id="720p", output_dir=str(tmp_path))
+
+    assert seen["reserved"] == 500
+    assert preallocated == [(str(part), 2000)]
+    assert admission.snapshot()["jobs"] == 0
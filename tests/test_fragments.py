@@ -0,0 +1,36 @@
+from nerd_downloader.fragments import FragmentPolicy
+
+
+def test_leases_respect_global_cap_and_back_off_on_throttling():
+    policy = FragmentPolicy(initial=4, global_cap=6)
+    first, second = policy.acquire(), policy.acquire()
+    assert (first.connections, second.connections) == (4, 2)
+
+    # More connections only while they still buy throughput, within the cap.
+    assert first.adjust(4_000_000) == 4  # cap exhausted, no probing
+    second.release()
+    assert first.adjust(6_000_000) == 5
+    assert first.adjust(6_100_000) == 5  # plateau: keep the level
+
+    # A burst of 429 retries halves once per stream and lowers new jobs' start.
+    assert first.throttled() == 2
+    assert first.throttled() == 2
+    assert first.adjust(3_000_000) == 2
+    first.release()
+
+    assert policy.acquire().connections == 2
+    assert policy.snapshot()["in_use"] == 2
+
+
+def test_leases_over_the_cap_give_connections_back_at_stream_boundaries():
+    policy = FragmentPolicy(initial=4, global_cap=4)
+    first = policy.acquire()
+    late = [policy.acquire() for _ in range(3)]
+    # Every job keeps one connection, so the cap is briefly exceeded...
+    assert [lease.connections for lease in late] == [1, 1, 1]
+    assert policy.snapshot()["in_use"] == 7
+
+    # ...until the big lease shrinks back, one step per stream, and stops there.
+    assert [first.adjust(5_000_000) for _ in range(4)] == [3, 2, 1, 1]
+    assert policy.snapshot()["in_use"] == 4
+    assert late[0].adjust(9_000_000) == 1
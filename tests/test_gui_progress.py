@@ -0,0 +1,92 @@
+from gui.progress import ThreadSafeGUIUpdater
+
+
+class FakeRoot:
+    """Stand-in for ``tk.Tk`` that records ``after`` calls instead of running them."""
+
+    def __init__(self):
+        self.pending = {}
+        self._next_id = 0
+
+    def after(self, ms, func):
+        self._next_id += 1
+        self.pending[self._next_id] = func
+        return self._next_id
+
+    def after_cancel(self, after_id):
+        self.pending.pop(after_id, None)
+
+    def tick(self):
+        callbacks = list(self.pending.values())
+        self.pending.clear()
+        for func in callbacks:
+            func()
+
+
+def test_updater_keeps_one_scheduled_callback_and_merges_bursts():
+    root = FakeRoot()
+    drawn = []
+    updater = ThreadSafeGUIUpdater(root, drawn.append)
+
+    for i in range(5_000):
+        updater.schedule_update({"percentage": i})
+    assert len(root.pending) == 1
+
+    root.tick()
+    root.tick()  # idle tick draws nothing
+
+    assert drawn == [{"percentage": 4_999}]
+    assert len(root.pending) == 1
+    assert updater.get_stats() == {
+        "received": 5_000,
+        "merged": 4_999,
+        "delivered": 1,
+        "pumps": 2,
+        "scheduled_callbacks": 1,
+    }
+
+    updater.schedule_update({"percentage": 100})
+    updater.stop()
+    assert drawn[-1] == {"percentage": 100}
+    assert root.pending == {}
+
+
+def test_gui_download_drives_its_fragment_lease(monkeypatch):
+    from gui import downloader_backend
+    from nerd_downloader.fragments import FragmentPolicy
+    from nerd_downloader.throughput import ThroughputEstimator
+
+    seen = []
+
+    class FakeYoutubeDL:
+        def __init__(self, opts):
+            self.opts = opts
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def download(self, urls):
+            for stream in ("video.f137.mp4", "audio.f140.m4a"):
+                for hook in self.opts["progress_hooks"]:
+                    hook({"status": "downloading", "filename": stream, "downloaded_bytes": 1})
+                seen.append(self.opts["concurrent_fragment_downloads"])
+            self.opts["logger"].warning("Got error: HTTP Error 429: Too Many Requests")
+            seen.append(self.opts["concurrent_fragment_downloads"])
+
+    class FixedSpeed(ThroughputEstimator):
+        speed = 5_000_000
+
+    monkeypatch.setattr(downloader_backend.yt_dlp, "YoutubeDL", FakeYoutubeDL)
+    lease = FragmentPolicy(initial=2, global_cap=8).acquire()
+    backend = downloader_backend.DownloadBackend()
+    opts = {"concurrent_fragment_downloads": 1}
+
+    backend._download_once("https://youtu.be/x", opts, hooks=[], lease=lease, estimator=FixedSpeed())
+
+    # Probed up at the first stream, held on a plateau, halved by the logged 429.
+    assert seen == [3, 3, 1]
+    assert lease.connections == 1 and lease.throttle_count == 1
+    assert opts == {"concurrent_fragment_downloads": 1}
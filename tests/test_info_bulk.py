@@ -0,0 +1,48 @@
+import json
+import threading
+
+from nerd_downloader import engine
+from nerd_downloader.app import create_app
+
+
+def test_bulk_info_streams_results_as_they_finish(monkeypatch):
+    slow_may_finish = threading.Event()
+
+    def fake_extract_info(url):
+        if url.endswith("slow"):
+            assert slow_may_finish.wait(5)
+        if url.endswith("gone"):
+            raise engine.EngineError("Video nicht verfügbar.")
+        if url.endswith("fast"):
+            slow_may_finish.set()
+        return {"id": url[-4:], "title": url[-4:]}
+
+    monkeypatch.setattr(engine, "extract_info", fake_extract_info)
+    client = create_app().test_client()
+    res = client.post("/api/info/bulk", json={"text": (
+        "https://youtu.be/slow https://youtu.be/gone\nhttps://www.youtube.com/watch?v=fast&t=1 https://youtu.be/fast"
+    )})
+
+    assert res.mimetype == "application/x-ndjson"
+    events = [json.loads(line) for line in res.get_data(as_text=True).splitlines()]
+    assert events[0] == {"type": "start", "total": 3, "urls": [
+        "https://www.youtube.com/watch?v=slow",
+        "https://www.youtube.com/watch?v=gone",
+        "https://www.youtube.com/watch?v=fast",
+    ]}
+    results = [(e["type"], e["index"]) for e in events[1:-1]]
+    # "slow" waits for "fast", so it can only arrive after it.
+    assert results.index(("info", 2)) < results.index(("info", 0))
+    assert ("error", 1) in results
+    assert events[-1] == {"type": "done", "total": 3, "ok": 2, "failed": 1}
+
+
+def test_bulk_info_reports_invalid_links_per_item(monkeypatch):
+    monkeypatch.setattr(engine, "extract_info", lambda url: {"id": "ok", "title": url})
+    client = create_app().test_client()
+    res = client.post("/api/info/bulk", json={"urls": ["https://youtu.be/ok", "ftp://nope"]},
+                      headers={"Accept": "text/event-stream"})
+
+    events = [json.loads(chunk[len("data: "):]) for chunk in res.get_data(as_text=True).split("\n\n") if chunk]
+    assert {"type": "error", "index": 1, "url": "ftp://nope", "message": "Bitte einen gültigen http(s)-Link einfügen."} in events
+    assert events[-1] == {"type": "done", "total": 2, "ok": 1, "failed": 1}
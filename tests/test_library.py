@@ -0,0 +1,54 @@
+import os
+import struct
+
+from nerd_downloader import library, mediainfo
+
+
+def box(kind, payload=b""):
+    return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+
+def mp4(height):
+    tkhd = bytes(76) + struct.pack(">II", (height * 16 // 9) << 16, height << 16)
+    stsd = bytes(4) + struct.pack(">I", 1) + box(b"avc1", bytes(8))
+    trak = box(b"trak", box(b"tkhd", tkhd) + box(b"mdia", (
+        box(b"hdlr", bytes(8) + b"vide" + bytes(12)) + box(b"minf", box(b"stbl", box(b"stsd", stsd)))
+    )))
+    return box(b"ftyp", b"isom" + bytes(4)) + box(b"moov", trak) + box(b"mdat", os.urandom(512))
+
+
+def test_scan_reports_problems_and_reuses_the_index(monkeypatch, tmp_path):
+    library_dir = tmp_path / "Downloads"
+    (library_dir / "old").mkdir(parents=True)
+    hd = mp4(1080)
+    (library_dir / "Concert.mp4").write_bytes(hd)
+    (library_dir / "old" / "Concert (copy).mp4").write_bytes(hd)
+    (library_dir / "Tiny.mp4").write_bytes(mp4(480))
+    (library_dir / "Broken.mp4").write_bytes(mp4(1080)[:-300])
+    (library_dir / "Next.mp4.part").write_bytes(b"x" * 10)
+    (library_dir / "notes.txt").write_text("ignored")
+    index = str(tmp_path / "index.json")
+
+    report = library.scan(str(library_dir), index_path=index, workers=2)
+
+    assert (report["files"], report["read"], report["reused"]) == (4, 4, 0)
+    assert report["partials"] == [
+        {"path": str(library_dir / "Next.mp4.part"), "size": 10, "target": str(library_dir / "Next.mp4")}
+    ]
+    assert report["incomplete"] == [{"path": str(library_dir / "Broken.mp4"), "size": len(hd) - 300}]
+    assert report["below_quality"] == [{"path": str(library_dir / "Tiny.mp4"), "width": 853, "height": 480}]
+    assert report["duplicates"] == [[str(library_dir / "Concert.mp4"), str(library_dir / "old" / "Concert (copy).mp4")]]
+
+    # Second scan: only the rewritten file is read again.
+    probed = []
+    real_probe = mediainfo.probe_file
+    monkeypatch.setattr(library.mediainfo, "probe_file", lambda p: probed.append(p) or real_probe(p))
+    tiny = library_dir / "Tiny.mp4"
+    mtime = tiny.stat().st_mtime_ns
+    tiny.write_bytes(mp4(720))
+    os.utime(tiny, ns=(mtime + 10**9, mtime + 10**9))
+    again = library.scan(str(library_dir), index_path=index, workers=2)
+    assert probed == [str(library_dir / "Tiny.mp4")]
+    assert (again["read"], again["reused"]) == (1, 3)
+    assert again["below_quality"][0]["height"] == 720
+    assert again["duplicates"] == report["duplicates"]
@@ -0,0 +1,78 @@
+import struct
+
+from nerd_downloader import mediainfo
+
+
+def box(kind, payload=b""):
+    return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+
+def mp4_track(handler, codec, width=0, height=0):
+    tkhd = bytes(4 + 20 + 8 + 8 + 36) + struct.pack(">II", width << 16, height << 16)
+    stsd = bytes(4) + struct.pack(">I", 1) + box(codec, bytes(8))
+    return box(b"trak", box(b"tkhd", tkhd) + box(b"mdia", (
+        box(b"hdlr", bytes(8) + handler + bytes(12))
+        + box(b"minf", box(b"stbl", box(b"stsd", stsd)))
+    )))
+
+
+def mp4(moov_last=True):
+    mvhd = bytes(12) + struct.pack(">II", 1000, 212_500) + bytes(80)
+    moov = box(b"moov", box(b"mvhd", mvhd) + mp4_track(b"vide", b"avc1", 1920, 1080) + mp4_track(b"soun", b"mp4a"))
+    mdat = box(b"mdat", bytes(4096))
+    parts = [box(b"ftyp", b"isom" + bytes(4)), mdat, moov] if moov_last else [box(b"ftyp", b"isom" + bytes(4)), moov, mdat]
+    return b"".join(parts)
+
+
+def ebml(element_id, payload):
+    size = len(payload) | 0x10000000  # 4-byte size vint
+    return element_id.to_bytes((element_id.bit_length() + 7) // 8, "big") + size.to_bytes(4, "big") + payload
+
+
+def webm():
+    header = ebml(0x1A45DFA3, ebml(0x4282, b"webm"))
+    info = ebml(0x1549A966, ebml(0x2AD7B1, (1_000_000).to_bytes(3, "big")) + ebml(0x4489, struct.pack(">d", 61_000.0)))
+    video = ebml(0xAE, ebml(0x83, b"\x01") + ebml(0x86, b"V_VP9") + ebml(0xE0, ebml(0xB0, (3840).to_bytes(2, "big")) + ebml(0xBA, (2160).to_bytes(2, "big"))))
+    audio = ebml(0xAE, ebml(0x83, b"\x02") + ebml(0x86, b"A_OPUS"))
+    cluster = ebml(0x1F43B675, bytes(2048))
+    return header + ebml(0x18538067, info + ebml(0x1654AE6B, video + audio) + cluster)
+
+
+def test_reads_mp4_headers_wherever_moov_is(tmp_path):
+    for moov_last in (True, False):
+        path = tmp_path / "clip.mp4"
+        path.write_bytes(mp4(moov_last))
+        assert mediainfo.probe_file(str(path)) == {
+            "container": "mp4",
+            "width": 1920,
+            "height": 1080,
+            "duration": 212.5,
+            "vcodec": "avc1",
+            "acodec": "mp4a",
+            "complete": True,
+            "source": "header",
+        }
+
+
+def test_reads_webm_tracks_and_flags_truncated_files(tmp_path):
+    path = tmp_path / "clip.webm"
+    data = webm()
+    path.write_bytes(data)
+    info = mediainfo.probe_file(str(path))
+    assert (info["container"], info["width"], info["height"], info["duration"]) == ("webm", 3840, 2160, 61.0)
+    assert (info["vcodec"], info["acodec"], info["complete"]) == ("V_VP9", "A_OPUS", True)
+
+    path.write_bytes(data[:-1000])
+    assert mediainfo.probe_file(str(path))["complete"] is False
+
+    cut = tmp_path / "cut.mp4"
+    cut.write_bytes(mp4(moov_last=True)[:3000])
+    info = mediainfo.probe_file(str(cut))
+    assert (info["complete"], info["height"]) == (False, None)
+
+
+def test_unknown_containers_fall_back_to_ffprobe(monkeypatch, tmp_path):
+    path = tmp_path / "clip.avi"
+    path.write_bytes(b"RIFF" + bytes(64))
+    monkeypatch.setattr(mediainfo, "_ffprobe", lambda p: {"source": "ffprobe", "path": p})
+    assert mediainfo.probe_file(str(path)) == {"source": "ffprobe", "path": str(path)}
@@ -0,0 +1,165 @@
+import threading
+import time
+
+from nerd_downloader import engine, pipeline
+
+
+def test_stage_bounds_concurrency_and_admits_smallest_first():
+    stage = pipeline.Stage("test", limit=1)
+    order = []
+    release_first = threading.Event()
+
+    def job(name, priority):
+        with stage.slot(priority=priority):
+            order.append(name)
+            if name == "first":
+                release_first.wait(5)
+
+    first = threading.Thread(target=job, args=("first", 1))
+    first.start()
+    while stage.snapshot()["active"] == 0:
+        time.sleep(0.001)
+
+    waiters = [threading.Thread(target=job, args=args) for args in (("big", 900), ("unknown", None), ("small", 10))]
+    for thread in waiters:
+        thread.start()
+    while stage.snapshot()["waiting"] < 3:
+        time.sleep(0.001)
+
+    release_first.set()
+    for thread in [first, *waiters]:
+        thread.join(5)
+    assert order == ["first", "small", "big", "unknown"]
+
+
+def test_download_fetches_streams_then_merges_outside_the_fetch_stage(monkeypatch, tmp_path):
+    fetched = []
+    merges = []
+
+    class FakeYoutubeDL:
+        def __init__(self, opts):
+            self.opts = opts
+
+        def add_progress_hook(self, hook):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def extract_info(self, url, download):
+            assert download is False
+            return {
+                "title": "Clip",
+                "requested_formats": [
+                    {"format_id": "137", "ext": "mp4", "vcodec": "avc1", "acodec": "none", "filesize": 10},
+                    {"format_id": "140", "ext": "m4a", "vcodec": "none", "acodec": "mp4a.40.2", "filesize": 5},
+                ],
+            }
+
+        def prepare_filename(self, info):
+            return str(tmp_path / "Clip.mp4")
+
+        def dl(self, path, info):
+            assert pipeline.fetch.snapshot()["active"] == 1
+            assert self.opts["concurrent_fragment_downloads"] >= 1
+            fetched.append(info["format_id"])
+            open(path, "wb").close()
+            return True, True
+
+    def fake_run(cmd, **kwargs):
+        assert pipeline.fetch.snapshot()["active"] == 0
+        assert pipeline.postprocess.snapshot()["active"] == 1
+        merges.append(cmd)
+        open(cmd[-1], "wb").close()
+        return type("Result", (), {"returncode": 0})()
+
+    monkeypatch.setattr(engine.yt_dlp, "YoutubeDL", FakeYoutubeDL)
+    monkeypatch.setattr(engine.toolchain, "ffmpeg_path", lambda: "/usr/bin/ffmpeg")
+    monkeypatch.setattr(engine.subprocess, "run", fake_run)
+
+    result = engine.download("https://youtu.be/x", output_dir=str(tmp_path))
+
+    assert fetched == ["137", "140"]
+    assert merges[0][merges[0].index("-map"):][:4] == ["-map", "0:v:0", "-map", "1:a:0"]
+    assert result == {"filepath": str(tmp_path / "Clip.mp4"), "output_dir": str(tmp_path), "title": "Clip"}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["Clip.mp4"]
+
+
+def test_second_download_of_the_same_video_is_skipped(monkeypatch, tmp_path):
+    fetched = []
+    archive = tmp_path / "archive.txt"
+
+    class FakeYoutubeDL:
+        def __init__(self, opts):
+            self.opts = opts
+
+        def add_progress_hook(self, hook):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def extract_info(self, url, download):
+            return {
+                "id": "x",
+                "extractor_key": "Youtube",
+                "title": "Clip",
+                "stretched_ratio": 1.5,
+                "requested_formats": [
+                    {"format_id": "137", "ext": "mp4", "vcodec": "avc1", "acodec": "none", "filesize": 10},
+                    {"format_id": "140", "ext": "m4a", "vcodec": "none", "acodec": "mp4a.40.2", "filesize": 5},
+                ],
+            }
+
+        def prepare_filename(self, info):
+            return str(tmp_path / "Clip.mp4")
+
+        def in_download_archive(self, info):
+            return archive.exists() and f"youtube {info['id']}" in archive.read_text().splitlines()
+
+        def record_download_archive(self, info):
+            with open(self.opts["download_archive"], "a") as fh:
+                fh.write(f"youtube {info['id']}\n")
+
+        def dl(self, path, info):
+            fetched.append(info["format_id"])
+            open(path, "wb").close()
+            return True, True
+
+    def fake_run(cmd, **kwargs):
+        assert cmd[cmd.index("-aspect") + 1] == "1.500000"
+        with open(cmd[-1], "wb") as fh:
+            fh.write(b"merged")
+        return type("Result", (), {"returncode": 0})()
+
+    monkeypatch.setattr(engine.yt_dlp, "YoutubeDL", FakeYoutubeDL)
+    monkeypatch.setattr(engine.toolchain, "ffmpeg_path", lambda: "/usr/bin/ffmpeg")
+    monkeypatch.setattr(engine.subprocess, "run", fake_run)
+
+    first = engine.download("https://youtu.be/x", output_dir=str(tmp_path))
+    second = engine.download("https://youtu.be/x", output_dir=str(tmp_path))
+
+    assert fetched == ["137", "140"]
+    assert first == second == {"filepath": str(tmp_path / "Clip.mp4"), "output_dir": str(tmp_path), "title": "Clip"}
+    assert (tmp_path / "Clip.mp4").read_bytes() == b"merged"
+
+    # Recorded in the archive, the video is skipped even without the file.
+    monkeypatch.setattr(engine.config, "DOWNLOAD_ARCHIVE", str(archive))
+    engine.download("https://youtu.be/x", output_dir=str(tmp_path))
+    assert archive.read_text() == "youtube x\n"
+    (tmp_path / "Clip.mp4").unlink()
+    assert engine.download("https://youtu.be/x", output_dir=str(tmp_path))["filepath"] is None
+    assert fetched == ["137", "140"]
+
+    monkeypatch.setattr(engine.config, "DOWNLOAD_ARCHIVE", "")
+    monkeypatch.setattr(engine.config, "OVERWRITES", True)
+    (tmp_path / "Clip.mp4").write_bytes(b"old")
+    engine.download("https://youtu.be/x", output_dir=str(tmp_path))
+    assert fetched == ["137", "140", "137", "140"]
+    assert (tmp_path / "Clip.mp4").read_bytes() == b"merged"
@@ -0,0 +1,77 @@
+import json
+
+from nerd_downloader import engine
+from nerd_downloader.app import create_app
+
+
+class FakeYoutubeDL:
+    pulled = []
+    closed = 0
+
+    def __init__(self, opts):
+        self.opts = opts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        FakeYoutubeDL.closed += 1
+
+    def extract_info(self, url, download=False, process=True, ie_key=None):
+        if url == "https://www.youtube.com/@nerd":
+            return {"_type": "url", "url": "https://www.youtube.com/@nerd/videos", "ie_key": "YoutubeTab"}
+        if "watch" in url:
+            return {"id": url[-3:], "title": "Video " + url[-3:], "formats": [{"height": 720}]}
+
+        def entries():
+            for i in range(1, 2001):
+                FakeYoutubeDL.pulled.append(i)
+                yield {"_type": "url", "ie_key": "Youtube", "id": f"v{i:02d}", "url": f"https://www.youtube.com/watch?v=v{i:02d}", "title": f"Clip {i}", "duration": 61}
+
+        items = entries()
+        if process:
+            # What extract_flat + playlist_items=1 leaves: just the first item.
+            items = [next(items)]
+        return {"_type": "playlist", "id": "UCnerd", "title": "Nerd Channel", "webpage_url": url, "entries": items}
+
+
+def setup(monkeypatch):
+    FakeYoutubeDL.pulled = []
+    FakeYoutubeDL.closed = 0
+    monkeypatch.setattr(engine.yt_dlp, "YoutubeDL", FakeYoutubeDL)
+
+
+def test_iter_playlist_is_lazy_and_follows_channel_redirects(monkeypatch):
+    setup(monkeypatch)
+    stream = engine.iter_playlist("https://www.youtube.com/@nerd", start=3, limit=2)
+
+    assert next(stream) == ("playlist", {
+        "id": "UCnerd", "title": "Nerd Channel", "uploader": "", "webpage_url": "https://www.youtube.com/@nerd/videos",
+    })
+    entries = [item for _, item in stream]
+    assert [(e["index"], e["id"], e["duration_string"]) for e in entries] == [(3, "v03", "1:01"), (4, "v04", "1:01")]
+    assert FakeYoutubeDL.pulled == [1, 2, 3, 4]
+    assert FakeYoutubeDL.closed == 1
+
+
+def test_extract_info_resolves_only_the_first_playlist_item(monkeypatch):
+    setup(monkeypatch)
+    info = engine.extract_info("https://www.youtube.com/playlist?list=PL1")
+    assert (info["id"], info["max_height"]) == ("v01", 720)
+    assert info["playlist"] == {"title": "Nerd Channel", "url": "https://www.youtube.com/playlist?list=PL1"}
+
+
+def test_playlist_endpoint_streams_ndjson_pages(monkeypatch):
+    setup(monkeypatch)
+    client = create_app().test_client()
+    res = client.post("/api/playlist", json={"url": "https://www.youtube.com/playlist?list=PL1", "page_size": 2, "limit": 5})
+
+    assert res.mimetype == "application/x-ndjson"
+    events = [json.loads(line) for line in res.get_data(as_text=True).splitlines()]
+    assert [e["type"] for e in events] == ["playlist", "page", "page", "page", "done"]
+    assert [len(e["entries"]) for e in events if e["type"] == "page"] == [2, 2, 1]
+    assert events[-1] == {"type": "done", "count": 5, "pages": 3}
+    assert FakeYoutubeDL.pulled == [1, 2, 3, 4, 5]
@@ -0,0 +1,57 @@
+import pytest
+
+from nerd_downloader import engine, records
+
+INFO = {
+    "id": "abc123",
+    "title": "Clip",
+    "channel": "Nerd Channel",
+    "duration": 3725,
+    "webpage_url": "https://www.youtube.com/watch?v=abc123",
+    "extractor_key": "Youtube",
+    "thumbnails": [{"url": "https://i.ytimg.com/vi/abc123/0.jpg"}, {"url": "https://i.ytimg.com/vi/abc123/max.jpg"}],
+    "formats": [{"height": 720, "url": "x" * 1000}, {"height": 1080}, {"height": 720}, {"acodec": "opus"}],
+    "automatic_captions": {"de": [{"url": "y" * 1000}]},
+    "heatmap": [{"value": 0.5}] * 100,
+    "description": "lang " * 1000,
+}
+
+
+def test_video_record_keeps_only_the_projection():
+    record = records.VideoRecord.from_info(INFO)
+
+    assert not hasattr(record, "__dict__")
+    assert record.heights == (1080, 720) and record.max_height == 1080
+    assert record.uploader == "Nerd Channel"
+    assert record.thumbnail_url == "https://i.ytimg.com/vi/abc123/max.jpg"
+    with pytest.raises(AttributeError):
+        record.formats = INFO["formats"]
+
+
+def test_normalized_info_keeps_its_json_shape():
+    info = engine._normalize_info(INFO)
+
+    assert info == {
+        "id": "abc123",
+        "title": "Clip",
+        "uploader": "Nerd Channel",
+        "duration": 3725,
+        "duration_string": "1:02:05",
+        "thumbnail": "/api/thumb/abc123",
+        "thumbnail_url": "https://i.ytimg.com/vi/abc123/max.jpg",
+        "webpage_url": "https://www.youtube.com/watch?v=abc123",
+        "extractor": "Youtube",
+        "is_live": False,
+        "view_count": None,
+        "upload_date": None,
+        "max_height": 1080,
+        "available_heights": [1080, 720],
+    }
+
+
+def test_entry_records_intern_repeated_uploaders():
+    one = records.EntryRecord.from_entry({"id": "a", "uploader": "".join(["Nerd ", "Channel"])}, 1, "u1")
+    two = records.EntryRecord.from_entry({"id": "b", "uploader": "".join(["Nerd ", "Channel"])}, 2, "u2")
+
+    assert one.uploader is two.uploader
+    assert two.as_dict()["index"] == 2 and two.as_dict()["title"] == "Unbekannter Titel"
@@ -0,0 +1,157 @@
+import os
+import threading
+
+from nerd_downloader import app as app_module
+from nerd_downloader import engine, resume
+from nerd_downloader.jobs import manager
+
+
+def _record(path, offset, fragmented=False):
+    return {"offset": offset, "digest": resume._digest(str(path), offset), "fragmented": fragmented}
+
+
+def test_validate_cuts_plain_parts_back_to_the_verified_offset(tmp_path):
+    part = tmp_path / "Clip.f137.mp4.part"
+    part.write_bytes(b"a" * 1000)
+    record = _record(part, 800)
+    with open(part, "ab") as fh:
+        fh.write(b"\0" * 500)  # written after the checkpoint, never verified
+
+    assert resume.validate(str(part), record)
+    assert part.read_bytes() == b"a" * 800
+
+
+def test_validate_keeps_fragmented_parts_whole(tmp_path):
+    part = tmp_path / "Clip.f137.mp4.part"
+    part.write_bytes(b"a" * 1000)
+    record = _record(part, 800, fragmented=True)
+
+    assert resume.validate(str(part), record)
+    assert part.stat().st_size == 1000
+
+
+def test_validate_discards_parts_that_changed_or_shrank(tmp_path):
+    part = tmp_path / "Clip.f137.mp4.part"
+    state = tmp_path / "Clip.f137.mp4.ytdl"
+    part.write_bytes(b"a" * 1000)
+    state.write_text("{}")
+    record = _record(part, 1000)
+    part.write_bytes(b"b" * 1000)
+
+    assert not resume.validate(str(part), record)
+    assert not part.exists() and not state.exists()
+
+    part.write_bytes(b"a" * 10)
+    assert not resume.validate(str(part), {"offset": 500, "digest": "x"})
+    assert not part.exists()
+
+
+def test_checkpoint_survives_a_restart_and_pins_the_formats(tmp_path):
+    path = str(tmp_path / "resume.json")
+    part = tmp_path / "Clip.f137.mp4.part"
+    part.write_bytes(b"v" * 4096)
+
+    checkpoint = resume.Checkpoint("job1", "https://youtu.be/x", "best", str(tmp_path), store=resume.ResumeStore(path))
+    checkpoint.plan({"requested_formats": [{"format_id": "137"}, {"format_id": "140"}]})
+    checkpoint.hook()({"status": "downloading", "tmpfilename": str(part), "downloaded_bytes": 4096})
+
+    # A new process reads the file again.
+    store = resume.ResumeStore(path)
+    assert [e["job_id"] for e in store.pending()] == ["job1"]
+    again = resume.Checkpoint("job1", "ignored", "ignored", "ignored", store=store)
+    assert again.entry["url"] == "https://youtu.be/x"
+    assert again.selector("bestvideo*+bestaudio") == "137+140/bestvideo*+bestaudio"
+    assert again.restore() == 4096
+
+    again.done()
+    assert resume.ResumeStore(path).pending() == []
+
+
+def test_changed_formats_drop_the_old_parts(tmp_path):
+    part = tmp_path / "Clip.f137.mp4.part"
+    part.write_bytes(b"v" * 100)
+    checkpoint = resume.Checkpoint("job1", "u", "best", str(tmp_path), store=resume.ResumeStore(str(tmp_path / "r.json")))
+    checkpoint.plan({"requested_formats": [{"format_id": "137"}, {"format_id": "140"}]})
+    checkpoint.hook()({"status": "downloading", "tmpfilename": str(part), "downloaded_bytes": 100})
+
+    checkpoint.plan({"requested_formats": [{"format_id": "299"}, {"format_id": "140"}]})
+
+    assert not part.exists()
+    assert checkpoint.entry["parts"] == {}
+
+
+def test_download_continues_from_the_validated_offset(monkeypatch, tmp_path):
+    store = resume.ResumeStore(str(tmp_path / "resume.json"))
+    part = tmp_path / "Clip.mp4.part"
+    part.write_bytes(b"v" * 1000)
+    checkpoint = resume.Checkpoint("job1", "https://youtu.be/x", "720p", str(tmp_path), store=store)
+    checkpoint.plan({"format_id": "22"})
+    checkpoint.hook()({"status": "downloading", "tmpfilename": str(part), "downloaded_bytes": 600})
+    seen = {}
+
+    class FakeYoutubeDL:
+        def __init__(self, opts):
+            self.opts = opts
+            # yt-dlp copies the hooks here; later edits to opts don't count.
+            self._progress_hooks = list(opts.get("progress_hooks") or [])
+
+        def add_progress_hook(self, hook):
+            self._progress_hooks.append(hook)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def extract_info(self, url, download):
+            return {"title": "Clip", "format_id": "22", "ext": "mp4", "filesize": 2000}
+
+        def prepare_filename(self, info):
+            return str(tmp_path / "Clip.mp4")
+
+        def process_ie_result(self, info, download):
+            seen["format"] = self.opts["format"]
+            seen["resume_from"] = part.stat().st_size
+            with open(part, "ab") as fh:
+                fh.write(b"v" * 1400)
+            for hook in self._progress_hooks:
+                hook({"status": "downloading", "tmpfilename": str(part), "downloaded_bytes": 2000})
+            seen["checkpointed"] = checkpoint.entry["parts"].get(str(part), {}).get("offset")
+            os.replace(part, tmp_path / "Clip.mp4")
+            for hook in self._progress_hooks:
+                hook({"status": "finished", "filename": str(tmp_path / "Clip.mp4"), "tmpfilename": str(part)})
+            return info
+
+    monkeypatch.setattr(engine.yt_dlp, "YoutubeDL", FakeYoutubeDL)
+    monkeypatch.setattr(engine.toolchain, "ffmpeg_path", lambda: "/usr/bin/ffmpeg")
+    monkeypatch.setattr(resume, "_SAVE_INTERVAL", 0)
+
+    result = engine.download("https://youtu.be/x", format_id="720p", output_dir=str(tmp_path), checkpoint=checkpoint)
+
+    assert seen == {
+        "format": "22/" + engine.FORMAT_PRESETS["720p"]["selector"],
+        "resume_from": 600,
+        "checkpointed": 2000,
+    }
+    assert result["filepath"] == str(tmp_path / "Clip.mp4")
+    assert checkpoint.entry["parts"] == {}
+
+
+def test_resume_interrupted_restarts_jobs_under_their_old_ids(monkeypatch, tmp_path):
+    store = resume.ResumeStore(str(tmp_path / "resume.json"))
+    resume.Checkpoint("old-job", "https://youtu.be/x", "1080p", str(tmp_path), 2.0, ["de", "en"], store=store)
+    monkeypatch.setattr(resume, "default_store", store)
+    started = []
+    ran = threading.Event()
+
+    def fake_run(*args):
+        started.append(args)
+        ran.set()
+
+    monkeypatch.setattr(app_module, "_run_download", fake_run)
+
+    assert app_module.resume_interrupted() == ["old-job"]
+    assert ran.wait(5)
+    assert started == [("old-job", "https://youtu.be/x", "1080p", str(tmp_path), 2.0, ["de", "en"])]
+    assert manager.get("old-job") is not None
@@ -0,0 +1,84 @@
+import pytest
+
+from nerd_downloader import retry
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_failures_are_classified():
+    assert retry.classify("HTTP Error 429: Too Many Requests") == retry.THROTTLED
+    assert retry.classify("Sign in to confirm you're not a bot") == retry.AUTH
+    assert not retry.is_throttled("Sign in to confirm you're not a bot. This helps protect our community")
+    assert retry.classify("Private video. Sign in if you've been granted access") == retry.AUTH
+    assert retry.classify("Requested format is not available") == retry.AUTH
+    assert retry.classify("Video unavailable. This video has been removed by the uploader") == retry.PERMANENT
+    assert retry.classify("Unable to download webpage: timed out") == retry.TRANSIENT
+    assert retry.classify("HTTP Error 503: Service Unavailable") == retry.TRANSIENT
+
+
+def test_backoff_grows_exponentially_with_bounded_jitter():
+    for attempt, ceiling in ((1, 1.0), (2, 2.0), (3, 4.0), (10, 30.0)):
+        delays = [retry.backoff(attempt) for _ in range(50)]
+        assert all(ceiling / 2 <= d <= ceiling for d in delays)
+    assert min(retry.backoff(1, retry.THROTTLED) for _ in range(50)) >= 2.5
+
+
+def test_call_retries_transient_errors_and_gives_up_on_auth(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(retry, "breaker", retry.CircuitBreaker(clock=clock))
+    slept = []
+    monkeypatch.setattr(retry, "_sleep", slept.append)
+    outcomes = iter([ConnectionResetError("Connection reset by peer"), OSError("timed out"), "ok"])
+
+    def flaky():
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert retry.call(flaky) == "ok"
+    assert len(slept) == 2 and slept[0] <= 1.0 < slept[1] <= 2.0
+
+    calls = []
+
+    def private():
+        calls.append(1)
+        raise RuntimeError("Private video")
+
+    with pytest.raises(RuntimeError):
+        retry.call(private)
+    assert calls == [1] and len(slept) == 2
+
+
+def test_breaker_opens_on_throttling_and_pauses_new_attempts(monkeypatch):
+    clock = Clock()
+    breaker = retry.CircuitBreaker(window=60, threshold=0.5, min_events=4, cooldown=30, clock=clock)
+    monkeypatch.setattr(retry, "breaker", breaker)
+
+    def sleep(seconds):
+        clock.now += seconds
+
+    monkeypatch.setattr(retry, "_sleep", sleep)
+    breaker.record(False, success=True)
+    breaker.record(False)
+    breaker.record(True)
+    assert not breaker.snapshot()["open"]
+    breaker.record(True)
+    assert breaker.snapshot() == {"open": True, "open_for": 30.0, "trips": 1, "recent": 0, "throttled": 0}
+
+    # Still throttled once it closes: the next cool-down is twice as long.
+    clock.now += 30
+    for _ in range(4):
+        breaker.record(True)
+    assert breaker.remaining() == 60.0
+
+    paused = []
+    assert retry.call(lambda: "ok", on_pause=paused.append) == "ok"
+    assert paused == [60.0] and clock.now == 190.0
+    assert breaker.snapshot()["trips"] == 0  # a success resets the escalation
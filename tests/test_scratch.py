@@ -0,0 +1,182 @@
+import errno
+import os
+
+import pytest
+
+from nerd_downloader import config, engine, scratch
+
+
+def _cross_device(monkeypatch, scratch_dir):
+    """Make renames and links out of ``scratch_dir`` fail like a move across filesystems."""
+
+    def cross_device(real):
+        def move(src, dst):
+            if os.path.dirname(os.path.abspath(src)) == str(scratch_dir):
+                raise OSError(errno.EXDEV, "Invalid cross-device link")
+            return real(src, dst)
+
+        return move
+
+    monkeypatch.setattr(scratch.os, "replace", cross_device(os.replace))
+    monkeypatch.setattr(scratch.os, "link", cross_device(os.link))
+
+
+def test_without_scratch_dir_jobs_write_into_the_output_folder(tmp_path):
+    assert scratch.workdir("https://youtu.be/abc", "best", str(tmp_path), root="") == str(tmp_path)
+    path = tmp_path / "Clip.mp4"
+    path.write_bytes(b"x")
+    assert scratch.finalize(str(path), str(tmp_path)) == str(path)
+
+
+def test_workdir_is_stable_per_video_and_format(tmp_path):
+    root = str(tmp_path / "scratch")
+    first = scratch.workdir("https://youtu.be/abc", "best", "/out", root=root)
+    scratch.release(first)
+    assert scratch.workdir("https://www.youtube.com/watch?v=abc", "best", "/out", root=root) == first
+    other = scratch.workdir("https://youtu.be/abc", "720p", "/out", root=root)
+    assert other != first
+    assert os.path.isdir(first)
+    scratch.release(first)
+    scratch.release(other)
+
+
+def test_concurrent_jobs_for_the_same_video_get_their_own_workdir(tmp_path):
+    root = str(tmp_path / "scratch")
+    first = scratch.workdir("https://youtu.be/abc", "best", "/out", root=root)
+    second = scratch.workdir("https://youtu.be/abc", "best", "/out", root=root)
+    assert second != first
+    scratch.discard(first, "/out")
+    scratch.release(second)
+    # Freed again, the first name is reused (a retry finds its .part files).
+    third = scratch.workdir("https://youtu.be/abc", "best", "/out", root=root)
+    assert third == first
+    scratch.release(third)
+
+
+@pytest.mark.parametrize("cross_device", [False, True])
+def test_finalize_never_replaces_an_existing_file_unless_asked(monkeypatch, tmp_path, cross_device):
+    work, out = tmp_path / "work", tmp_path / "out"
+    work.mkdir()
+    out.mkdir()
+    (out / "Clip.mp4").write_bytes(b"old")
+    if cross_device:
+        _cross_device(monkeypatch, work)
+
+    src = work / "Clip.mp4"
+    src.write_bytes(b"new")
+    assert scratch.finalize(str(src), str(out)) == str(out / "Clip (1).mp4")
+    assert (out / "Clip.mp4").read_bytes() == b"old"
+    assert (out / "Clip (1).mp4").read_bytes() == b"new"
+    assert not src.exists()
+
+    src.write_bytes(b"newer")
+    assert scratch.finalize(str(src), str(out), overwrite=True) == str(out / "Clip.mp4")
+    assert (out / "Clip.mp4").read_bytes() == b"newer"
+    assert sorted(os.listdir(out)) == ["Clip (1).mp4", "Clip.mp4"]
+
+
+def test_finalize_renames_on_the_same_filesystem(tmp_path):
+    work, out = tmp_path / "work", tmp_path / "out"
+    work.mkdir()
+    out.mkdir()
+    src = work / "Clip.mp4"
+    src.write_bytes(b"video")
+    inode = src.stat().st_ino
+
+    target = scratch.finalize(str(src), str(out))
+
+    assert target == str(out / "Clip.mp4")
+    assert os.stat(target).st_ino == inode
+    assert not src.exists()
+
+
+def test_finalize_copies_across_filesystems_without_partial_files(monkeypatch, tmp_path):
+    work, out = tmp_path / "work", tmp_path / "out"
+    work.mkdir()
+    out.mkdir()
+    src = work / "Clip.mp4"
+    payload = os.urandom(3 << 20)
+    src.write_bytes(payload)
+    os.chmod(src, 0o640)
+    _cross_device(monkeypatch, work)
+
+    target = scratch.finalize(str(src), str(out))
+
+    assert (out / "Clip.mp4").read_bytes() == payload
+    assert os.stat(target).st_mode & 0o777 == 0o640
+    assert not src.exists()
+    assert os.listdir(out) == ["Clip.mp4"]
+
+
+def test_failed_copy_leaves_the_output_folder_untouched(monkeypatch, tmp_path):
+    work, out = tmp_path / "work", tmp_path / "out"
+    work.mkdir()
+    out.mkdir()
+    src = work / "Clip.mp4"
+    src.write_bytes(b"video")
+    _cross_device(monkeypatch, work)
+
+    def full(fsrc, fdst):
+        fdst.write(b"vi")
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr(scratch, "_stream", full)
+    with pytest.raises(OSError):
+        scratch.finalize(str(src), str(out))
+
+    assert os.listdir(out) == []
+    assert src.read_bytes() == b"video"
+
+
+def test_download_stages_in_scratch_and_moves_only_the_merged_file(monkeypatch, tmp_path):
+    out, root = tmp_path / "out", tmp_path / "scratch"
+    written = []
+
+    class FakeYoutubeDL:
+        def __init__(self, opts):
+            self.opts = opts
+
+        def add_progress_hook(self, hook):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def extract_info(self, url, download):
+            return {
+                "title": "Clip",
+                "requested_formats": [
+                    {"format_id": "137", "ext": "mp4", "vcodec": "avc1", "acodec": "none", "filesize": 10},
+                    {"format_id": "140", "ext": "m4a", "vcodec": "none", "acodec": "mp4a.40.2", "filesize": 5},
+                ],
+            }
+
+        def prepare_filename(self, info):
+            return self.opts["outtmpl"].replace("%(title)s.%(ext)s", "Clip.mp4")
+
+        def dl(self, path, info):
+            written.append(path)
+            open(path, "wb").close()
+            return True, True
+
+    def fake_run(cmd, **kwargs):
+        written.append(cmd[-1])
+        with open(cmd[-1], "wb") as fh:
+            fh.write(b"merged")
+        return type("Result", (), {"returncode": 0})()
+
+    monkeypatch.setattr(config, "SCRATCH_DIR", str(root))
+    monkeypatch.setattr(engine.yt_dlp, "YoutubeDL", FakeYoutubeDL)
+    monkeypatch.setattr(engine.toolchain, "ffmpeg_path", lambda: "/usr/bin/ffmpeg")
+    monkeypatch.setattr(engine.subprocess, "run", fake_run)
+
+    result = engine.download("https://youtu.be/x", output_dir=str(out))
+
+    assert written and all(path.startswith(str(root)) for path in written)
+    assert result["filepath"] == str(out / "Clip.mp4")
+    assert (out / "Clip.mp4").read_bytes() == b"merged"
+    assert os.listdir(out) == ["Clip.mp4"]
+    assert os.listdir(root) == []
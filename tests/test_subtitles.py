@@ -0,0 +1,124 @@
+import os
+import subprocess
+
+import pytest
+
+from nerd_downloader import engine, subtitles
+
+INFO = {
+    "id": "abc123",
+    "subtitles": {
+        "en-GB": [{"ext": "json3", "url": "https://subs/en-GB.json3"}, {"ext": "vtt", "url": "https://subs/en-GB.vtt"}],
+        "fr": [{"ext": "ttml", "url": "https://subs/fr.ttml"}],
+    },
+    "automatic_captions": {
+        "de": [{"ext": "vtt", "url": "https://subs/de-auto.vtt"}],
+        "en": [{"ext": "vtt", "url": "https://subs/en-auto.vtt"}],
+    },
+}
+
+
+@pytest.fixture
+def fetched(monkeypatch, tmp_path):
+    urls = []
+
+    def fetch(url):
+        urls.append(url)
+        if "missing" in url:
+            raise OSError("404")
+        return f"WEBVTT\n\n00:00.000 --> 00:01.000\n{url}\n".encode()
+
+    pool = subtitles.SubtitlePool(2, subtitles.SubtitleCache(str(tmp_path / "cache"), fetch=fetch))
+    monkeypatch.setattr(subtitles, "pool", pool)
+    return urls
+
+
+def test_select_prefers_uploaded_tracks_and_skips_absent_languages():
+    tracks = subtitles.select(INFO, ["en", "de", "fr", "ja"])
+
+    assert [(t["lang"], t["url"], t["automatic"]) for t in tracks] == [
+        ("en-GB", "https://subs/en-GB.vtt", False),
+        ("de", "https://subs/de-auto.vtt", True),
+    ]
+    assert subtitles.select(INFO, ["de"], automatic=False) == []
+    assert subtitles.parse_langs(["de", " en ", "de", "../x", ""]) == ["de", "en"]
+
+
+def test_tracks_are_fetched_once_per_video_and_language(fetched):
+    first = subtitles.pool.fetch(INFO, ["en", "de"]).result()
+    again = subtitles.pool.fetch(INFO, ["de"]).result()
+
+    assert len(fetched) == 2
+    assert again[0]["path"] == first[1]["path"] and os.path.exists(again[0]["path"])
+    broken = {"id": "abc123", "subtitles": {"it": [{"ext": "vtt", "url": "https://subs/missing.vtt"}]}}
+    assert subtitles.pool.fetch(broken, ["it"]).result() == []
+    assert subtitles.pool.snapshot()["skipped"] == 1
+
+
+def test_merge_muxes_subtitles_in_the_same_ffmpeg_pass(monkeypatch, fetched, tmp_path):
+    commands = []
+
+    class FakeYoutubeDL:
+        def __init__(self, opts):
+            self.opts = opts
+
+        def add_progress_hook(self, hook):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def extract_info(self, url, download):
+            return {
+                **INFO,
+                "title": "Clip",
+                "ext": "mp4",
+                "requested_formats": [
+                    {"format_id": "137", "ext": "mp4", "vcodec": "avc1", "acodec": "none", "filesize": 100},
+                    {"format_id": "140", "ext": "m4a", "vcodec": "none", "acodec": "mp4a", "filesize": 10},
+                ],
+            }
+
+        def prepare_filename(self, info):
+            return os.path.join(os.path.dirname(self.opts["outtmpl"]), "Clip.mp4")
+
+        def dl(self, path, info):
+            with open(path, "wb") as fh:
+                fh.write(b"x" * info["filesize"])
+            return True, True
+
+    def run(cmd, **kwargs):
+        commands.append(cmd)
+        with open(cmd[-1], "wb") as fh:
+            fh.write(b"merged")
+        return subprocess.CompletedProcess(cmd, 0, "", "")
+
+    monkeypatch.setattr(engine.yt_dlp, "YoutubeDL", FakeYoutubeDL)
+    monkeypatch.setattr(engine.toolchain, "ffmpeg_path", lambda: "/usr/bin/ffmpeg")
+    monkeypatch.setattr(engine.subprocess, "run", run)
+
+    out = tmp_path / "out"
+    result = engine.download("https://youtu.be/abc123", output_dir=str(out), subtitle_langs=["de", "en"])
+
+    assert len(commands) == 1
+    cmd = commands[0]
+    assert cmd.count("-i") == 4
+    assert ["-map", "2:0", "-metadata:s:s:0", "language=deu"] == cmd[cmd.index("2:0") - 1:cmd.index("2:0") + 3]
+    assert cmd[cmd.index("-c:s") + 1] == "mov_text"
+    assert result["filepath"] == str(out / "Clip.mp4")
+    assert os.listdir(out) == ["Clip.mp4"]
+
+
+def test_sidecars_are_written_next_to_files_yt_dlp_finishes(fetched, tmp_path):
+    sidecars = subtitles.Sidecars(["de", "ja"])
+    video = tmp_path / "Clip.mp4"
+
+    sidecars.run(dict(INFO))  # before_dl: starts the fetch
+    video.write_bytes(b"x")
+    sidecars.run({**INFO, "filepath": str(video)})  # after_move
+
+    assert sidecars.written == [str(tmp_path / "Clip.de.vtt")]
+    assert (tmp_path / "Clip.de.vtt").read_text().startswith("WEBVTT")
@@ -0,0 +1,55 @@
+from nerd_downloader import sync
+
+
+class FakeSource:
+    def __init__(self, ids):
+        self.ids = ids
+        self.pulled = 0
+        self.starts = []
+
+    def iter_playlist(self, url, start=1, limit=None):
+        self.starts.append(start)
+        yield "playlist", {"title": "Nerd Channel"}
+        stop = len(self.ids) if limit is None else min(len(self.ids), start - 1 + limit)
+        for index in range(start, stop + 1):
+            self.pulled += 1
+            vid = self.ids[index - 1]
+            yield "entry", {"index": index, "id": vid, "title": vid, "url": f"https://youtu.be/{vid}"}
+
+
+def test_channel_sync_stops_at_the_first_known_upload(monkeypatch, tmp_path):
+    store = sync.SyncStore(str(tmp_path / "sync.json"))
+    channel = FakeSource([f"old{i}" for i in range(2000)])
+    monkeypatch.setattr(sync.engine, "iter_playlist", channel.iter_playlist)
+    url = "https://www.youtube.com/@nerd"
+
+    first = sync.check(url, store=store, initial_limit=3)
+    assert [e["id"] for e in first["new"]] == ["old0", "old1", "old2"] and first["first_sync"]
+    sync.commit(first, store=store)
+
+    channel.ids = ["new1", "new0"] + channel.ids
+    channel.pulled = 0
+    result = sync.check(url, store=store)
+    assert [e["id"] for e in result["new"]] == ["new1", "new0"]
+    assert channel.pulled == 3  # two new uploads + the first known one
+
+    # new0 fails: it is offered again although the walk stops at new1.
+    sync.commit(result, [result["new"][0]], store=store)
+    again = sync.check(url, store=store)
+    assert [e["id"] for e in again["new"]] == ["new0"]
+    assert store.get(url)["seen"][:3] == ["new1", "old0", "old1"]
+
+
+def test_playlist_sync_resumes_near_the_last_known_end(monkeypatch, tmp_path):
+    store = sync.SyncStore(str(tmp_path / "sync.json"))
+    playlist = FakeSource([f"v{i}" for i in range(1, 301)])
+    monkeypatch.setattr(sync.engine, "iter_playlist", playlist.iter_playlist)
+    url = "https://www.youtube.com/playlist?list=PL1"
+
+    sync.commit(sync.check(url, store=store), store=store)
+    playlist.ids.append("v301")
+    result = sync.check(url, store=store)
+
+    assert playlist.starts == [1, 251]
+    assert [e["id"] for e in result["new"]] == ["v301"]
+    assert result["count"] == 301
@@ -0,0 +1,111 @@
+import io
+import os
+import struct
+
+import pytest
+
+pytest.importorskip("mutagen")
+PIL = pytest.importorskip("PIL.Image")
+
+from mutagen.flac import FLAC  # noqa: E402
+from mutagen.id3 import ID3  # noqa: E402
+
+from nerd_downloader import tagging, transcode  # noqa: E402
+
+META = {
+    "id": "abc123",
+    "title": "Song",
+    "uploader": "Band",
+    "upload_date": "20240501",
+    "webpage_url": "https://www.youtube.com/watch?v=abc123",
+    "thumbnail": "https://i.ytimg.com/vi/abc123/maxresdefault.jpg",
+}
+
+
+def _thumbnail(size=(1280, 720)) -> bytes:
+    out = io.BytesIO()
+    PIL.new("RGB", size, (200, 30, 30)).save(out, "PNG")
+    return out.getvalue()
+
+
+def _flac(path, padding):
+    """Minimal FLAC: STREAMINFO, a padding block, one frame's worth of bytes."""
+    info = struct.pack(">HH", 4096, 4096) + bytes(6)
+    info += ((44100 << 44) | (1 << 41) | (15 << 36)).to_bytes(8, "big") + bytes(16)
+    blocks = b"\x00" + len(info).to_bytes(3, "big") + info
+    blocks += b"\x81" + padding.to_bytes(3, "big") + bytes(padding)
+    path.write_bytes(b"fLaC" + blocks + b"\xff\xf8" + bytes(4000))
+
+
+def test_cover_is_fetched_and_resized_once(tmp_path):
+    fetched = []
+    covers = tagging.CoverCache(str(tmp_path), fetch=lambda url: fetched.append(url) or _thumbnail())
+
+    first = covers.get("abc123", META["thumbnail"])
+    second = covers.get("abc123", META["thumbnail"])
+
+    assert first == second and len(fetched) == 1
+    with PIL.open(io.BytesIO(first)) as image:
+        assert image.format == "JPEG" and max(image.size) == tagging._COVER_SIZE
+    assert (covers.hits, covers.misses) == (1, 1)
+    assert covers.get("abc123", None) is None
+
+
+def test_mp3_tags_and_cover_are_written_in_place(tmp_path):
+    path = tmp_path / "Song.mp3"
+    path.write_bytes(b"\xff\xfb\x90\x00" * 5000)
+
+    assert tagging.write(str(path), META, cover=b"\xff\xd8jpeg")
+
+    tags = ID3(str(path))
+    assert str(tags["TIT2"]) == "Song"
+    assert str(tags["TPE1"]) == "Band"
+    assert str(tags["TDRC"]) == "2024"
+    assert tags.getall("APIC")[0].data == b"\xff\xd8jpeg"
+    assert path.read_bytes().endswith(b"\xff\xfb\x90\x00" * 5000)
+
+
+def test_tags_that_fit_the_padding_do_not_move_audio_data(tmp_path):
+    path = tmp_path / "Song.flac"
+    _flac(path, padding=200_000)
+    size = path.stat().st_size
+
+    tagging.write(str(path), META, cover=bytes(50_000))
+
+    audio = FLAC(str(path))
+    assert audio["TITLE"] == ["Song"] and audio["ARTIST"] == ["Band"]
+    assert audio.pictures[0].data == bytes(50_000)
+    assert path.stat().st_size == size
+
+
+def test_unknown_containers_are_left_alone(tmp_path):
+    path = tmp_path / "Song.opus"
+    path.write_bytes(b"OggS")
+    assert not tagging.write(str(path), META)
+    assert path.read_bytes() == b"OggS"
+
+
+def test_encoded_files_are_tagged_on_the_pool(tmp_path):
+    path = tmp_path / "Song.mp3"
+    path.write_bytes(b"\xff\xfb\x90\x00" * 100)
+    covers = tagging.CoverCache(str(tmp_path / "covers"), fetch=lambda url: _thumbnail())
+    tagger = tagging.TagPool(1, covers=covers)
+    audio = transcode.PooledExtractAudio("mp3", transcoder=transcode.TranscodePool(1), tags=True, cover=True, tagger=tagger)
+
+    audio.run({**META, "filepath": str(path), "acodec": "mp3", "ext": "mp3"})
+
+    assert audio.wait() == [str(path)]
+    tags = ID3(str(path))
+    assert str(tags["TIT2"]) == "Song"
+    assert tags.getall("APIC")[0].mime == "image/jpeg"
+    assert tagger.snapshot()["tagged"] == 1
+
+
+def test_tagging_failures_do_not_fail_the_download(tmp_path):
+    tagger = tagging.TagPool(1, covers=tagging.CoverCache(str(tmp_path), fetch=lambda url: b"not an image"))
+    path = tmp_path / "Song.flac"
+    path.write_bytes(b"not a flac")
+
+    assert tagger.submit(str(path), META).result() == str(path)
+    assert tagger.snapshot()["failed"] == 1
+    assert os.path.exists(path)
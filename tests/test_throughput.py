@@ -0,0 +1,35 @@
+from nerd_downloader.throughput import ThroughputEstimator, ThroughputRegistry
+
+
+def test_estimator_smooths_jitter_and_sums_streams():
+    estimator = ThroughputEstimator(half_life=2.0)
+
+    # 1 MB/s on average, but alternating 0.5/1.5 MB per half second.
+    downloaded = 0
+    for i in range(40):
+        downloaded += 250_000 if i % 2 else 750_000
+        estimator.update(downloaded, 40_000_000, stream="video.mp4", now=i * 0.5)
+
+    assert 0.8e6 < estimator.speed < 1.2e6
+
+    # Second stream starts at zero again: the job counter keeps growing.
+    estimator.update(0, 5_000_000, stream="audio.m4a", now=20.0)
+    assert estimator.downloaded == downloaded
+    assert estimator.remaining == 45_000_000 - downloaded
+    assert estimator.eta() == estimator.remaining / estimator.speed
+
+
+def test_registry_batch_eta():
+    registry = ThroughputRegistry()
+    small, big, unknown = registry.start("small"), registry.start("big"), registry.start("unknown")
+    for estimator, total in ((small, 2_000_000), (big, 50_000_000)):
+        estimator.update(0, total, now=0.0)
+        estimator.update(1_000_000, total, now=1.0)
+
+    assert registry.snapshot()["eta"] is None  # one job has no known size
+
+    registry.finish("unknown")
+    snapshot = registry.snapshot()
+    assert snapshot["active"] == 2
+    assert snapshot["speed"] == 2_000_000
+    assert snapshot["eta"] == (1_000_000 + 49_000_000) / 2_000_000
@@ -0,0 +1,69 @@
+import io
+
+import pytest
+
+PIL = pytest.importorskip("PIL.Image")
+
+from nerd_downloader import engine, thumbs  # noqa: E402
+from nerd_downloader.app import create_app  # noqa: E402
+
+
+def _jpeg(size=(1280, 720)) -> bytes:
+    out = io.BytesIO()
+    PIL.new("RGB", size, (30, 90, 200)).save(out, "JPEG")
+    return out.getvalue()
+
+
+@pytest.fixture
+def fetched(monkeypatch, tmp_path):
+    urls = []
+    cache = thumbs.ThumbCache(str(tmp_path), fetch=lambda url: urls.append(url) or _jpeg())
+    monkeypatch.setattr(thumbs, "cache", cache)
+    return urls
+
+
+def test_normalized_info_points_at_the_local_proxy(fetched):
+    info = engine._normalize_info({"id": "abc123", "thumbnail": "https://i.ytimg.com/vi/abc123/maxresdefault.jpg"})
+    assert info["thumbnail"] == "/api/thumb/abc123"
+    assert info["thumbnail_url"] == "https://i.ytimg.com/vi/abc123/maxresdefault.jpg"
+    assert thumbs.cache.source("abc123") == info["thumbnail_url"]
+    assert thumbs.cache.source("other") == "https://i.ytimg.com/vi/other/hqdefault.jpg"
+
+
+def test_thumb_is_resized_cached_and_revalidated(fetched):
+    thumbs.local_url("abc123", "https://example.invalid/abc.jpg")
+    client = create_app().test_client()
+
+    first = client.get("/api/thumb/abc123?w=200", headers={"Accept": "image/avif,image/webp,*/*"})
+    assert first.status_code == 200 and first.mimetype == "image/webp"
+    assert "immutable" in first.headers["Cache-Control"]
+    assert "Accept" in first.headers["Vary"]
+    with PIL.open(io.BytesIO(first.data)) as image:
+        assert image.size == (320, 180)
+
+    again = client.get("/api/thumb/abc123?w=200", headers={"Accept": "image/webp", "If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304 and again.data == b""
+
+    jpeg = client.get("/api/thumb/abc123", headers={"Accept": "image/png,*/*"})
+    assert jpeg.mimetype == "image/jpeg"
+    assert fetched == ["https://example.invalid/abc.jpg"] * 2  # one per variant, not per request
+    assert thumbs.cache.snapshot()["hits"] == 1
+
+
+def test_thumb_rejects_bad_ids_and_missing_sources(monkeypatch, tmp_path):
+    def broken(url):
+        raise OSError("404")
+
+    monkeypatch.setattr(thumbs, "cache", thumbs.ThumbCache(str(tmp_path), fetch=broken))
+    client = create_app().test_client()
+    assert client.get("/api/thumb/..%2Fetc").status_code == 404
+    assert client.get("/api/thumb/abc123").status_code == 404
+
+
+def test_cache_evicts_least_recently_used_variants(tmp_path):
+    cache = thumbs.ThumbCache(str(tmp_path), max_bytes=1, fetch=lambda url: _jpeg((64, 36)))
+    cache.get("a", 160, "jpeg")
+    cache.get("b", 160, "jpeg")
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["b-160.jpg"]
+    assert cache.snapshot()["files"] == 1
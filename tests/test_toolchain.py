@@ -0,0 +1,68 @@
+from nerd_downloader import toolchain
+
+_ENCODERS = """Encoders:
+ V..... = Video
+ A..... = Audio
+ ------
+ V....D libx264              libx264 H.264 / AVC / MPEG-4 AVC
+ A....D aac                  AAC (Advanced Audio Coding)
+ A....D libmp3lame           libmp3lame MP3 (MPEG audio layer 3)
+"""
+
+_MUXERS = """File formats:
+ D. = Demuxing supported
+ .E = Muxing supported
+ --
+  E ipod            iPod H.264 MP4 (MPEG-4 Part 14)
+  E matroska,webm   Matroska
+  E mp4             MP4 (MPEG-4 Part 14)
+"""
+
+
+def test_probe_runs_once_and_refreshes_only_on_request(monkeypatch):
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd)
+        out = {"-encoders": _ENCODERS, "-muxers": _MUXERS}.get(cmd[-1], "ffmpeg version 6.1.1 Copyright\n")
+        return type("Result", (), {"stdout": out})()
+
+    monkeypatch.setattr(toolchain.shutil, "which", lambda name: f"/opt/bin/{name}")
+    monkeypatch.setattr(toolchain.subprocess, "run", fake_run)
+    monkeypatch.setattr(toolchain, "_cache", None)
+
+    assert toolchain.ffmpeg_path() == "/opt/bin/ffmpeg"
+    assert toolchain.ffprobe_path() == "/opt/bin/ffprobe"
+    assert toolchain.has_encoder("libmp3lame") and not toolchain.has_encoder("libopus")
+    info = toolchain.snapshot()
+    assert info["ffmpeg"] == {"path": "/opt/bin/ffmpeg", "version": "6.1.1"}
+    assert info["encoders"]["aac"] and not info["encoders"]["libfdk_aac"]
+    assert info["muxers"]["webm"] and info["muxers"]["ipod"] and not info["muxers"]["flac"]
+    assert len(calls) == 4
+
+    toolchain.probe(refresh=True)
+    assert len(calls) == 8
+
+
+def test_missing_ffmpeg_is_reported_without_subprocesses(monkeypatch):
+    monkeypatch.setattr(toolchain.shutil, "which", lambda name: None)
+    monkeypatch.setattr(toolchain.subprocess, "run", lambda *a, **k: 1 / 0)
+    monkeypatch.setattr(toolchain, "_cache", None)
+
+    assert toolchain.ffmpeg_path() is None
+    assert toolchain.snapshot()["ffprobe"] == {"path": None, "version": None}
+
+
+def test_force_4k_script_checks_ffmpeg_with_one_version_call(monkeypatch):
+    import download_force_4k
+
+    calls = []
+    monkeypatch.setattr(toolchain, "_cache", None)
+    monkeypatch.setattr(download_force_4k.subprocess, "run", lambda cmd, **kwargs: calls.append(cmd))
+    assert download_force_4k.check_ffmpeg()
+    assert calls == [["ffmpeg", "-version"]]
+    assert toolchain.cached() is None
+
+    monkeypatch.setattr(toolchain, "_cache", {"ffmpeg": {"path": None, "version": None}})
+    assert not download_force_4k.check_ffmpeg()
+    assert len(calls) == 1
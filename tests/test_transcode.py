@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+
+from nerd_downloader import transcode
+
+
+def test_audio_command_matches_extract_audio_settings():
+    mp3 = transcode.audio_command("ffmpeg", "a.webm", "a.mp3", "mp3", "320")
+    assert mp3[mp3.index("-acodec"):] == ["-acodec", "libmp3lame", "-b:a", "320k", "a.mp3"]
+    flac = transcode.audio_command("ffmpeg", "a.webm", "a.flac", "flac", "320")
+    assert flac[flac.index("-acodec"):] == ["-acodec", "flac", "a.flac"]
+
+
+def test_postprocessor_queues_encodes_and_returns_immediately(monkeypatch, tmp_path):
+    release = threading.Event()
+
+    def fake_run(cmd):
+        release.wait(5)
+        with open(cmd[-1], "wb") as fh:
+            fh.write(b"mp3")
+        return 0, 0.25
+
+    monkeypatch.setattr(transcode, "_run", fake_run)
+    pool = transcode.TranscodePool(workers=1)
+    pp = transcode.PooledExtractAudio("mp3", "320", transcoder=pool, ffmpeg="ffmpeg")
+    sources = []
+    for name in ("one", "two"):
+        src = tmp_path / f"{name}.webm"
+        src.write_bytes(b"opus")
+        sources.append(src)
+        assert pp.run({"filepath": str(src)}) == ([], {"filepath": str(src)})
+
+    while pool.snapshot()["running"] == 0:
+        time.sleep(0.001)
+    assert pool.snapshot()["queued"] == 1
+
+    release.set()
+    assert pp.wait() == [str(tmp_path / "one.mp3"), str(tmp_path / "two.mp3")]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["one.mp3", "two.mp3"]
+    assert pool.snapshot() == {
+        "workers": 1,
+        "queued": 0,
+        "running": 0,
+        "completed": 2,
+        "failed": 0,
+        "cpu_seconds": 0.5,
+        "avoided": 0,
+        "cpu_saved_seconds": 0.0,
+        "recent_avoided": [],
+    }
+
+
+def test_failed_encode_keeps_source_and_raises(monkeypatch, tmp_path):
+    monkeypatch.setattr(transcode, "_run", lambda cmd: (1, None))
+    pool = transcode.TranscodePool(workers=2)
+    src = tmp_path / "track.webm"
+    src.write_bytes(b"opus")
+
+    pp = transcode.PooledExtractAudio("m4a", transcoder=pool)
+    pp.run({"filepath": str(src)})
+    with pytest.raises(transcode.TranscodeError):
+        pp.wait()
+    assert src.exists()
+    assert pool.snapshot()["failed"] == 1
+
+
+def test_plan_keeps_matching_audio_without_reencoding():
+    assert transcode.plan("m4a", "mp4a.40.2", "m4a") == "copy"
+    assert transcode.plan("m4a", "mp4a.40.2", "mp4") == "remux"
+    assert transcode.plan("mp3", "opus", "webm") == "encode"
+    assert transcode.plan("flac", None, "flac") == "encode"
+    remux = transcode.audio_command("ffmpeg", "a.mp4", "a.m4a", "m4a", "320", mode="remux")
+    assert remux[remux.index("-acodec"):] == ["-acodec", "copy", "-bsf:a", "aac_adtstoasc", "a.m4a"]
+
+
+def test_avoided_transcodes_are_reported_with_cpu_saved(monkeypatch, tmp_path):
+    def fake_run(cmd):
+        with open(cmd[-1], "wb") as fh:
+            fh.write(b"out")
+        return 0, 0.1 if "copy" in cmd else 2.0
+
+    monkeypatch.setattr(transcode, "_run", fake_run)
+    pool = transcode.TranscodePool(workers=1)
+    pp = transcode.PooledExtractAudio("m4a", transcoder=pool)
+    downloads = [
+        ("opus.webm", "opus", "webm"),  # measured encode: 2.0 s CPU for 100 s audio
+        ("native.m4a", "mp4a.40.2", "m4a"),
+        ("video.mp4", "mp4a.40.2", "mp4"),
+    ]
+    for name, acodec, ext in downloads:
+        (tmp_path / name).write_bytes(b"src")
+        pp.run({"filepath": str(tmp_path / name), "acodec": acodec, "ext": ext, "duration": 100})
+        pp.futures[-1].result()
+
+    assert pp.modes == ["encode", "copy", "remux"]
+    assert pp.avoided == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["native.m4a", "opus.m4a", "video.m4a"]
+    stats = pool.snapshot()
+    assert (stats["completed"], stats["avoided"], stats["cpu_saved_seconds"]) == (2, 2, 3.9)
+    assert [(e["file"], e["mode"]) for e in stats["recent_avoided"]] == [("native.m4a", "copy"), ("video.mp4", "remux")]
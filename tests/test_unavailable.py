@@ -0,0 +1,69 @@
+import json
+
+from nerd_downloader import engine, unavailable
+from nerd_downloader.app import create_app
+
+
+class PrivateYoutubeDL:
+    calls = 0
+
+    def __init__(self, opts):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def extract_info(self, url, download=False):
+        PrivateYoutubeDL.calls += 1
+        raise RuntimeError("ERROR: [youtube] abc: Private video. Sign in if you've been granted access")
+
+
+def test_failed_lookup_is_remembered_per_video(monkeypatch, tmp_path):
+    cache = unavailable.NegativeCache(str(tmp_path / "unavailable.json"))
+    monkeypatch.setattr(engine.unavailable, "cache", cache)
+    monkeypatch.setattr(engine.yt_dlp, "YoutubeDL", PrivateYoutubeDL)
+    PrivateYoutubeDL.calls = 0
+    client = create_app().test_client()
+
+    first = client.post("/api/info", json={"url": "https://www.youtube.com/watch?v=abc&t=5"})
+    tries = PrivateYoutubeDL.calls
+    second = client.post("/api/info", json={"url": "https://youtu.be/abc"})
+
+    assert first.status_code == second.status_code == 502
+    assert second.get_json()["error"] == "Dieses Video ist privat."
+    assert second.get_json()["unavailable"]["class"] == "private"
+    assert PrivateYoutubeDL.calls == tries  # answered from the cache
+
+    known = client.post("/api/unavailable", json={"urls": ["https://youtu.be/abc", "https://youtu.be/other"]})
+    assert list(known.get_json()["known"]) == ["https://youtu.be/abc"]
+    assert client.delete("/api/unavailable", json={"url": "https://youtu.be/abc"}).get_json() == {"ok": True}
+    assert cache.get("https://youtu.be/abc") is None
+
+
+def test_ttl_depends_on_the_error_class_and_survives_restarts(monkeypatch, tmp_path):
+    path = str(tmp_path / "unavailable.json")
+    cache = unavailable.NegativeCache(path, ttls={"private": 60})
+    now = 1_000_000.0
+    monkeypatch.setattr(unavailable.time, "time", lambda: now)
+
+    assert cache.put("https://youtu.be/bot", unavailable.classify("Sign in to confirm you're not a bot"), "x") is None
+    cache.put("https://youtu.be/priv", "private", "privat")
+    cache.put("https://youtu.be/gone", unavailable.classify("Video unavailable"), "weg")
+
+    now += 120
+    reloaded = unavailable.NegativeCache(path, ttls={"private": 60})
+    assert reloaded.get("https://youtu.be/priv") is None
+    assert reloaded.get("https://www.youtube.com/watch?v=gone")["class"] == "removed"
+    assert [e["url"] for e in reloaded.snapshot()] == ["https://www.youtube.com/watch?v=gone"]
+    with open(path) as fh:
+        assert set(json.load(fh)) == {"https://www.youtube.com/watch?v=priv", "https://www.youtube.com/watch?v=gone"}
+
+
+def test_transient_failures_are_not_mistaken_for_removed_videos():
+    assert unavailable.classify("HTTP Error 503: Service Unavailable") is None
+    assert unavailable.classify("Video unavailable. This content isn't available, try again later.") is None
+    assert unavailable.classify("Video unavailable. This video has been removed by the uploader") == "removed"
+    assert unavailable.classify("Requested format unavailable") is None
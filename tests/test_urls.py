@@ -0,0 +1,41 @@
+from nerd_downloader import urls
+
+
+def test_every_form_collapses_to_one_canonical_url_in_first_seen_order():
+    text = """
+    Neu: https://www.youtube.com/shorts/short_1 und https://youtu.be/abc-123?si=x
+    http://m.youtube.com/watch?feature=share&v=abc-123&t=42
+    https://music.youtube.com/watch?v=song9&list=RDAMVMsong9
+    <a href="https://www.youtube-nocookie.com/embed/short_1">embed</a>
+    www.youtube.com/playlist?list=PLnerd  https://www.youtube.com/live/live_7
+    https://example.com/watch?v=nope
+    """
+    assert urls.extract(text) == [
+        "https://www.youtube.com/watch?v=short_1",
+        "https://www.youtube.com/watch?v=abc-123",
+        "https://www.youtube.com/watch?v=song9",
+        "https://www.youtube.com/playlist?list=PLnerd",
+        "https://www.youtube.com/watch?v=live_7",
+    ]
+
+
+def test_iter_urls_streams_across_chunks(monkeypatch, tmp_path):
+    monkeypatch.setattr(urls, "_CHUNK_LINES", 3)
+    links = tmp_path / "links.txt"
+    links.write_text("".join(f"Video {i % 5}: https://youtu.be/id{i % 5}\n" for i in range(20)))
+
+    stream = urls.iter_urls(urls.iter_sources([str(links)]))
+    assert next(stream) == "https://www.youtube.com/watch?v=id0"
+    assert list(stream) == [f"https://www.youtube.com/watch?v=id{i}" for i in range(1, 5)]
+
+
+def test_lookalike_hosts_are_not_youtube():
+    text = """
+    https://evilyoutube.com/watch?v=phish01 http://notyoutu.be/phish02
+    https://my-youtube.com/shorts/phish03 mail@youtu.be/ok_1 (youtube.com/watch?v=ok_2)
+    """
+    assert urls.extract(text) == [
+        "https://www.youtube.com/watch?v=ok_1",
+        "https://www.youtube.com/watch?v=ok_2",
+    ]
+    assert urls.canonical("https://evilyoutube.com/watch?v=phish01") is None